@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import language_router
+import sentiment_module
+
+# Content-addressed cache in front of analyze_feedback.
+# Tier 1 is an in-process LRU; tier 2 is an optional SQLite file shared across
+# restarts and mongodb.py reloads (set ANALYSIS_CACHE_DB to enable it).
+
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "10000"))
+ANALYSIS_CACHE_DB = os.getenv("ANALYSIS_CACHE_DB")
+
+_whitespace = re.compile(r"\s+")
+# Lookup/eviction counters kept by AnalysisCache.stats
+COUNTERS = ("memory_hits", "persistent_hits", "misses", "evictions")
+
+
+def normalize_text(text):
+    """
+    Normalize tweet text so trivially different copies share a cache entry
+    Args:
+        text: Raw tweet text
+    Returns:
+        NFKC-normalized, case-folded text with collapsed whitespace
+    """
+    text = unicodedata.normalize("NFKC", text)
+    return _whitespace.sub(" ", text).strip().casefold()
+
+
+def cache_key(text, version=None, language=None):
+    """
+    Hash of the normalized text plus the model/config version and the
+    source-reported language, which decides the routed language and translation
+    """
+    version = version or sentiment_module.analysis_version()
+    # Undetermined hints route like no hint at all
+    hint = language if language and language not in language_router.UNDETERMINED_CODES else ""
+    payload = f"{version}\n{hint}\n{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class AnalysisCache:
+    def __init__(self, max_entries=ANALYSIS_CACHE_SIZE, db_path=ANALYSIS_CACHE_DB):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "persistent_hits": 0, "misses": 0, "evictions": 0}
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS analysis_cache (key TEXT PRIMARY KEY, result TEXT NOT NULL)")
+            self._db.commit()
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return result
+
+            if self._db is not None:
+                row = self._db.execute("SELECT result FROM analysis_cache WHERE key = ?", (key,)).fetchone()
+                if row:
+                    result = json.loads(row[0])
+                    self._remember(key, result)
+                    self.stats["persistent_hits"] += 1
+                    return result
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key, result):
+        with self._lock:
+            self._remember(key, result)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO analysis_cache (key, result) VALUES (?, ?)",
+                                 (key, json.dumps(result, ensure_ascii=False)))
+                self._db.commit()
+
+    def _remember(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def snapshot(self):
+        """
+        Hit/miss counters plus derived hit rate, for the /cache/stats endpoint
+        """
+        with self._lock:
+            stats = with_hit_rate(self.stats)
+            stats["memory_entries"] = len(self._entries)
+        stats["persistent"] = self._db is not None
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for counter in self.stats:
+                self.stats[counter] = 0
+
+
+def with_hit_rate(counters):
+    """
+    Copy of cache counters (e.g. summed over ingestion workers) plus the hit rate
+    """
+    stats = dict(counters)
+    lookups = stats["memory_hits"] + stats["persistent_hits"] + stats["misses"]
+    stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+    return stats
+
+
+# Process-wide default cache
+cache = AnalysisCache()
+
+
+def _for_text(result, text):
+    # Cached results are shared between texts that normalize the same way
+    result = dict(result)
+    result["original_text"] = text
+    return result
+
+
+def cached_analyze_feedback(text, language=None):
+    key = cache_key(text, language=language)
+    result = cache.get(key)
+    if result is None:
+        result = sentiment_module.analyze_feedback(text, language)
+        cache.put(key, result)
+    return _for_text(result, text)
+
+
+def cached_analyze_feedback_batch(text_list, languages=None, **kwargs):
+    """
+    analyze_feedback_batch that only sends cache misses to the models
+    Args:
+        text_list: Texts to analyse
+        languages: Optional source-reported languages aligned with text_list
+        **kwargs: Passed through to sentiment_module.analyze_feedback_batch
+    Returns:
+        List of analysis results in input order
+    """
+    texts = list(text_list)
+    version = sentiment_module.analysis_version()
+    hints = languages if languages is not None else [None] * len(texts)
+    keys = [cache_key(text, version, language) for text, language in zip(texts, hints)]
+    results = [cache.get(key) for key in keys]
+
+    # Analyse each distinct missing key once
+    missing = {}
+    for i, result in enumerate(results):
+        if result is None:
+            missing.setdefault(keys[i], i)
+    if missing:
+        if languages is not None:
+            kwargs["languages"] = [languages[i] for i in missing.values()]
+        fresh = dict(zip(missing, sentiment_module.analyze_feedback_batch([texts[i] for i in missing.values()], **kwargs)))
+        for key, result in fresh.items():
+            cache.put(key, result)
+        results = [result if result is not None else fresh[key] for key, result in zip(keys, results)]
+
+    return [_for_text(result, text) for result, text in zip(results, texts)]
@@ -0,0 +1,67 @@
+"""
+Throughput benchmark: per-text analyze_feedback vs batched analyze_feedback_batch.
+
+Usage (from backend/):
+    python benchmarks/bench_batch_inference.py --tweets 30 --batch-size 16
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analysis_cache
+import sentiment_module
+from sentiment_module import analyze_feedback, analyze_feedback_batch
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scrape.json")
+
+
+def load_texts(n):
+    with open(SAMPLE_FILE, "r", encoding="utf-8") as f:
+        texts = [tweet["text"] for tweet in json.load(f) if tweet.get("text")]
+    # Repeat the sample until we have n texts
+    return [texts[i % len(texts)] for i in range(n)]
+
+
+def reset_caches():
+    # Both paths share the translation memo; without this every run after the
+    # first would skip translation and batched translation would go unmeasured
+    sentiment_module.translation_memo.clear()
+    analysis_cache.cache.clear()
+
+
+def run(label, fn, texts, repeat):
+    timings = []
+    for _ in range(repeat):
+        reset_caches()
+        start = time.perf_counter()
+        fn(texts)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"{label:<12} best {best:.2f}s  ({len(texts) / best:.1f} tweets/s)")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=sentiment_module.SENTIMENT_BATCH_SIZE)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sentiment_module.DEBUG = False
+    texts = load_texts(args.tweets)
+
+    # Warm up both paths so model initialisation is not measured
+    analyze_feedback_batch(texts[:2], batch_size=args.batch_size)
+
+    sequential = run("sequential", lambda t: [analyze_feedback(x) for x in t], texts, args.repeat)
+    batched = run("batched", lambda t: analyze_feedback_batch(t, batch_size=args.batch_size), texts, args.repeat)
+    print(f"speedup      {sequential / batched:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
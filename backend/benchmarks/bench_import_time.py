@@ -0,0 +1,43 @@
+"""
+Cold-start benchmark for sentiment_module.
+
+"lazy import" is what uvicorn pays at import time now; "import + warm_up" is
+equivalent to the old eager module-level loading.
+
+Usage (from backend/):
+    python benchmarks/bench_import_time.py --repeat 3
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "lazy import": "import sentiment_module",
+    "import + warm_up": "import sentiment_module; sentiment_module.DEBUG = False; sentiment_module.warm_up()",
+}
+
+
+def time_subprocess(code):
+    # A fresh interpreter per run so nothing is cached in-process
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, check=True,
+                   stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for label, code in SCENARIOS.items():
+        timings = [time_subprocess(code) for _ in range(args.repeat)]
+        print(f"{label:<18} best {min(timings):.2f}s  worst {max(timings):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
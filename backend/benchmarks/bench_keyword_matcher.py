@@ -0,0 +1,73 @@
+"""
+Micro-benchmark: per-keyword regex/substring scans vs the single-pass KeywordMatcher.
+
+--extra-keywords pads every keyword list with synthetic terms to show how each
+approach scales as the lists grow (the old path is linear in keyword count).
+
+Usage (from backend/):
+    python benchmarks/bench_keyword_matcher.py --texts 100000 --extra-keywords 2000
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_matcher import KeywordMatcher
+from sentiment_module import URGENT_KEYWORDS, TOPIC_KEYWORDS
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "all_social_issue_tweets.json")
+
+
+def legacy_match(text, urgent_keywords, topic_keywords):
+    # The previous get_urgency + get_topic_keyword implementation
+    text_lower = text.lower()
+    urgent = None
+    for word in urgent_keywords:
+        if re.search(rf'\b{word}\b', text_lower):
+            urgent = word
+            break
+    matches = {topic: sum(kw in text_lower for kw in kws) for topic, kws in topic_keywords.items()}
+    return urgent, matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=100000)
+    parser.add_argument("--extra-keywords", type=int, default=0, help="synthetic keywords added per list")
+    args = parser.parse_args()
+
+    urgent = URGENT_KEYWORDS + [f"urgentterm{i}" for i in range(args.extra_keywords)]
+    topics = {topic: kws + [f"{topic.replace(' ', '')}term{i}" for i in range(args.extra_keywords)]
+              for topic, kws in TOPIC_KEYWORDS.items()}
+    legacy_topics = {topic: [kw.rstrip("*") for kw in kws] for topic, kws in topics.items()}
+
+    with open(SAMPLE_FILE, "r", encoding="utf-8") as f:
+        sample = [tweet["text"] for tweet in json.load(f) if tweet.get("text")]
+    texts = [sample[i % len(sample)] for i in range(args.texts)]
+    n_keywords = len(urgent) + sum(len(kws) for kws in topics.values())
+    print(f"{len(texts)} texts, {n_keywords} keywords")
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher(urgent, topics)
+    print(f"matcher build  {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    for text in texts:
+        matcher.match(text)
+    matcher_time = time.perf_counter() - start
+    print(f"KeywordMatcher {matcher_time:.2f}s  ({len(texts) / matcher_time:,.0f} texts/s)")
+
+    start = time.perf_counter()
+    for text in texts:
+        legacy_match(text, urgent, legacy_topics)
+    legacy_time = time.perf_counter() - start
+    print(f"legacy regex   {legacy_time:.2f}s  ({len(texts) / legacy_time:,.0f} texts/s)")
+    print(f"speedup        {legacy_time / matcher_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Deterministic scrape -> analyse -> store load test driven by recorded fixtures.
+
+Scrape stage: "offline" parses fixture payloads directly (no browser); "browser"
+runs a lean ScraperSession against a local ReplayServer.
+Analyse stage: cached_analyze_feedback_batch, skipped with --skip-analysis.
+Store stage: bulk upserts into --mongo-uri, skipped when it is not given.
+
+Usage (from backend/):
+    python scrape_replay.py synthesize fixtures/ --tweets 5000
+    python benchmarks/bench_replay_pipeline.py fixtures/ --skip-analysis
+    python benchmarks/bench_replay_pipeline.py fixtures/ --mode browser --mongo-uri mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrape_replay import ReplayServer, iter_fixture_tweets, list_hashtags
+
+
+def scrape_offline(fixture_dir, hashtag):
+    # Deduplicate by id like ScraperSession does
+    unique = {}
+    for tweet in iter_fixture_tweets(fixture_dir, hashtag):
+        unique.setdefault(tweet.get("id"), tweet)
+    return list(unique.values())
+
+
+async def scrape_browser(fixture_dir, hashtag, max_tweets):
+    from hashtagger import ScraperSession
+    with ReplayServer(fixture_dir) as server, tempfile.TemporaryDirectory() as profile:
+        async with ScraperSession(max_tabs=1, user_data_dir=profile, lean=True, storage_state=None,
+                                  base_url=server.url, record_dir=None) as session:
+            return await session.search(hashtag, max_tweets=max_tweets)
+
+
+def stage(label, count, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<8} {count if count is not None else len(result):>7} tweets in {elapsed:7.2f}s  "
+          f"({(count if count is not None else len(result)) / max(elapsed, 1e-9):,.0f} tweets/s)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixture_dir")
+    parser.add_argument("--hashtag", help="default: first hashtag in the fixture directory")
+    parser.add_argument("--mode", choices=["offline", "browser"], default="offline")
+    parser.add_argument("--max-tweets", type=int, default=10000, help="browser mode only")
+    parser.add_argument("--skip-analysis", action="store_true")
+    parser.add_argument("--mongo-uri")
+    parser.add_argument("--database", default="civicpulse_loadtest")
+    args = parser.parse_args()
+
+    hashtag = args.hashtag or list_hashtags(args.fixture_dir)[0]
+    if args.mode == "offline":
+        tweets = stage("scrape", None, lambda: scrape_offline(args.fixture_dir, hashtag))
+    else:
+        tweets = stage("scrape", None, lambda: asyncio.run(scrape_browser(args.fixture_dir, hashtag, args.max_tweets)))
+    tweets = [tweet for tweet in tweets if tweet.get("text")]
+
+    if args.skip_analysis:
+        return
+
+    import sentiment_module
+    from analysis_cache import cached_analyze_feedback_batch
+    sentiment_module.DEBUG = False
+    analyses = stage("analyse", len(tweets), lambda: cached_analyze_feedback_batch([tweet["text"] for tweet in tweets]))
+
+    if not args.mongo_uri:
+        return
+
+    from pymongo import MongoClient
+    from bulk_writer import BulkWriter
+    from indexes import ensure_indexes
+    from utils.tweet_utils import build_tweet_doc
+
+    db = MongoClient(args.mongo_uri)[args.database]
+    ensure_indexes(db)
+    version = sentiment_module.analysis_version()
+    timestamp = datetime.now(timezone.utc)
+
+    def store():
+        writer = BulkWriter(db["tweets"])
+        for tweet, analysis in zip(tweets, analyses):
+            doc = build_tweet_doc(tweet, analysis, timestamp, version)
+            writer.upsert({"tweet_id": doc["tweet_id"]}, doc)
+        return writer.flush()
+
+    report = stage("store", len(tweets), store)
+    print(f"stored: {len(report['inserted_ids'])} new, {len(report['matched'])} updated, {len(report['errors'])} failed")
+
+
+if __name__ == "__main__":
+    main()
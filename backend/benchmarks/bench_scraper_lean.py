@@ -0,0 +1,78 @@
+"""
+Bytes transferred and wall time per 100 tweets: default vs lean ScraperSession.
+
+A scrape_replay.ReplayServer stands in for Twitter. It serves recorded fixtures,
+or fixtures synthesised from scrape.json, and it also loads a stylesheet, a web
+font and one image per tweet like the real search page.
+
+Usage (from backend/, needs `playwright install chromium`):
+    python benchmarks/bench_scraper_lean.py --tweets 100 --headless-baseline
+    python benchmarks/bench_scraper_lean.py --fixtures fixtures/ --hashtag potholes
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hashtagger import ScraperSession
+from scrape_replay import ReplayServer, synthesize_payloads
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scrape.json")
+
+
+async def run_mode(label, base_url, hashtag, n_tweets, lean, headless):
+    transferred = {"bytes": 0, "requests": 0}
+
+    async def count(request):
+        sizes = await request.sizes()
+        transferred["bytes"] += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        transferred["requests"] += 1
+
+    with tempfile.TemporaryDirectory() as profile:
+        session = ScraperSession(max_tabs=1, user_data_dir=profile, lean=lean, storage_state=None,
+                                 base_url=base_url, headless=headless, record_dir=None)
+        await session.start()
+        try:
+            session.context.on("requestfinished", count)
+            start = time.perf_counter()
+            tweets = await session.search(hashtag, max_tweets=n_tweets)
+            elapsed = time.perf_counter() - start
+        finally:
+            await session.close()
+
+    per_100 = 100 / max(len(tweets), 1)
+    print(f"{label:<8} {len(tweets)} tweets  {elapsed * per_100:.2f}s/100 tweets  "
+          f"{transferred['bytes'] * per_100 / 1e6:.2f} MB/100 tweets  ({transferred['requests']} requests)")
+
+
+async def main_async(args):
+    if args.fixtures:
+        server = ReplayServer(args.fixtures, assets=True)
+    else:
+        with open(SAMPLE_FILE, "r", encoding="utf-8") as f:
+            tweets = [tweet for tweet in json.load(f) if tweet.get("text")]
+        server = ReplayServer(payloads={args.hashtag: synthesize_payloads(tweets, args.tweets * 2)}, assets=True)
+
+    with server:
+        baseline_headless = True if args.headless_baseline else None
+        await run_mode("default", server.url, args.hashtag, args.tweets, lean=False, headless=baseline_headless)
+        await run_mode("lean", server.url, args.hashtag, args.tweets, lean=True, headless=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=100)
+    parser.add_argument("--hashtag", default="civicpulse")
+    parser.add_argument("--fixtures", help="recorded fixture directory (default: synthesise from scrape.json)")
+    parser.add_argument("--headless-baseline", action="store_true",
+                        help="run the default mode headless too (e.g. on machines without a display)")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Accuracy, latency and memory of the sentiment backends on a labelled civic-feedback sample.
+
+Each backend runs in its own subprocess so the resident memory it reports is its
+own. Accuracy is measured against the hand labels in data/civic_sentiment_sample.jsonl,
+and agreement is measured against the fp32 torch baseline.
+
+Usage (from backend/):
+    python benchmarks/bench_sentiment_backends.py
+    python benchmarks/bench_sentiment_backends.py --backends torch onnx-int8 --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment_backends import BACKENDS, load_sentiment_classifier
+from sentiment_module import SENTIMENT_MODEL
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "civic_sentiment_sample.jsonl")
+
+
+def load_sample(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def rss_mb():
+    # Current resident set size (Linux); falls back to peak RSS elsewhere
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(backend, sample, repeat, batch_size):
+    """
+    Run one backend in this process and return its measurements
+    """
+    texts = [item["text"] for item in sample]
+    start = time.perf_counter()
+    classifier = load_sentiment_classifier(backend, SENTIMENT_MODEL)
+    load_seconds = time.perf_counter() - start
+    classifier(texts[:2], batch_size=2, truncation=True)  # warm-up
+
+    # Per-tweet latency: one text per call, like get_sentiment
+    latencies = []
+    for _ in range(repeat):
+        for text in texts:
+            start = time.perf_counter()
+            classifier([text], batch_size=1, truncation=True)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    predictions = classifier(texts, batch_size=batch_size, truncation=True)
+    batch_seconds = time.perf_counter() - start
+
+    labels = [prediction["label"].capitalize() for prediction in predictions]
+    latencies.sort()
+    return {
+        "backend": backend,
+        "labels": labels,
+        "accuracy": sum(label == item["label"] for label, item in zip(labels, sample)) / len(sample),
+        "load_seconds": load_seconds,
+        "median_ms": statistics.median(latencies),
+        "p90_ms": latencies[int(len(latencies) * 0.9) - 1],
+        "batch_tweets_per_second": len(texts) / batch_seconds,
+        "rss_mb": rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--sample", default=SAMPLE_FILE, help="JSONL of {text, label}")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the sample for latency")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    sample = load_sample(args.sample)
+
+    if args.child:
+        print(json.dumps(measure(args.child, sample, args.repeat, args.batch_size)))
+        return
+
+    results = []
+    for backend in args.backends:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", backend, "--sample", args.sample,
+             "--repeat", str(args.repeat), "--batch-size", str(args.batch_size)],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        # Model loading may print; the result is the last line
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    baseline = next((r for r in results if r["backend"] == "torch"), results[0])
+    print(f"{len(sample)} labelled texts, model {SENTIMENT_MODEL}")
+    print(f"{'backend':<11} {'accuracy':>8} {'agree':>6} {'median':>9} {'p90':>9} {'batch':>11} {'RSS':>8} {'load':>7}")
+    for r in results:
+        agree = sum(a == b for a, b in zip(r["labels"], baseline["labels"])) / len(sample)
+        print(f"{r['backend']:<11} {r['accuracy']:>8.1%} {agree:>6.1%} {r['median_ms']:>7.1f}ms "
+              f"{r['p90_ms']:>7.1f}ms {r['batch_tweets_per_second']:>7.1f}/s {r['rss_mb']:>6.0f}MB "
+              f"{r['load_seconds']:>6.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Topic classification throughput: keywords vs embedding classifier vs zero-shot NLI.
+
+Usage (from backend/):
+    python benchmarks/bench_topic_classifier.py --tweets 200
+    python benchmarks/bench_topic_classifier.py --tweets 50 --zero-shot
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model_registry
+import sentiment_module
+from sentiment_module import get_topics_batch, keyword_matcher
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scrape.json")
+
+
+def load_texts(n):
+    with open(SAMPLE_FILE, "r", encoding="utf-8") as f:
+        texts = [tweet["text"] for tweet in json.load(f) if tweet.get("text")]
+    return [texts[i % len(texts)] for i in range(n)]
+
+
+def run(mode, texts):
+    sentiment_module.TOPIC_MODE = mode
+    counts = [keyword_matcher.match(text)[1] for text in texts]
+    start = time.perf_counter()
+    topics = get_topics_batch(texts, counts)
+    elapsed = time.perf_counter() - start
+    sources = {source: sum(1 for _, _, s in topics if s == source) for source in {s for _, _, s in topics}}
+    print(f"{mode:<10} {len(texts) / elapsed:>9.1f} tweets/s  decided by {sources}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=200)
+    parser.add_argument("--zero-shot", action="store_true", help="also time bart-large-mnli (slow)")
+    args = parser.parse_args()
+    texts = load_texts(args.tweets)
+
+    model_registry.warm_up(["topics"] + (["zero_shot"] if args.zero_shot else []))
+    run("keywords", texts)
+    run("embedding", texts)
+    if args.zero_shot:
+        run("zero-shot", texts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Accuracy and throughput of sentiment tier configurations on the labelled civic sample.
+
+Configurations compared:
+- transformer only
+- VADER only
+- tiered at several compound-score bands
+
+Each row also shows the share of texts escalated to the transformer. Models are
+loaded once up front so only inference is timed.
+
+Usage (from backend/):
+    python benchmarks/eval_sentiment_tiers.py
+    python benchmarks/eval_sentiment_tiers.py --bands 0.3 0.5 0.7 --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model_registry
+from sentiment_module import SENTIMENT_NEUTRAL_CONFIDENCE, get_sentiment_tiers
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "civic_sentiment_sample.jsonl")
+LABELS = ("Positive", "Neutral", "Negative")
+
+
+def load_sample(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate(name, sample, repeat, batch_size, **options):
+    texts = [item["text"] for item in sample]
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decided = get_sentiment_tiers(texts, batch_size=batch_size, **options)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    correct = Counter()
+    total = Counter(item["label"] for item in sample)
+    for (label, _), item in zip(decided, sample):
+        if label == item["label"]:
+            correct[label] += 1
+    escalated = sum(tier == "transformer" for _, tier in decided) / len(sample)
+    accuracy = sum(correct.values()) / len(sample)
+    per_label = "  ".join(f"{label[:3]} {correct[label]}/{total[label]}" for label in LABELS if total[label])
+    print(f"{name:<22} {accuracy:>8.1%} {escalated:>10.1%} {len(texts) / best:>9.1f}/s   {per_label}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sample", default=SAMPLE_FILE, help="JSONL of {text, label}")
+    parser.add_argument("--bands", type=float, nargs="+", default=[0.3, 0.5, 0.7],
+                        help="compound-score half-widths for the tiered configurations")
+    parser.add_argument("--neutral-confidence", type=float, default=SENTIMENT_NEUTRAL_CONFIDENCE)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+    sample = load_sample(args.sample)
+
+    model_registry.warm_up(["vader", "sentiment"])
+    print(f"{len(sample)} labelled texts ({dict(Counter(item['label'] for item in sample))})")
+    print(f"{'configuration':<22} {'accuracy':>8} {'escalated':>10} {'throughput':>11}")
+
+    common = {"repeat": args.repeat, "batch_size": args.batch_size, "neutral_confidence": args.neutral_confidence}
+    evaluate("transformer", sample, mode="transformer", **common)
+    for band in args.bands:
+        evaluate(f"vader ±{band}", sample, mode="vader", band=(-band, band), **common)
+    for band in args.bands:
+        evaluate(f"tiered ±{band}", sample, mode="tiered", band=(-band, band), **common)
+
+
+if __name__ == "__main__":
+    main()
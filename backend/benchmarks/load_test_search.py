@@ -0,0 +1,78 @@
+"""
+Concurrent load test for the backend: N clients each send M requests and the
+script reports p50/p99 latency per endpoint.
+
+While /search requests are analysing, the /filter probes should keep answering
+quickly; if the event loop is blocked their latency tracks /search instead.
+
+Usage (server running on localhost:8080):
+    python benchmarks/load_test_search.py --clients 8 --requests 3 --hashtags potholes,watersupply
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def client_loop(http, method, path, payload, n_requests, latencies, errors):
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        try:
+            response = await http.request(method, path, json=payload)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(str(e))
+
+
+def report(label, latencies, errors):
+    if not latencies:
+        print(f"{label:<8} no successful requests ({len(errors)} errors)")
+        return
+    print(f"{label:<8} n={len(latencies):<4} p50={percentile(latencies, 50):.2f}s "
+          f"p99={percentile(latencies, 99):.2f}s mean={statistics.mean(latencies):.2f}s errors={len(errors)}")
+
+
+async def run(args):
+    search_payload = {"hashtags": args.hashtags.split(","), "priority_threshold": args.threshold}
+    filter_payload = {"priority_threshold": args.threshold}
+    search_latencies, search_errors = [], []
+    filter_latencies, filter_errors = [], []
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as http:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *[client_loop(http, "POST", "/search", search_payload, args.requests, search_latencies, search_errors)
+              for _ in range(args.clients)],
+            *[client_loop(http, "POST", "/filter", filter_payload, args.requests * 5, filter_latencies, filter_errors)
+              for _ in range(args.probe_clients)],
+        )
+        elapsed = time.perf_counter() - start
+
+    print(f"{args.clients} search clients x {args.requests} requests in {elapsed:.1f}s")
+    report("/search", search_latencies, search_errors)
+    report("/filter", filter_latencies, filter_errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8080")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=3, help="requests per search client")
+    parser.add_argument("--probe-clients", type=int, default=2, help="concurrent /filter clients")
+    parser.add_argument("--hashtags", default="potholes")
+    parser.add_argument("--threshold", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=600)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import os
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Chunked, unordered bulk writer shared by main.py and mongodb.py.
+# Documents are buffered with add() (plain insert) or upsert() and written with
+# flush(); every operation gets a per-index outcome so callers can map ids back
+# onto their results.
+
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+
+
+class BulkWriter:
+    def __init__(self, collection, chunk_size=BULK_CHUNK_SIZE, autoflush=False, keep_results=True):
+        """
+        Args:
+            collection: pymongo collection to write to
+            chunk_size: Maximum operations per bulk round-trip
+            autoflush: Flush automatically once chunk_size operations are pending
+                       (for synchronous callers such as mongodb.py)
+            keep_results: Accumulate inserted_ids / matched / errors across flushes;
+                          long-running loaders turn this off and rely on counts
+        """
+        self.collection = collection
+        self.chunk_size = chunk_size
+        self.autoflush = autoflush
+        self.keep_results = keep_results
+        self.counts = {"inserted": 0, "matched": 0, "errors": 0}
+        self._pending = []
+        self._next_index = 0
+        self.inserted_ids = {}
+        self.matched = set()
+        self.errors = []
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def _queue(self, op, doc):
+        index = self._next_index
+        self._next_index += 1
+        self._pending.append((index, op, doc))
+        if self.autoflush and len(self._pending) >= self.chunk_size:
+            self.flush()
+        return index
+
+    def add(self, doc):
+        """
+        Buffer a document for insertion
+        Returns:
+            The document's index, used as the key in inserted_ids / errors
+        """
+        return self._queue(InsertOne(doc), doc)
+
+    def upsert(self, filter, doc):
+        """
+        Buffer an idempotent write: $set doc on the document matching filter,
+        inserting it if none exists
+        Returns:
+            The operation's index; it lands in inserted_ids when a new document
+            was created and in matched when an existing one was updated
+        """
+        return self._queue(UpdateOne(filter, {"$set": doc}, upsert=True), None)
+
+    def flush(self):
+        """
+        Write all pending operations in chunks of chunk_size
+        Returns:
+            Report dict for this flush: inserted_ids (index -> _id), matched
+            (indices of upserts that updated an existing document) and errors
+            (index, code, errmsg) for operations that failed
+        """
+        report = {"inserted_ids": {}, "matched": [], "errors": []}
+        pending, self._pending = self._pending, []
+
+        for start in range(0, len(pending), self.chunk_size):
+            chunk = pending[start:start + self.chunk_size]
+            failed = {}
+            upserted = {}
+            try:
+                result = self.collection.bulk_write([op for _, op, _ in chunk], ordered=False)
+                upserted = result.upserted_ids or {}
+            except BulkWriteError as e:
+                for error in e.details.get("writeErrors", []):
+                    failed[error["index"]] = error
+                upserted = {item["index"]: item["_id"] for item in e.details.get("upserted", [])}
+            except Exception as e:
+                # Whole-chunk failure (network, auth, ...): report every operation
+                failed = {i: {"code": None, "errmsg": str(e)} for i in range(len(chunk))}
+
+            for position, (index, op, doc) in enumerate(chunk):
+                if position in failed:
+                    report["errors"].append({
+                        "index": index,
+                        "code": failed[position].get("code"),
+                        "errmsg": failed[position].get("errmsg"),
+                    })
+                elif doc is not None:
+                    # InsertOne assigns _id on the document itself
+                    report["inserted_ids"][index] = doc["_id"]
+                elif position in upserted:
+                    report["inserted_ids"][index] = upserted[position]
+                else:
+                    report["matched"].append(index)
+
+        self.counts["inserted"] += len(report["inserted_ids"])
+        self.counts["matched"] += len(report["matched"])
+        self.counts["errors"] += len(report["errors"])
+        if self.keep_results:
+            self.inserted_ids.update(report["inserted_ids"])
+            self.matched.update(report["matched"])
+            self.errors.extend(report["errors"])
+        return report
@@ -1,12 +1,14 @@
 import asyncio
 from playwright.async_api import async_playwright
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 import jmespath
 import random
 import time
 import urllib.parse
 import json
 import os
+from scrape_replay import save_payload
+from utils.tweet_utils import snowflake
 
 # Parse user info
 def parse_user(user_data: Dict) -> Dict:
@@ -24,164 +26,410 @@ def parse_user(user_data: Dict) -> Dict:
         "profile_image_url": user_data.get("profile_image_url_https"),
     }
 
+# JMESPath expressions, compiled once at import instead of re-parsed per call
+TWEET_EXPRESSION = jmespath.compile(
+    """{
+        created_at: legacy.created_at,
+        attached_urls: legacy.entities.urls[].expanded_url,
+        attached_media: legacy.entities.media[].media_url_https,
+        tagged_users: legacy.entities.user_mentions[].screen_name,
+        tagged_hashtags: legacy.entities.hashtags[].text,
+        favorite_count: legacy.favorite_count,
+        reply_count: legacy.reply_count,
+        retweet_count: legacy.retweet_count,
+        text: legacy.full_text,
+        language: legacy.lang,
+        user_id: legacy.user_id_str,
+        id: legacy.id_str,
+        conversation_id: legacy.conversation_id_str,
+        views: views.count
+    }"""
+)
+USER_EXPRESSION = jmespath.compile("core.user_results.result.legacy")
+SEARCH_ENTRIES_EXPRESSION = jmespath.compile("data.search_by_raw_query.search_timeline.timeline.instructions[].entries[]")
+CONVERSATION_ENTRIES_EXPRESSION = jmespath.compile("data.threaded_conversation_with_injections_v2.instructions[].entries[]")
+ENTRY_TWEET_EXPRESSION = jmespath.compile("content.itemContent.tweet_results.result")
+
 # Parse tweet info
 def parse_tweet(data: Dict) -> Dict:
     if not data:
         return {}
-        
-    result = jmespath.search(
-        """{
-            created_at: legacy.created_at,
-            attached_urls: legacy.entities.urls[].expanded_url,
-            attached_media: legacy.entities.media[].media_url_https,
-            tagged_users: legacy.entities.user_mentions[].screen_name,
-            tagged_hashtags: legacy.entities.hashtags[].text,
-            favorite_count: legacy.favorite_count,
-            reply_count: legacy.reply_count,
-            retweet_count: legacy.retweet_count,
-            text: legacy.full_text,
-            language: legacy.lang,
-            user_id: legacy.user_id_str,
-            id: legacy.id_str,
-            conversation_id: legacy.conversation_id_str,
-            views: views.count
-        }""",
-        data,
-    )
-    
+
+    result = TWEET_EXPRESSION.search(data)
     if not result:
         return {}
-    
-    user_data = jmespath.search("core.user_results.result.legacy", data)
+
+    user_data = USER_EXPRESSION.search(data)
     if user_data:
         result["user"] = parse_user(user_data)
     return result
 
-# Main search function
-async def search_tweets_by_hashtag(hashtag: str, max_tweets: int = 100) -> List[Dict]:
-    user_data_dir = "playwright_storage"
-    collected_tweets = []
-    _xhr_calls = []
+# Parse every tweet in one SearchTimeline (or conversation timeline) payload
+def extract_tweets(data: Dict) -> List[Dict]:
+    tweet_entries = SEARCH_ENTRIES_EXPRESSION.search(data)
+    if not tweet_entries:
+        tweet_entries = CONVERSATION_ENTRIES_EXPRESSION.search(data)
+    if not tweet_entries:
+        return []
 
-    # Encode the hashtag for URL
-    encoded_hashtag = urllib.parse.quote(f"#{hashtag}")
+    tweets = []
+    for entry in tweet_entries:
+        entry_id = entry.get("entryId", "")
+        # Promoted tweets are ads injected out of timeline order
+        if "tweet" not in entry_id or entry_id.startswith("promoted-"):
+            continue
+        tweet_data = ENTRY_TWEET_EXPRESSION.search(entry)
+        if not tweet_data:
+            continue
+        parsed_tweet = parse_tweet(tweet_data)
+        if parsed_tweet and "text" in parsed_tweet:
+            tweets.append(parsed_tweet)
+    return tweets
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch_persistent_context(
-            user_data_dir=user_data_dir,
-            headless=False,
-            viewport={"width": 1920, "height": 1080},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
-        page = await browser.new_page()
+# Whether a SearchTimeline payload marks the end of the results: a search page
+# without any tweet entry (only cursors, or no entries at all). Other payloads,
+# e.g. error responses, say nothing about the end.
+def timeline_ended(data: Dict) -> bool:
+    entries = SEARCH_ENTRIES_EXPRESSION.search(data)
+    if entries is None:
+        return False
+    return not any("tweet" in entry.get("entryId", "") for entry in entries)
 
-        await page.goto("https://twitter.com/")
-        await asyncio.sleep(5)
+# Maximum number of hashtag searches running concurrently in one browser
+MAX_TABS = int(os.getenv("SCRAPER_MAX_TABS", "3"))
 
-        if "login" in page.url:
-            print("Not logged in. Please log in manually.")
-            await asyncio.sleep(60)  # Give time to manually login
-            print("Proceeding after manual login...")
+# Scroll loop tuning: how long to wait for a timeline response after a scroll,
+# how many scrolls without new tweets end the search, and a short human-like pause
+SCROLL_TIMEOUT = float(os.getenv("SCRAPER_SCROLL_TIMEOUT", "4"))
+MAX_IDLE_SCROLLS = int(os.getenv("SCRAPER_MAX_IDLE_SCROLLS", "5"))
+SCROLL_JITTER = (0.3, 0.8)
 
-        async def intercept_response(response):
-            if response.request.resource_type == "xhr":
-                try:
-                    if "SearchTimeline" in response.url or "timeline" in response.url.lower():
-                        _xhr_calls.append(response)
-                except:
-                    pass
+# Lean mode: headless, small viewport and no images/media/fonts/stylesheets.
+# Only the SearchTimeline XHR JSON is consumed, so nothing visible is needed.
+LEAN_MODE = os.getenv("SCRAPER_LEAN", "0") == "1"
+# Playwright storage-state file (cookies + localStorage) to use instead of the
+# playwright_storage profile directory; create one with save_storage_state()
+STORAGE_STATE = os.getenv("SCRAPER_STORAGE_STATE")
+# Directory to record raw SearchTimeline payloads into (see scrape_replay.py)
+RECORD_DIR = os.getenv("SCRAPER_RECORD_DIR")
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 
-        page.on("response", intercept_response)
+# One Chromium context shared by many hashtag searches.
+# The browser is launched and the login checked once; every search then opens its
+# own page in the same logged-in context, at most max_tabs at a time.
+class ScraperSession:
+    def __init__(self, max_tabs=MAX_TABS, user_data_dir="playwright_storage", lean=LEAN_MODE,
+                 storage_state=STORAGE_STATE, base_url="https://twitter.com", headless=None,
+                 record_dir=RECORD_DIR):
+        self.max_tabs = max_tabs
+        self.user_data_dir = user_data_dir
+        self.lean = lean
+        self.headless = lean if headless is None else headless
+        self.record_dir = record_dir
+        self.storage_state = storage_state
+        self.base_url = base_url.rstrip("/")
+        self._tabs = asyncio.Semaphore(max_tabs)
+        self._playwright = None
+        self._browser = None
+        self.context = None
 
-        # Perform search
-        search_url = f"https://twitter.com/search?q={encoded_hashtag}&src=typed_query&f=live"
-        print(f"Searching for hashtag: {hashtag}")
-        await page.goto(search_url)
-        await page.wait_for_selector('article', timeout=30000)
+    async def __aenter__(self):
+        await self.start()
+        return self
 
-        tweet_count = 0
-        scroll_attempts = 0
-        max_scroll_attempts = 20
-        last_height = await page.evaluate("document.body.scrollHeight")
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
 
-        while tweet_count < max_tweets and scroll_attempts < max_scroll_attempts:
-            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            await asyncio.sleep(random.uniform(2, 4))
+    async def start(self):
+        self._playwright = await async_playwright().start()
+        headless = self.headless
+        viewport = {"width": 800, "height": 600} if self.lean else {"width": 1920, "height": 1080}
 
-            for xhr in _xhr_calls:
-                try:
-                    data = await xhr.json()
-
-                    tweet_entries = jmespath.search("data.search_by_raw_query.search_timeline.timeline.instructions[].entries[]", data)
-                    if not tweet_entries:
-                        tweet_entries = jmespath.search("data.threaded_conversation_with_injections_v2.instructions[].entries[]", data)
-                    if not tweet_entries:
-                        continue
-
-                    for entry in tweet_entries:
-                        if not entry.get("entryId", ""):
-                            continue
-                        if "tweet" in entry.get("entryId", ""):
-                            tweet_data = jmespath.search("content.itemContent.tweet_results.result", entry)
-                            if not tweet_data:
-                                continue
-
-                            parsed_tweet = parse_tweet(tweet_data)
-                            if parsed_tweet and "text" in parsed_tweet:
-                                collected_tweets.append(parsed_tweet)
-                                tweet_count += 1
-                                print(f"Collected {tweet_count} tweets", end="\r")
-
-                                if tweet_count >= max_tweets:
-                                    break
-                except Exception as e:
-                    print(f"Error processing XHR: {e}")
-
-            _xhr_calls.clear()
-
-            new_height = await page.evaluate("document.body.scrollHeight")
-            if new_height == last_height:
-                scroll_attempts += 1
-                print("\nNo more scrolling possible")
+        if self.storage_state and os.path.exists(self.storage_state):
+            self._browser = await self._playwright.chromium.launch(headless=headless)
+            self.context = await self._browser.new_context(
+                storage_state=self.storage_state,
+                viewport=viewport,
+                user_agent=USER_AGENT
+            )
+        else:
+            self.context = await self._playwright.chromium.launch_persistent_context(
+                user_data_dir=self.user_data_dir,
+                headless=headless,
+                viewport=viewport,
+                user_agent=USER_AGENT
+            )
+
+        if self.lean:
+            await self.context.route("**/*", self._block_heavy_resources)
+
+        # Check the login once for the whole session
+        page = await self.context.new_page()
+        await page.goto(f"{self.base_url}/")
+        await asyncio.sleep(0 if self.lean else 5)
+
+        if "login" in page.url:
+            if headless:
+                print("Not logged in and running headless; save a storage state from a headed session first.")
             else:
-                scroll_attempts = 0
+                print("Not logged in. Please log in manually.")
+                await asyncio.sleep(60)  # Give time to manually login
+                print("Proceeding after manual login...")
+        await page.close()
 
-            last_height = new_height
+    @staticmethod
+    async def _block_heavy_resources(route):
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
 
-        await browser.close()
+    # Save cookies/localStorage so later (headless) sessions can reuse the login
+    async def save_storage_state(self, path):
+        await self.context.storage_state(path=path)
 
-    # Remove duplicates
-    unique_tweets = {tweet.get("id"): tweet for tweet in collected_tweets if tweet.get("id")}
-    return list(unique_tweets.values())
+    async def close(self):
+        if self.context:
+            await self.context.close()
+            self.context = None
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
 
-async def scrape_tweets(htag:str):
-    social_hashtags = [htag]
+    # Search one hashtag in a new tab of the shared context
+    async def search(self, hashtag: str, max_tweets: int = 100) -> List[Dict]:
+        tweets, _ = await self.search_window(hashtag, max_tweets)
+        return tweets
 
-    all_tweets_by_hashtag = {}
+    # Search one hashtag for tweets newer than since_id (and at most max_id, via
+    # the max_id: search operator). Scrolling stops as soon as the live timeline
+    # reaches since_id. Returns (tweets, complete): complete is True only when an
+    # organic tweet at or below since_id was seen or the timeline ended. It is
+    # False when anything else stopped the scroll first (max_tweets, idle scrolls,
+    # a rate limit), i.e. tweets between the oldest one returned and since_id may
+    # be missing. None when no since_id was given.
+    async def search_window(self, hashtag: str, max_tweets: int = 100, since_id: Optional[str] = None,
+                            max_id: Optional[str] = None):
+        async with self._tabs:
+            page = await self.context.new_page()
+            try:
+                return await self._collect(page, hashtag, max_tweets, since_id, max_id)
+            finally:
+                await page.close()
+
+    # Search several hashtags concurrently, yielding (hashtag, tweets, error, complete)
+    # in completion order; error is None on success, complete is as in search_window.
+    # windows maps a hashtag to (since_id, max_id) for incremental searches.
+    async def search_many(self, hashtags: List[str], max_tweets: int = 100,
+                          windows: Optional[Dict[str, Tuple[Optional[str], Optional[str]]]] = None):
+        windows = windows or {}
+
+        async def run(hashtag):
+            try:
+                tweets, complete = await self.search_window(hashtag, max_tweets, *windows.get(hashtag, (None, None)))
+                return hashtag, tweets, None, complete
+            except Exception as e:
+                print(f"Error processing hashtag {hashtag}: {e}")
+                return hashtag, [], e, False
+
+        for finished in asyncio.as_completed([run(hashtag) for hashtag in hashtags]):
+            yield await finished
+
+    async def _collect(self, page, hashtag: str, max_tweets: int, since_id: Optional[str] = None,
+                       max_id: Optional[str] = None):
+        # Timeline responses are parsed in background tasks the moment they arrive
+        # and their tweets pushed onto a queue; the scroll loop only drains it.
+        parsed_batches = asyncio.Queue()
+        parse_tasks = set()
+        unique_tweets = {}  # id -> tweet, deduplicated incrementally
+        watermark = snowflake(since_id)
+        ceiling = snowflake(max_id)
+        reached_watermark = False
+        ended = False
+
+        # Encode the hashtag (and the upper bound of a resumed window) for URL
+        query = f"#{hashtag} max_id:{max_id}" if max_id else f"#{hashtag}"
+        encoded_hashtag = urllib.parse.quote(query)
+
+        async def parse_response(response):
+            try:
+                data = await response.json()
+                if self.record_dir:
+                    await asyncio.to_thread(save_payload, self.record_dir, hashtag, data)
+                await parsed_batches.put((extract_tweets(data), timeline_ended(data)))
+            except Exception as e:
+                print(f"Error processing XHR: {e}")
+
+        def intercept_response(response):
+            if response.request.resource_type not in ("xhr", "fetch"):
+                return
+            if "SearchTimeline" in response.url or "timeline" in response.url.lower():
+                task = asyncio.create_task(parse_response(response))
+                parse_tasks.add(task)
+                task.add_done_callback(parse_tasks.discard)
 
-    for hashtag in social_hashtags:
+        def absorb(batch):
+            nonlocal reached_watermark, ended
+            tweets, batch_ended = batch
+            ended = ended or batch_ended
+            new_tweets = 0
+            for tweet in tweets:
+                tweet_id = tweet.get("id")
+                numeric_id = snowflake(tweet_id)
+                if watermark is not None and numeric_id is not None and numeric_id <= watermark:
+                    # The live timeline is newest first: everything below is already ingested
+                    reached_watermark = True
+                    continue
+                if ceiling is not None and numeric_id is not None and numeric_id > ceiling:
+                    # Already collected by the poll that left this window open
+                    continue
+                if tweet_id and tweet_id not in unique_tweets:
+                    unique_tweets[tweet_id] = tweet
+                    new_tweets += 1
+            return new_tweets
+
+        page.on("response", intercept_response)
         try:
-            print(f"\nSearching for hashtag: {hashtag}")
-            tweets = await search_tweets_by_hashtag(hashtag, max_tweets=30)
+            # Perform search
+            search_url = f"{self.base_url}/search?q={encoded_hashtag}&src=typed_query&f=live"
+            print(f"Searching for hashtag: {hashtag}")
+            await page.goto(search_url)
+            await page.wait_for_selector('article', timeout=30000)
+
+            # The first page may already reach since_id; check it before scrolling
+            while not parsed_batches.empty():
+                absorb(parsed_batches.get_nowait())
+
+            idle_scrolls = 0
+            while (len(unique_tweets) < max_tweets and idle_scrolls < MAX_IDLE_SCROLLS
+                   and not reached_watermark and not ended):
+                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+
+                # Wait for the next parsed page of results rather than a fixed sleep
+                new_tweets = 0
+                try:
+                    new_tweets += absorb(await asyncio.wait_for(parsed_batches.get(), timeout=SCROLL_TIMEOUT))
+                    while not parsed_batches.empty():
+                        new_tweets += absorb(parsed_batches.get_nowait())
+                except asyncio.TimeoutError:
+                    pass
+
+                if new_tweets:
+                    idle_scrolls = 0
+                    print(f"Collected {len(unique_tweets)} tweets for #{hashtag}", end="\r")
+                    await asyncio.sleep(random.uniform(*SCROLL_JITTER))
+                else:
+                    idle_scrolls += 1
+                    print(f"\nNo new tweets after scrolling ({idle_scrolls}/{MAX_IDLE_SCROLLS})")
+        finally:
+            page.remove_listener("response", intercept_response)
+            for task in list(parse_tasks):
+                task.cancel()
+
+        complete = None
+        if watermark is not None:
+            # Only the old mark itself or the end of the results prove that nothing
+            # between the oldest tweet collected and since_id was skipped
+            complete = reached_watermark or ended
+            print(f"\n{'Reached' if reached_watermark else 'Did not reach'} since_id {since_id} for #{hashtag} "
+                  f"after {len(unique_tweets)} new tweets")
+        return list(unique_tweets.values())[:max_tweets], complete
+
+# One ScraperSession per process, started on first use and shared by every caller
+# (/search requests, background jobs, scheduled polls). Chromium will not open the
+# persistent profile in two browsers at once, so concurrent searches have to be
+# tabs of this one session, bounded by its max_tabs. Several server processes
+# still each need their own login: use SCRAPER_STORAGE_STATE for those.
+_shared_session = None
+_shared_session_lock = asyncio.Lock()
+
+async def shared_session(max_tabs: int = MAX_TABS) -> ScraperSession:
+    global _shared_session
+    async with _shared_session_lock:
+        if _shared_session is None:
+            session = ScraperSession(max_tabs=max_tabs)
+            try:
+                await session.start()
+            except Exception:
+                await session.close()
+                raise
+            _shared_session = session
+            # A crashed or closed browser is replaced on the next call
+            session.context.on("close", lambda _: _forget_shared_session(session))
+        return _shared_session
+
+def _forget_shared_session(session):
+    global _shared_session
+    if _shared_session is session:
+        _shared_session = None
+
+async def close_shared_session():
+    global _shared_session
+    async with _shared_session_lock:
+        if _shared_session is not None:
+            await _shared_session.close()
+            _shared_session = None
+
+# Main search function (single hashtag, own browser session)
+async def search_tweets_by_hashtag(hashtag: str, max_tweets: int = 100) -> List[Dict]:
+    async with ScraperSession(max_tabs=1) as session:
+        return await session.search(hashtag, max_tweets)
+
+# Scrape several hashtags with one shared browser, yielding
+# (hashtag, tweets, error, complete) as each search completes. windows
+# (hashtag -> (since_id, max_id)) limits each search to tweets newer than since_id
+# and at most max_id; see ScraperSession.search_window for complete. With session
+# (e.g. shared_session()) the searches run as tabs of that already started
+# browser instead of a new one.
+async def scrape_hashtags(hashtags: List[str], max_tweets: int = 30, max_tabs: int = MAX_TABS,
+                          windows: Optional[Dict[str, Tuple[Optional[str], Optional[str]]]] = None,
+                          session: Optional[ScraperSession] = None):
+    if session is not None:
+        async for hashtag, tweets, error, complete in session.search_many(hashtags, max_tweets, windows):
             print(f"Found {len(tweets)} tweets for #{hashtag}")
+            yield hashtag, tweets, error, complete
+        return
 
-            if tweets:
-                all_tweets_by_hashtag[hashtag] = tweets
+    async with ScraperSession(max_tabs=max_tabs) as session:
+        async for hashtag, tweets, error, complete in session.search_many(hashtags, max_tweets, windows):
+            print(f"Found {len(tweets)} tweets for #{hashtag}")
+            yield hashtag, tweets, error, complete
 
-            delay = random.uniform(5, 10)
-            print(f"Waiting {delay:.1f} seconds before next search...")
-            await asyncio.sleep(delay)
+async def scrape_tweets(htag:str):
+    all_tweets_by_hashtag = {}
 
-        except Exception as e:
-            print(f"Error processing hashtag {hashtag}: {e}")
+    async for hashtag, tweets, error, _ in scrape_hashtags([htag], max_tweets=30):
+        if tweets:
+            all_tweets_by_hashtag[hashtag] = tweets
 
     if all_tweets_by_hashtag:
         with open("all_social_issue_tweets.json", "w", encoding="utf-8") as f:
             json.dump(all_tweets_by_hashtag, f, ensure_ascii=False, indent=2)
-            return all_tweets_by_hashtag[htag]
         print(f"\nSaved tweets for all hashtags to all_social_issue_tweets.json")
+        return all_tweets_by_hashtag[htag]
     else:
         print("\nNo tweets were collected.")
+        return []
 
 if __name__ == "__main__":
-    asyncio.run(scrape_tweets())
+    import argparse
+    parser = argparse.ArgumentParser(description="Scrape tweets for one or more hashtags")
+    parser.add_argument("hashtags", nargs="*", default=["publictransport"])
+    parser.add_argument("--save-storage-state", metavar="PATH",
+                        help="log in with a headed browser and save the session for SCRAPER_STORAGE_STATE")
+    args = parser.parse_args()
+
+    async def _main():
+        if args.save_storage_state:
+            async with ScraperSession(lean=False, storage_state=None) as session:
+                await session.save_storage_state(args.save_storage_state)
+                print(f"Saved storage state to {args.save_storage_state}")
+            return
+        async for hashtag, tweets, error, _ in scrape_hashtags(args.hashtags):
+            print(f"#{hashtag}: {len(tweets)} tweets" + (f" (error: {error})" if error else ""))
+
+    asyncio.run(_main())
@@ -0,0 +1,186 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import analysis_cache
+import sentiment_module
+from analysis_cache import cached_analyze_feedback_batch
+from utils.tweet_utils import parse_twitter_timestamp
+
+# Process-pool side of the mongodb.py bulk loader.
+# Workers only analyse: each one loads the models once in its initializer, turns
+# a chunk of tweets into per-hashtag documents and hands them back together with
+# its analysis cache counters; the parent owns the MongoDB connection and does
+# all writes, checkpointing and stats.
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "1"))
+# torch intra-op threads per worker; defaults to an even split of the cores
+INGEST_WORKER_THREADS = os.getenv("INGEST_WORKER_THREADS")
+
+
+def hashtag_keywords(tweet):
+    """
+    Normalised keywords a tweet is stored under; tweets without hashtags go to 'general'
+    """
+    hashtags = tweet.get("tagged_hashtags") or ["general"]
+    keywords = []
+    for hashtag in hashtags:
+        clean_tag = hashtag.strip("#").lower()
+        if clean_tag not in keywords:
+            keywords.append(clean_tag)
+    return keywords
+
+
+def build_documents(tweet, analysis, version):
+    """
+    Fan one analysed tweet out to its per-hashtag tweet and analysis documents
+    Returns:
+        List of (keyword, tweet_doc, analysis_doc)
+    """
+    tweet_timestamp = parse_twitter_timestamp(tweet["created_at"])
+
+    # Format topic scores, highest first
+    formatted_topic_scores = [
+        {"name": topic, "score": round(score * 100)}
+        for topic, score in analysis.get("topic_scores", {}).items()
+    ]
+    formatted_topic_scores.sort(key=lambda x: x["score"], reverse=True)
+
+    documents = []
+    for clean_tag in hashtag_keywords(tweet):
+        tweet_doc = {
+            "keyword": clean_tag,
+            "tweets": {
+                "timestamp": tweet_timestamp,
+                "text": tweet["text"],
+                "translated_text": analysis.get("translated_text"),
+                "translation_version": sentiment_module.translation_version(),
+                "favourite_count": tweet.get("favorite_count", 0),
+                "id": tweet["id"],
+                "retweet_count": tweet.get("retweet_count", 0),
+                "follower_count": tweet.get("user", {}).get("followers_count", 0),
+                "verified": tweet.get("user", {}).get("verified", False)
+            }
+        }
+        analysis_doc = {
+            "keyword": clean_tag,
+            "sentiment": analysis["sentiment"],
+            "sentiment_tier": analysis.get("sentiment_tier"),
+            "urgency": analysis["urgency"],
+            "urgency_reason": analysis["urgency_reason"],
+            "topic": analysis["topic"],
+            "topic_scores": formatted_topic_scores,
+            "topic_source": analysis.get("topic_source"),
+            "priority_score": analysis["priority_score"],
+            "language": analysis.get("language"),
+            "language_source": analysis.get("language_source"),
+            "timestamp": tweet_timestamp,
+            "tweet_id": tweet["id"],
+            "analysis_version": version
+        }
+        documents.append((clean_tag, tweet_doc, analysis_doc))
+    return documents
+
+
+def analyse_chunk(tweets, version, translations=None):
+    """
+    Analyse each tweet once and build all of its per-hashtag documents
+    Args:
+        tweets: Validated, de-duplicated tweets
+        version: analysis_version() of the parent, stamped on every analysis doc
+        translations: Stored text -> translated_text still valid for this run
+    Returns:
+        Tuple (list of (keyword, tweet_doc, analysis_doc), analysis cache counters
+        of this chunk); the cache lives in the worker, so the parent sums these
+    """
+    if translations:
+        sentiment_module.remember_translations(translations)
+    before = analysis_cache.cache.snapshot()
+    analyses = cached_analyze_feedback_batch([tweet["text"] for tweet in tweets],
+                                             [tweet.get("language") for tweet in tweets])
+    after = analysis_cache.cache.snapshot()
+    documents = []
+    for tweet, analysis in zip(tweets, analyses):
+        documents.extend(build_documents(tweet, analysis, version))
+    return documents, {name: after[name] - before[name] for name in analysis_cache.COUNTERS}
+
+
+def init_worker(threads):
+    # Split the cores between workers instead of letting every process use all of them
+    if threads:
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+    sentiment_module.warm_up()
+
+
+def make_executor(workers, threads=None):
+    """
+    Process pool whose workers load the analysis models once at start-up
+    Args:
+        workers: Number of worker processes
+        threads: torch threads per worker (default: cpu_count // workers)
+    Returns:
+        ProcessPoolExecutor
+    """
+    if threads is None:
+        threads = int(INGEST_WORKER_THREADS) if INGEST_WORKER_THREADS else max(1, (os.cpu_count() or 1) // workers)
+    # spawn, not fork: the parent holds a MongoClient and possibly a SQLite
+    # cache connection, neither of which survives a fork
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=init_worker, initargs=(threads,))
+
+
+class Checkpoint:
+    """
+    Set of completed chunk indices persisted to a JSON state file
+    Args:
+        path: State file location
+        fingerprint: Dict describing the run (source, batch size, analysis
+                     version); a state file written for a different run is ignored
+    """
+
+    def __init__(self, path, fingerprint):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.completed = set()
+        self.resumed = False
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable checkpoint {path}: {e}")
+            return
+        if state.get("fingerprint") == fingerprint:
+            self.completed = set(state.get("completed", []))
+            self.resumed = bool(self.completed)
+        else:
+            print(f"Checkpoint {path} belongs to a different run, starting over")
+
+    def is_done(self, index):
+        return index in self.completed
+
+    def mark(self, index):
+        self.completed.add(index)
+        self._save()
+
+    def _save(self):
+        # Write-then-rename so a crash never leaves a truncated state file
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "completed": sorted(self.completed)}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.completed = set()
+        self.resumed = False
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,317 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+# Background scrape -> analyse -> store jobs.
+# POST /jobs enqueues a hashtag search in a SQLite file (JOBS_DB) and returns at
+# once. JOB_WORKERS asyncio workers claim queued jobs, run them through the
+# injected runner and record progress and every analysed tweet, which
+# GET /jobs/{id} polls.
+#
+# At most one job per hashtag can be queued or running: a partial unique index
+# on the normalised hashtag makes a duplicate submission return the job already
+# in flight, also across processes sharing the file. Running jobs heartbeat.
+# A job whose process died goes back to the queue once its heartbeat is older
+# than JOB_STALE_SECONDS.
+
+JOBS_DB = os.getenv("JOBS_DB", os.path.join(os.path.expanduser("~"), ".cache", "civicpulse", "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "30"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "300"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_JOB_COLUMNS = ["id", "hashtag", "status", "created_at", "started_at", "finished_at", "progress", "error",
+                "since_id", "max_id", "incremental"]
+# Columns added after the first release of the jobs table
+_ADDED_COLUMNS = {"since_id": "TEXT", "max_id": "TEXT", "incremental": "INTEGER NOT NULL DEFAULT 0"}
+
+
+def job_key(hashtag):
+    # "#Potholes", "potholes" and " potholes " are the same search
+    return hashtag.strip().lstrip("#").lower()
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat() if timestamp else None
+
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+class JobStore:
+    """
+    SQLite-backed job queue with per-job progress and results
+    Args:
+        db_path: SQLite file (":memory:" for a per-process queue)
+    """
+
+    def __init__(self, db_path=JOBS_DB):
+        self._lock = threading.Lock()
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, hashtag TEXT NOT NULL, key TEXT NOT NULL, status TEXT NOT NULL,
+                created_at REAL NOT NULL, started_at REAL, finished_at REAL, heartbeat REAL,
+                progress TEXT, error TEXT, since_id TEXT, max_id TEXT, incremental INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_key ON jobs (key) WHERE status IN ('queued', 'running');
+            CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+            CREATE TABLE IF NOT EXISTS job_results (
+                job_id TEXT NOT NULL, seq INTEGER NOT NULL, priority_score REAL, data TEXT NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            );
+        """)
+        existing = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        for column, definition in _ADDED_COLUMNS.items():
+            if column not in existing:
+                self._db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+        self._db.commit()
+
+    def _row(self, job_id):
+        row = self._db.execute(f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(_JOB_COLUMNS, row))
+        for column in ("created_at", "started_at", "finished_at"):
+            job[column] = _iso(job[column])
+        job["progress"] = json.loads(job["progress"]) if job["progress"] else {}
+        job["incremental"] = bool(job["incremental"])
+        return job
+
+    def enqueue(self, hashtag, since_id=None, max_id=None, incremental=False):
+        """
+        Queue a search for hashtag unless one is already queued or running
+        Args:
+            hashtag: Hashtag to search (with or without "#")
+            since_id: Only collect tweets newer than this tweet id
+            max_id: Only collect tweets up to this tweet id (resuming a cut-off poll)
+            incremental: Advance the hashtag's watermark when the job succeeds
+        Returns:
+            Tuple (job dict, created) where created is False for a duplicate
+        """
+        hashtag = hashtag.strip().lstrip("#")
+        with self._lock:
+            try:
+                job_id = uuid.uuid4().hex
+                self._db.execute("INSERT INTO jobs (id, hashtag, key, status, created_at, since_id, max_id, incremental) "
+                                 "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                 (job_id, hashtag, job_key(hashtag), QUEUED, time.time(), since_id, max_id,
+                                  int(incremental)))
+                self._db.commit()
+                return self._row(job_id), True
+            except sqlite3.IntegrityError:
+                self._db.rollback()
+                (job_id,) = self._db.execute("SELECT id FROM jobs WHERE key = ? AND status IN (?, ?)",
+                                             (job_key(hashtag), QUEUED, RUNNING)).fetchone()
+                return self._row(job_id), False
+
+    def claim(self):
+        """
+        Mark the oldest queued job as running
+        Returns:
+            The job dict, or None when the queue is empty
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            row = self._db.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                                   (QUEUED,)).fetchone()
+            if row is None:
+                self._db.rollback()
+                return None
+            now = time.time()
+            self._db.execute("UPDATE jobs SET status = ?, started_at = ?, heartbeat = ? WHERE id = ?",
+                             (RUNNING, now, now, row[0]))
+            self._db.commit()
+            return self._row(row[0])
+
+    def heartbeat(self, job_id):
+        with self._lock:
+            self._db.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time(), job_id))
+            self._db.commit()
+
+    def set_progress(self, job_id, progress):
+        with self._lock:
+            self._db.execute("UPDATE jobs SET progress = ?, heartbeat = ? WHERE id = ?",
+                             (json.dumps(progress), time.time(), job_id))
+            self._db.commit()
+
+    def add_results(self, job_id, documents):
+        """
+        Append analysed tweets to a job's results
+        """
+        if not documents:
+            return
+        with self._lock:
+            (start,) = self._db.execute("SELECT COUNT(*) FROM job_results WHERE job_id = ?", (job_id,)).fetchone()
+            self._db.executemany(
+                "INSERT INTO job_results (job_id, seq, priority_score, data) VALUES (?, ?, ?, ?)",
+                [(job_id, start + i, doc.get("priority_score"), json.dumps(doc, default=_json_default, ensure_ascii=False))
+                 for i, doc in enumerate(documents)]
+            )
+            self._db.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time(), job_id))
+            self._db.commit()
+
+    def finish(self, job_id, error=None):
+        with self._lock:
+            self._db.execute("UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                             (FAILED if error else DONE, time.time(), error, job_id))
+            self._db.commit()
+
+    def requeue(self, job_id):
+        # Partial results are dropped and recorded again by the re-run; the
+        # tweet upserts behind it are idempotent
+        with self._lock:
+            self._db.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
+            self._db.execute("UPDATE jobs SET status = ?, started_at = NULL WHERE id = ? AND status = ?",
+                             (QUEUED, job_id, RUNNING))
+            self._db.commit()
+
+    def requeue_stale(self, max_age=JOB_STALE_SECONDS):
+        """
+        Return running jobs whose worker stopped heartbeating to the queue
+        Returns:
+            Number of jobs requeued
+        """
+        with self._lock:
+            stale = [row[0] for row in self._db.execute(
+                "SELECT id FROM jobs WHERE status = ? AND heartbeat < ?", (RUNNING, time.time() - max_age))]
+        for job_id in stale:
+            self.requeue(job_id)
+        return len(stale)
+
+    def get(self, job_id, offset=0, limit=None, priority_threshold=None):
+        """
+        A job with the results recorded from offset on
+        Args:
+            job_id: Job id returned by enqueue
+            offset: First result sequence number to return (next_offset of the previous poll)
+            limit: Maximum number of results (None for all)
+            priority_threshold: Only return results with at least this priority_score
+        Returns:
+            Job dict with results and next_offset, or None for an unknown id
+        """
+        with self._lock:
+            job = self._row(job_id)
+            if job is None:
+                return None
+            query = "SELECT seq, data FROM job_results WHERE job_id = ? AND seq >= ?"
+            params = [job_id, offset]
+            if priority_threshold is not None:
+                query += " AND priority_score >= ?"
+                params.append(priority_threshold)
+            query += " ORDER BY seq"
+            if limit is not None:
+                query += " LIMIT ?"
+                params.append(limit)
+            rows = self._db.execute(query, params).fetchall()
+            (total,) = self._db.execute("SELECT COUNT(*) FROM job_results WHERE job_id = ?", (job_id,)).fetchone()
+        job["results"] = [json.loads(data) for _, data in rows]
+        # With a limit, resume after the last row returned; otherwise everything was read
+        job["next_offset"] = rows[-1][0] + 1 if rows and limit is not None and len(rows) == limit else total
+        job["result_count"] = total
+        return job
+
+
+class JobQueue:
+    """
+    Pool of asyncio workers draining a JobStore
+    Args:
+        store: JobStore holding the queue
+        runner: Callable(job) -> async iterator of search_events-style events:
+                "tweet" (data stored as a result), "progress" / "summary" (data
+                stored as progress) and "error" (recorded; the job ends failed)
+        workers: Number of jobs run concurrently by this process
+        poll_interval: Seconds between queue polls when idle (jobs queued by
+                       other processes are picked up within this delay)
+    """
+
+    def __init__(self, store, runner, workers=JOB_WORKERS, poll_interval=JOB_POLL_INTERVAL,
+                 heartbeat_interval=JOB_HEARTBEAT_INTERVAL):
+        self.store = store
+        self.runner = runner
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._wake = asyncio.Event()
+        self._tasks = []
+
+    def start(self):
+        requeued = self.store.requeue_stale()
+        if requeued:
+            print(f"Requeued {requeued} stale jobs")
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, hashtag, since_id=None, max_id=None, incremental=False):
+        """
+        Enqueue a hashtag search (deduplicated against jobs in flight)
+        Returns:
+            Tuple (job dict, created)
+        """
+        job, created = self.store.enqueue(hashtag, since_id, max_id, incremental)
+        if created:
+            self._wake.set()
+        return job, created
+
+    async def _work(self):
+        while True:
+            job = await asyncio.to_thread(self.store.claim)
+            if job is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.run(job)
+
+    async def _heartbeat(self, job_id):
+        # Scraping can go minutes without an event (login wait, slow scrolling)
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            await asyncio.to_thread(self.store.heartbeat, job_id)
+
+    async def run(self, job):
+        """
+        Run one claimed job to completion, recording its events
+        """
+        print(f"Job {job['id']} started for hashtag: {job['hashtag']}")
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+        errors = []
+        try:
+            async for event in self.runner(job):
+                if event["type"] == "tweet":
+                    await asyncio.to_thread(self.store.add_results, job["id"], [event["data"]])
+                elif event["type"] in ("progress", "summary"):
+                    await asyncio.to_thread(self.store.set_progress, job["id"], event["data"])
+                elif event["type"] == "error":
+                    errors.append(event["error"])
+        except asyncio.CancelledError:
+            # Shutting down: let the next worker start the job over
+            self.store.requeue(job["id"])
+            raise
+        except Exception as e:
+            errors.append(str(e))
+        finally:
+            heartbeat.cancel()
+        await asyncio.to_thread(self.store.finish, job["id"], "; ".join(errors) or None)
+        print(f"Job {job['id']} {'failed' if errors else 'finished'} for hashtag: {job['hashtag']}")
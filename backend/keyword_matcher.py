@@ -0,0 +1,100 @@
+import json
+import re
+
+# Single-pass, word-boundary-aware keyword matcher for urgency and topic detection.
+# Keywords are indexed by their first token, so the cost per text depends on the
+# number of tokens in the text, not on how many keywords are configured.
+# A keyword ending in "*" matches any word starting with it ("electric*" matches
+# "electricity"); multi-word keywords ("water supply") match consecutive words.
+
+# \w misses Indic combining vowel signs, so include the Devanagari..Sinhala blocks
+# (Hindi, Kannada, ...) explicitly to keep words like "पानी" in one token.
+_token = re.compile(r"[\w\u0900-\u0DFF]+")
+
+URGENT = "urgent"
+
+
+def tokenize(text):
+    return _token.findall(text.casefold())
+
+
+class KeywordMatcher:
+    def __init__(self, urgent_keywords, topic_keywords):
+        """
+        Args:
+            urgent_keywords: List of urgency keywords
+            topic_keywords: Dict of topic -> list of keywords
+        """
+        self.topics = list(topic_keywords)
+        # first token -> list of (tokens, keyword, labels), longest phrases first
+        self._phrases = {}
+        # word prefix -> list of (keyword, labels)
+        self._prefixes = {}
+        self._max_prefix = 0
+
+        labels_by_keyword = {}
+        for keyword in urgent_keywords:
+            labels_by_keyword.setdefault(keyword, set()).add(URGENT)
+        for topic, keywords in topic_keywords.items():
+            for keyword in keywords:
+                labels_by_keyword.setdefault(keyword, set()).add(topic)
+
+        for keyword, labels in labels_by_keyword.items():
+            if keyword.endswith("*"):
+                prefix = keyword[:-1].casefold()
+                self._prefixes.setdefault(prefix, []).append((keyword, labels))
+                self._max_prefix = max(self._max_prefix, len(prefix))
+                continue
+            tokens = tuple(tokenize(keyword))
+            if tokens:
+                self._phrases.setdefault(tokens[0], []).append((tokens, keyword, labels))
+        for candidates in self._phrases.values():
+            candidates.sort(key=lambda candidate: len(candidate[0]), reverse=True)
+
+    def match(self, text):
+        """
+        Find every urgent and topic keyword in one pass over the text
+        Args:
+            text: Text to scan
+        Returns:
+            Tuple (urgent_terms, topic_counts): matched urgency keywords in order
+            of appearance, and topic -> number of distinct keywords matched
+        """
+        tokens = tokenize(text)
+        seen = set()
+        urgent_terms = []
+        topic_counts = dict.fromkeys(self.topics, 0)
+
+        def record(keyword, labels):
+            if keyword in seen:
+                return
+            seen.add(keyword)
+            for label in labels:
+                if label == URGENT:
+                    urgent_terms.append(keyword)
+                else:
+                    topic_counts[label] += 1
+
+        for i, token in enumerate(tokens):
+            for phrase, keyword, labels in self._phrases.get(token, ()):
+                if tuple(tokens[i:i + len(phrase)]) == phrase:
+                    record(keyword, labels)
+            if self._prefixes:
+                for end in range(1, min(len(token), self._max_prefix) + 1):
+                    for keyword, labels in self._prefixes.get(token[:end], ()):
+                        record(keyword, labels)
+
+        return urgent_terms, topic_counts
+
+
+def load_keyword_config(path):
+    """
+    Load keyword lists from a JSON file
+    Args:
+        path: JSON file of the form {"urgent": [...], "topics": {"topic": [...]}}
+    Returns:
+        Tuple (urgent_keywords, topic_keywords)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    return config.get("urgent", []), config.get("topics", {})
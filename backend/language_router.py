@@ -0,0 +1,148 @@
+import os
+import re
+from collections import Counter
+
+import model_registry
+
+# Language routing for the translation stage. Each text is decided by the
+# cheapest path that can answer:
+#
+#   source    language reported by Twitter (legacy.lang), unless undetermined
+#   script    the Unicode script of the letters: Indic blocks map to their
+#             language, pure ASCII letters to English
+#   detector  batched statistical detector: fastText lid.176 when
+#             LANGUAGE_ID_MODEL points at it, otherwise seeded langdetect
+#
+# A text no path can decide (emoji only, detector failure) gets language None
+# and path "undetermined"; it is treated as English downstream.
+
+SOURCE = "source"
+SCRIPT = "script"
+DETECTOR = "detector"
+UNDETERMINED = "undetermined"
+
+# Twitter's codes for "no linguistic content" (media, hashtags, mentions, ...)
+UNDETERMINED_CODES = {"und", "qme", "qht", "qam", "qst", "qct", "zxx", "art"}
+
+# Optional fastText language-id model (lid.176.bin / lid.176.ftz)
+LANGUAGE_ID_MODEL = os.getenv("LANGUAGE_ID_MODEL")
+
+# Indic Unicode blocks, 0x80 code points each from U+0900
+INDIC_BLOCKS = ["hi", "bn", "pa", "gu", "or", "ta", "te", "kn", "ml"]
+INDIC_START = 0x0900
+INDIC_END = INDIC_START + 0x80 * len(INDIC_BLOCKS)
+
+# URLs, mentions and hashtags say nothing about the language of the text
+_noise = re.compile(r"https?://\S+|[@#]\w+")
+
+
+def script_language(text):
+    """
+    Decide the language from the script of the letters alone
+    Args:
+        text: Tweet text
+    Returns:
+        Language code, or None when the script is mixed or not covered
+    """
+    ascii_letters = 0
+    other_letters = 0
+    indic = Counter()
+    for ch in _noise.sub(" ", text):
+        if ch.isascii():
+            if ch.isalpha():
+                ascii_letters += 1
+            continue
+        code_point = ord(ch)
+        if INDIC_START <= code_point < INDIC_END:
+            indic[INDIC_BLOCKS[(code_point - INDIC_START) // 0x80]] += 1
+        elif ch.isalpha():
+            other_letters += 1
+
+    if other_letters:
+        # Accented Latin, Arabic, CJK, ...: leave it to the detector
+        return None
+    if indic:
+        # Indic text with some English words mixed in still needs translation
+        language, count = indic.most_common(1)[0]
+        return language if count >= ascii_letters else None
+    return "en" if ascii_letters else None
+
+
+def _load_detector():
+    if LANGUAGE_ID_MODEL:
+        import fasttext
+        model = fasttext.load_model(LANGUAGE_ID_MODEL)
+
+        def detect(texts):
+            labels, _ = model.predict([text.replace("\n", " ") for text in texts], k=1)
+            return [label[0].replace("__label__", "") if label else None for label in labels]
+        return detect
+
+    from langdetect import DetectorFactory, detect as langdetect_detect
+    # langdetect is randomised; a fixed seed makes repeated runs agree
+    DetectorFactory.seed = 0
+
+    def detect(texts):
+        languages = []
+        for text in texts:
+            try:
+                languages.append(langdetect_detect(text))
+            except Exception:
+                languages.append(None)
+        return languages
+    return detect
+
+model_registry.register("language_detector", _load_detector)
+
+
+def detect_batch(texts):
+    """
+    Run the fallback detector over a batch of texts
+    Returns:
+        Language codes in input order; None where detection failed
+    """
+    if not texts:
+        return []
+    try:
+        return model_registry.get("language_detector")(list(texts))
+    except Exception as e:
+        print(f"Language detection failed: {e}")
+        return [None] * len(texts)
+
+
+def route_batch(texts, source_languages=None):
+    """
+    Decide the language of each text by the cheapest path that can answer
+    Args:
+        texts: Texts to route
+        source_languages: Optional languages reported by the source, aligned with texts
+    Returns:
+        List of (language, path) tuples in input order
+    """
+    texts = list(texts)
+    source_languages = list(source_languages) if source_languages is not None else [None] * len(texts)
+    routes = [None] * len(texts)
+    undecided = []
+    for i, (text, source_language) in enumerate(zip(texts, source_languages)):
+        if source_language and source_language not in UNDETERMINED_CODES:
+            routes[i] = (source_language, SOURCE)
+            continue
+        stripped = _noise.sub(" ", text)
+        if not any(ch.isalpha() for ch in stripped):
+            routes[i] = (None, UNDETERMINED)
+            continue
+        language = script_language(stripped)
+        if language is not None:
+            routes[i] = (language, SCRIPT)
+        else:
+            undecided.append((i, stripped))
+
+    # Only what neither shortcut could decide reaches the detector, in one batch
+    detected = detect_batch([stripped for _, stripped in undecided])
+    for (i, _), language in zip(undecided, detected):
+        routes[i] = (language, DETECTOR) if language else (None, UNDETERMINED)
+    return routes
+
+
+def route(text, source_language=None):
+    return route_batch([text], [source_language])[0]
@@ -1,9 +1,12 @@
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
 # Import CORSMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 # Import pymongo and datetime
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateMany
 from datetime import datetime, timezone # Import timezone
 from dotenv import load_dotenv
 import os
@@ -11,11 +14,23 @@ import os
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 # Import the analysis function
-from sentiment_module import analyze_feedback
+from sentiment_module import warm_up, analysis_version, translation_version, remember_translations
+from analysis_cache import cached_analyze_feedback_batch, cache as analysis_cache
 import re # Import re for regex matching
 import json
 import random
-from hashtagger import scrape_tweets
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from hashtagger import close_shared_session, scrape_hashtags, shared_session
+from bulk_writer import BulkWriter
+from indexes import ensure_indexes
+from pagination import FILTER_SORT, encode_cursor, keyset_query
+from stats import format_stats, parse_time, stats_match, stats_pipeline
+from rollups import ROLLUP_COLLECTION, merge_series, rollup_updates, trend_query
+from utils.tweet_utils import build_tweet_doc
+from near_dedup import NearDuplicateIndex
+from jobs import JobQueue, JobStore
+from scheduler import SCHEDULED_MAX_TWEETS, WATERMARK_COLLECTION, HashtagScheduler, load_watermarks, watermark_update
 load_dotenv()
 
 # Get the password from the environment variables
@@ -39,132 +54,478 @@ db = client["sample_mflix"] # Database name - TODO: Consider renaming db if not
 tweets_collection = db["tweets"] # Collection name - TODO: Ensure this collection exists and has tweet data
 logs_collection = db["logs"] # Collection name for logs
 analysis_collection = db["analysis"] # Collection for analysis results
+rollup_collection = db[ROLLUP_COLLECTION] # Hourly per-hashtag/topic rollups behind /trends
+watermark_collection = db[WATERMARK_COLLECTION] # Newest ingested tweet per hashtag, for incremental polls
+
+# Load the analysis models once per worker at startup instead of at import time.
+# Set WARM_UP_MODELS=0 to defer loading to the first request (e.g. during --reload development).
+WARM_UP_MODELS = os.getenv("WARM_UP_MODELS", "1") == "1"
+
+@app.on_event("startup")
+def load_models():
+    if WARM_UP_MODELS:
+        warm_up()
+
+# Unique tweet_id index backing the idempotent upserts in /search
+@app.on_event("startup")
+def create_indexes():
+    try:
+        ensure_indexes(db)
+    except Exception as e:
+        # ensure_indexes reports failures of individual indexes itself; this is
+        # e.g. the database being unreachable
+        print(f"Could not ensure indexes: {e}")
+
+# Inference runs on a bounded thread pool so the event loop keeps serving other
+# requests. At most ANALYSIS_MAX_PENDING batches may be queued or running; further
+# /search calls wait for a slot (backpressure) instead of piling onto the pool.
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "2"))
+ANALYSIS_MAX_PENDING = int(os.getenv("ANALYSIS_MAX_PENDING", "8"))
+analysis_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis")
+analysis_slots = asyncio.Semaphore(ANALYSIS_MAX_PENDING)
+
+async def analyze_in_executor(texts, languages=None):
+    async with analysis_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(analysis_executor, cached_analyze_feedback_batch, texts, languages)
+
+# Near-duplicate clusters: only one representative per cluster is analysed.
+# Set NEAR_DEDUP=0 to analyse every tweet. The SQLite index is opened at startup,
+# not on import, so importing main (e.g. in tests) creates no files.
+NEAR_DEDUP = os.getenv("NEAR_DEDUP", "1") == "1"
+dedup_index = None
+
+@app.on_event("startup")
+def open_dedup_index():
+    global dedup_index
+    if NEAR_DEDUP and dedup_index is None:
+        dedup_index = NearDuplicateIndex()
+
+def assign_clusters(tweets):
+    if dedup_index is None:
+        # Every tweet is its own cluster
+        return [(tweet.get("id") or None, tweet["text"]) for tweet in tweets]
+    return [(a.cluster_id, a.representative_text)
+            for a in dedup_index.assign([(tweet.get("id"), tweet["text"]) for tweet in tweets])]
+
+def cluster_sizes(cluster_ids):
+    if dedup_index is None:
+        return {}
+    return dedup_index.sizes([cluster_id for cluster_id in cluster_ids if cluster_id])
+
+# Propagate grown cluster sizes to members stored earlier
+def update_cluster_sizes(sizes):
+    updates = [UpdateMany({"cluster_id": cluster_id}, {"$set": {"cluster_size": size}})
+               for cluster_id, size in sizes.items() if size > 1]
+    if updates:
+        try:
+            tweets_collection.bulk_write(updates, ordered=False)
+        except Exception as e:
+            print(f"Could not update cluster sizes: {e}")
+
+# Fold stored tweets into the hourly rollups; replaced holds the previous
+# versions of re-analysed tweets, whose contribution is subtracted
+def update_rollups(stored, replaced):
+    updates = rollup_updates(stored, replaced)
+    if updates:
+        try:
+            rollup_collection.bulk_write(updates, ordered=False)
+        except Exception as e:
+            print(f"Could not update rollups: {e}")
+
+# Move the hashtag's watermark after an incremental scrape whose tweets were all stored:
+# up to the newest tweet when the scrape reached the old mark, otherwise record or
+# narrow the window still to be scraped
+def advance_watermark(hashtag, tweets, since_id, max_id, complete):
+    update = watermark_update(hashtag, tweets, since_id, max_id, complete)
+    if update is not None:
+        try:
+            watermark_collection.bulk_write([update])
+        except Exception as e:
+            print(f"Could not advance watermark for {hashtag}: {e}")
+
+@app.on_event("shutdown")
+def shutdown_executors():
+    analysis_executor.shutdown(wait=False, cancel_futures=True)
 
 # Define the request body model
 class SearchRequest(BaseModel):
     hashtags: List[str]
     priority_threshold: int
+    # Stream results as they are analysed: "ndjson" or "sse". None returns one JSON body.
+    stream: Optional[str] = None
 
-# Updated search route to scrape tweets and store them
-@app.post("/search")
-async def search(request: SearchRequest):
+# Tweets analysed per micro-batch when streaming /search results
+SEARCH_STREAM_BATCH_SIZE = int(os.getenv("SEARCH_STREAM_BATCH_SIZE", "8"))
+# Tweets scraped per hashtag by /search
+SEARCH_MAX_TWEETS = 30
+
+# Already-stored /search documents for the given tweet ids, keyed by tweet_id
+def find_existing_tweets(tweet_ids):
+    if not tweet_ids:
+        return {}
+    return {doc["tweet_id"]: doc for doc in tweets_collection.find({"tweet_id": {"$in": tweet_ids}})}
+
+# Scrape -> analyse -> store pipeline behind /search, as an async generator of events:
+#   {"type": "tweet", "hashtag", "data"}        analysed tweet at or above the threshold
+#   {"type": "write_error", "hashtag", "data"}  tweet that could not be stored
+#   {"type": "error", "hashtag", "error"}       hashtag that failed entirely
+#   {"type": "summary", "data"}                 final record with counts
+#   {"type": "progress", "hashtag", "data"}     running counts (only with progress=True)
+# Tweets are analysed and stored in micro-batches of batch_size (None = whole hashtag).
+# With windows (hashtag -> (since_id, max_id); since_id is None for a first poll) the
+# scrape is incremental: each listed hashtag only collects tweets inside its window
+# and its watermark moves once all of them are stored.
+async def search_events(request, batch_size=None, progress=False, windows=None, max_tweets=SEARCH_MAX_TWEETS):
     print("Search endpoint accessed")
+    # Tweets and log entries are buffered and written with bulk writes
+    tweet_writer = BulkWriter(tweets_collection)
+    log_writer = BulkWriter(logs_collection)
+
     # Log the request
     timestamp = datetime.now(timezone.utc)
-    log_entry = {
+    log_writer.add({
         "timestamp": timestamp,
         "event": "Search endpoint accessed",
         "request_body": request.model_dump_json()  # Log the request payload
-    }
-    logs_collection.insert_one(log_entry)
-    print("Request logged in logs_collection")
+    })
 
-    results_data = []
-    print("Initialized results_data")
+    summary = {"hashtags": len(request.hashtags), "scraped": 0, "analysed": 0, "deduplicated": 0,
+               "reused": 0, "returned": 0, "write_errors": 0, "failed_hashtags": 0}
 
-    # Process each hashtag
-    for hashtag in request.hashtags:
-        print(f"Processing hashtag: {hashtag}")
-        try:
-            # Scrape tweets for the hashtag
-            tweets = await scrape_tweets(hashtag)
-            print(f"Scraped {len(tweets)} tweets for hashtag: {hashtag}")
-
-            # Process each tweet
-            for tweet in tweets:
-                print(f"Processing tweet: {tweet.get('id', 'unknown')}")
-                # Extract tweet text
-                tweet_text = tweet.get("text", "")
-                if not tweet_text:
-                    print("Tweet text is empty, skipping")
-                    continue
-
-                # Analyze the tweet text
-                analysis = analyze_feedback(tweet_text)
-                print(f"Analysis result: {analysis}")
-
-                # Create document for MongoDB insertion
-                tweet_doc = {
-                    "keywords": tweet.get("tagged_hashtags", []),
-                    "sentiment": analysis["sentiment"],
-                    "urgency": analysis["urgency"],
-                    "urgency_reason": analysis["urgency_reason"],
-                    "topic": analysis["topic"],
-                    "topic_scores": [
-                        {"name": topic, "score": score}
-                        for topic, score in analysis["topic_scores"].items()
-                    ] if isinstance(analysis["topic_scores"], dict) else analysis["topic_scores"],
-                    "priority_score": analysis["priority_score"],
-                    "timestamp": datetime.strptime(tweet.get("created_at", timestamp.isoformat()),
-                                                   "%a %b %d %H:%M:%S %z %Y")
-                    if "created_at" in tweet else timestamp,
-                    "tweet_id": tweet.get("id", ""),
-                    "text": tweet_text  # Store the original tweet text
-                }
-                print(f"Prepared tweet_doc: {tweet_doc}")
-
-                # Insert into MongoDB
-                result = tweets_collection.insert_one(tweet_doc)
-                print(f"Inserted tweet into tweets_collection with ID: {result.inserted_id}")
-
-                # Add to results if it meets the priority threshold
-                if tweet_doc["priority_score"] >= request.priority_threshold:
-                    tweet_doc["_id"] = str(result.inserted_id)
-                    results_data.append(tweet_doc)
-                    print(f"Tweet added to results_data: {tweet_doc}")
+    if progress:
+        yield {"type": "progress", "hashtag": None, "data": {**summary, "stage": "scraping"}}
 
-        except Exception as e:
-            print(f"Error processing hashtag {hashtag}: {str(e)}")
-            # Log the error
-            error_log = {
-                "timestamp": datetime.now(timezone.utc),
-                "event": "Search error",
-                "hashtag": hashtag,
-                "error": str(e)
-            }
-            logs_collection.insert_one(error_log)
-            print(f"Error logged in logs_collection: {error_log}")
+    # Counts, logs and reports a hashtag that produced no results
+    def hashtag_failed(hashtag, error):
+        summary["failed_hashtags"] += 1
+        log_writer.add({
+            "timestamp": datetime.now(timezone.utc),
+            "event": "Search error",
+            "hashtag": hashtag,
+            "error": str(error)
+        })
+        return {"type": "error", "hashtag": hashtag, "error": str(error)}
+
+    # Hashtags not yet processed, reported as failed if the browser itself fails
+    remaining = list(request.hashtags)
+    try:
+        # Scrape all hashtags concurrently in one browser; process each as it completes
+        # Searches are tabs of the process-wide browser, so /search, jobs and scheduled
+        # polls can run at the same time on one logged-in profile
+        session = await shared_session()
+        async for hashtag, tweets, scrape_error, complete in scrape_hashtags(request.hashtags, max_tweets=max_tweets,
+                                                                             windows=windows, session=session):
+            remaining.remove(hashtag)
+            print(f"Processing hashtag: {hashtag}")
+            try:
+                if scrape_error is not None:
+                    raise scrape_error
+                print(f"Scraped {len(tweets)} tweets for hashtag: {hashtag}")
+                summary["scraped"] += len(tweets)
+                scraped = tweets
+                failed_writes = 0
+
+                # Drop tweets without text
+                tweets = [tweet for tweet in tweets if tweet.get("text", "")]
+
+                # Tweets already stored with an up-to-date analysis are reused as-is
+                existing = await run_in_threadpool(find_existing_tweets, [tweet["id"] for tweet in tweets if tweet.get("id")])
+                # Resolving the version may load the topics model on the first request
+                version = await run_in_threadpool(analysis_version)
+                reused = [existing[tweet["id"]] for tweet in tweets
+                          if existing.get(tweet.get("id"), {}).get("analysis_version") == version]
+                tweets = [tweet for tweet in tweets
+                          if existing.get(tweet.get("id"), {}).get("analysis_version") != version]
+                print(f"Reusing {len(reused)} stored tweets for hashtag: {hashtag}")
+                summary["reused"] += len(reused)
+
+                # Stale tweets still carry a usable translation when only other models changed
+                remember_translations({
+                    doc["text"]: doc.get("translated_text")
+                    for doc in (existing.get(tweet.get("id")) for tweet in tweets) if doc
+                    if doc.get("translation_version") == translation_version()
+                })
+
+                for tweet_doc in reused:
+                    if tweet_doc.get("priority_score", 0) >= request.priority_threshold:
+                        tweet_doc["_id"] = str(tweet_doc["_id"])
+                        summary["returned"] += 1
+                        yield {"type": "tweet", "hashtag": hashtag, "data": tweet_doc}
+
+                # Group near-duplicates (templated complaints, retweets) into clusters
+                clusters = await run_in_threadpool(assign_clusters, tweets)
+
+                step = batch_size or max(len(tweets), 1)
+                for start in range(0, len(tweets), step):
+                    batch = tweets[start:start + step]
+                    batch_clusters = clusters[start:start + step]
+
+                    # Analyse one representative text per cluster, off the event loop
+                    representatives = {}
+                    for tweet, (cluster_id, representative_text) in zip(batch, batch_clusters):
+                        representatives.setdefault(cluster_id or id(tweet), (representative_text, tweet.get("language")))
+                    keys = list(representatives)
+                    analyses = await analyze_in_executor([representatives[key][0] for key in keys],
+                                                         [representatives[key][1] for key in keys])
+                    by_cluster = dict(zip(keys, analyses))
+                    sizes = await run_in_threadpool(cluster_sizes, keys)
+                    print(f"Analysed {len(analyses)} cluster representatives for {len(batch)} tweets for hashtag: {hashtag}")
+                    summary["analysed"] += len(analyses)
+                    summary["deduplicated"] += len(batch) - len(analyses)
+
+                    # Buffer upserts keyed on tweet_id, remembering which ones should be returned
+                    written = []
+                    matching = []
+                    for tweet, (cluster_id, representative_text) in zip(batch, batch_clusters):
+                        analysis = by_cluster[cluster_id or id(tweet)]
+                        tweet_doc = build_tweet_doc(tweet, analysis, timestamp, version, translation_version(),
+                                                    cluster_id, sizes.get(cluster_id, 1))
+                        if tweet["text"] != representative_text:
+                            # The representative's language and translation describe another
+                            # text; storing them would later seed the memo with a wrong translation
+                            tweet_doc.update(translated_text=None, translation_version=None,
+                                             language=None, language_source=None)
+                        if tweet_doc["tweet_id"]:
+                            index = tweet_writer.upsert({"tweet_id": tweet_doc["tweet_id"]}, tweet_doc)
+                        else:
+                            index = tweet_writer.add(tweet_doc)
+                        written.append((index, tweet_doc))
+                        if tweet_doc["priority_score"] >= request.priority_threshold:
+                            matching.append((index, tweet_doc))
+
+                    # One bulk round-trip per chunk instead of one per tweet
+                    report = await run_in_threadpool(tweet_writer.flush)
+                    await run_in_threadpool(update_cluster_sizes, sizes)
+                    # Count new tweets; swap the old analysis for the new one on re-analysed tweets
+                    matched = set(report["matched"])
+                    stored = [doc for index, doc in written
+                              if index in report["inserted_ids"] or (index in matched and doc["tweet_id"] in existing)]
+                    replaced = [existing[doc["tweet_id"]] for index, doc in written
+                                if index in matched and doc["tweet_id"] in existing]
+                    await run_in_threadpool(update_rollups, stored, replaced)
+                    print(f"Stored {len(report['inserted_ids'])} new and {len(report['matched'])} updated tweets "
+                          f"for hashtag: {hashtag}, {len(report['errors'])} failed")
+
+                    failed = {error["index"]: error for error in report["errors"]}
+                    failed_writes += len(failed)
+                    for index, tweet_doc in matching:
+                        if index in failed:
+                            summary["write_errors"] += 1
+                            yield {"type": "write_error", "hashtag": hashtag,
+                                   "data": {"tweet_id": tweet_doc["tweet_id"], "error": failed[index]["errmsg"]}}
+                            continue
+                        if index in report["inserted_ids"]:
+                            tweet_doc["_id"] = str(report["inserted_ids"][index])
+                        else:
+                            tweet_doc["_id"] = str(existing[tweet_doc["tweet_id"]]["_id"])
+                        summary["returned"] += 1
+                        yield {"type": "tweet", "hashtag": hashtag, "data": tweet_doc}
+
+                    if progress:
+                        yield {"type": "progress", "hashtag": hashtag, "data": {**summary, "stage": "analysing"}}
+
+                if windows is not None and hashtag in windows:
+                    since_id, max_id = windows[hashtag]
+                    if failed_writes:
+                        print(f"Keeping watermark for hashtag: {hashtag}, {failed_writes} tweets were not stored")
+                    else:
+                        if complete is False:
+                            print(f"Stopped before since_id {since_id} for hashtag: {hashtag}; "
+                                  f"the next poll resumes below the oldest tweet collected")
+                        await run_in_threadpool(advance_watermark, hashtag, scraped, since_id, max_id, complete)
+
+            except Exception as e:
+                print(f"Error processing hashtag {hashtag}: {str(e)}")
+                yield hashtag_failed(hashtag, e)
+    except Exception as e:
+        # Browser launch or login failed, or the shared session broke down mid-search
+        print(f"Search failed: {str(e)}")
+        for hashtag in remaining:
+            yield hashtag_failed(hashtag, e)
+    finally:
+        await run_in_threadpool(log_writer.flush)
+
+    print("Search completed")
+    yield {"type": "summary", "data": summary}
+
+# Serialise a search event as an NDJSON line or an SSE message
+def format_search_event(event, stream_format):
+    payload = json.dumps(jsonable_encoder(event), ensure_ascii=False)
+    if stream_format == "sse":
+        return f"event: {event['type']}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+# Updated search route to scrape tweets and store them.
+# With "stream": "ndjson" | "sse" each analysed tweet is sent as soon as it clears
+# the priority threshold, followed by a summary record.
+@app.post("/search")
+async def search(request: SearchRequest):
+    if request.stream in ("ndjson", "sse"):
+        async def stream_events():
+            async for event in search_events(request, batch_size=SEARCH_STREAM_BATCH_SIZE):
+                yield format_search_event(event, request.stream)
+        media_type = "text/event-stream" if request.stream == "sse" else "application/x-ndjson"
+        return StreamingResponse(stream_events(), media_type=media_type)
+
+    results_data = []
+    write_errors = []
+    async for event in search_events(request):
+        if event["type"] == "tweet":
+            results_data.append(event["data"])
+        elif event["type"] == "write_error":
+            write_errors.append(event["data"])
 
     print("Search completed, returning results")
-    return {"success": True, "data": results_data}
+    return {"success": True, "data": results_data, "write_errors": write_errors}
+
+# Background jobs: POST /jobs queues a hashtag search and returns immediately;
+# GET /jobs/{id} polls its status, progress and the tweets stored so far.
+# JOB_WORKERS jobs run concurrently per process; a hashtag already queued or
+# running is not queued again.
+class JobRequest(BaseModel):
+    hashtag: str
+
+# Job runner: the /search pipeline for one hashtag. Every analysed tweet is
+# recorded (threshold 0) so each poll can apply its own priority_threshold.
+# Incremental (scheduled) jobs only scrape the job's (since_id, max_id] window.
+def run_search_job(job):
+    request = SearchRequest(hashtags=[job["hashtag"]], priority_threshold=0)
+    if job["incremental"]:
+        return search_events(request, batch_size=SEARCH_STREAM_BATCH_SIZE, progress=True,
+                             windows={job["hashtag"]: (job["since_id"], job["max_id"])},
+                             max_tweets=SCHEDULED_MAX_TWEETS)
+    return search_events(request, batch_size=SEARCH_STREAM_BATCH_SIZE, progress=True)
 
-# Route to filter tweets based on priority_threshold
+# The SQLite job store is opened at startup, not on import, so importing main
+# (e.g. in tests) creates no files
+job_queue = None
+# Polls SCHEDULED_HASHTAGS (comma-separated) every SCHEDULE_INTERVAL seconds
+hashtag_scheduler = None
+
+@app.on_event("startup")
+async def start_job_workers():
+    global job_queue, hashtag_scheduler
+    job_queue = JobQueue(JobStore(), run_search_job)
+    hashtag_scheduler = HashtagScheduler(job_queue.submit,
+                                         lambda hashtags: load_watermarks(watermark_collection, hashtags))
+    job_queue.start()
+    hashtag_scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    if hashtag_scheduler is not None:
+        await hashtag_scheduler.stop()
+    # Interrupted jobs go back to the queue
+    if job_queue is not None:
+        await job_queue.stop()
+    await close_shared_session()
+
+@app.post("/jobs")
+async def create_job(request: JobRequest):
+    if not request.hashtag.strip().lstrip("#"):
+        return {"success": False, "error": "hashtag is required"}
+    job, created = job_queue.submit(request.hashtag)
+    return {"success": True, "data": {**job, "deduplicated": not created}}
+
+# offset: next_offset from the previous poll, to fetch only new results
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str, offset: int = 0, limit: Optional[int] = None, priority_threshold: Optional[int] = None):
+    job = job_queue.store.get(job_id, offset, limit, priority_threshold)
+    if job is None:
+        return {"success": False, "error": "Job not found"}
+    return {"success": True, "data": job}
+
+# Page size limits for /filter
+FILTER_PAGE_SIZE = int(os.getenv("FILTER_PAGE_SIZE", "100"))
+FILTER_MAX_PAGE_SIZE = 1000
+FILTER_PROJECTION = {"_id": 1, "text": 1, "priority_score": 1, "timestamp": 1, "cluster_size": 1}
+
+# Format a projected tweet for /filter responses
+def format_filtered_tweet(tweet):
+    # Get timestamp (prefer tweet's timestamp if available)
+    tweet_timestamp = tweet.get("timestamp", datetime.now(timezone.utc))
+    if isinstance(tweet_timestamp, datetime):
+        if tweet_timestamp.tzinfo is None:
+            tweet_timestamp = tweet_timestamp.replace(tzinfo=timezone.utc)
+        timestamp_str = tweet_timestamp.isoformat()
+    else:
+        timestamp_str = datetime.now(timezone.utc).isoformat()
+
+    return {
+        "id": str(tweet["_id"]),  # Use MongoDB's unique ID
+        "text": tweet["text"],
+        "priority_score": tweet.get("priority_score"),
+        "timestamp": timestamp_str,
+        "cluster_size": tweet.get("cluster_size", 1),
+    }
+
+# Route to filter tweets based on priority_threshold.
+# Payload: priority_threshold (required), page_size, cursor (next_cursor from the
+# previous page) and format ("json" or "ndjson" to stream every remaining row).
 @app.post("/filter")
 def filter_tweets(payload: dict):
     priority_threshold = payload.get("priority_threshold")
     if priority_threshold is None:
         return {"success": False, "error": "priority_threshold is required"}
 
-    # Query MongoDB for tweets with priority_score >= priority_threshold
-    filtered_tweets = list(tweets_collection.find({"priority_score": {"$gte": priority_threshold}}))
+    try:
+        page_size = max(1, min(int(payload.get("page_size", FILTER_PAGE_SIZE)), FILTER_MAX_PAGE_SIZE))
+        query = keyset_query({"priority_score": {"$gte": priority_threshold}}, payload.get("cursor"))
+    except (TypeError, ValueError) as e:
+        return {"success": False, "error": str(e)}
 
-    # Format the results
-    results_data = []
-    for tweet in filtered_tweets:
-        # Assume tweet is a dictionary-like object with necessary fields
-        tweet_text = tweet.get("text")
-        if not tweet_text:
-            continue  # Skip if no text
-
-        # Get timestamp (prefer tweet's timestamp if available)
-        tweet_timestamp = tweet.get("timestamp", datetime.now(timezone.utc))
-        if isinstance(tweet_timestamp, datetime):
-            if tweet_timestamp.tzinfo is None:
-                tweet_timestamp = tweet_timestamp.replace(tzinfo=timezone.utc)
-            timestamp_str = tweet_timestamp.isoformat()
-        else:
-            timestamp_str = datetime.now(timezone.utc).isoformat()
-
-        # Format the result
-        result_item = {
-            "id": tweet.get("_id"),  # Use MongoDB's unique ID
-            "text": tweet_text,
-            "priority_score": tweet.get("priority_score"),
-            "timestamp": timestamp_str,
-        }
-        results_data.append(result_item)
-
-    return {"success": True, "data": results_data}
+    # Index-backed range scan, sorted in index order, projected to the response fields
+    cursor = tweets_collection.find(query, FILTER_PROJECTION).sort(FILTER_SORT)
+
+    if payload.get("format") == "ndjson":
+        def stream_rows():
+            for tweet in cursor.batch_size(page_size):
+                if tweet.get("text"):
+                    yield json.dumps(format_filtered_tweet(tweet), ensure_ascii=False) + "\n"
+        return StreamingResponse(stream_rows(), media_type="application/x-ndjson")
+
+    # Fetch one extra row to know whether another page exists
+    page = list(cursor.limit(page_size + 1))
+    has_more = len(page) > page_size
+    page = page[:page_size]
+
+    results_data = [format_filtered_tweet(tweet) for tweet in page if tweet.get("text")]
+    next_cursor = encode_cursor(page[-1]) if has_more else None
+    return {"success": True, "data": results_data, "next_cursor": next_cursor}
+
+# Sentiment, urgency, topic and priority-bucket counts for the dashboard charts,
+# computed with one $facet aggregation. Optional filters: hashtag, since/until
+# (ISO-8601, until exclusive) and priority_threshold.
+@app.get("/stats")
+def dashboard_stats(hashtag: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+                    priority_threshold: int = 0):
+    try:
+        match = stats_match(hashtag, parse_time(since), parse_time(until), priority_threshold)
+    except ValueError as e:
+        return {"success": False, "error": f"Invalid time filter: {e}"}
+
+    result = next(tweets_collection.aggregate(stats_pipeline(match)), None)
+    return {"success": True, "data": format_stats(result)}
+
+# Time series of tweet counts, priority sums and sentiment/urgency counts read
+# from the hourly rollups. Optional filters: hashtag (all hashtags by default),
+# topic (all topics by default), since/until (ISO-8601) and granularity ("hour" or "day").
+@app.get("/trends")
+def trends(hashtag: Optional[str] = None, topic: Optional[str] = None, since: Optional[str] = None,
+           until: Optional[str] = None, granularity: str = "hour"):
+    try:
+        query = trend_query(hashtag, topic, parse_time(since), parse_time(until))
+        buckets = rollup_collection.find(query, {"_id": 0}).sort("hour", 1)
+        series = merge_series(buckets, granularity)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+    return {"success": True, "data": series}
+
+# Analysis cache hit/miss counters
+@app.get("/cache/stats")
+def cache_stats():
+    return {"success": True, "data": analysis_cache.snapshot()}
 
 if __name__ == "__main__":
     # Use string "main:app" and add reload=True for auto-reloading on code changes
@@ -0,0 +1,69 @@
+import threading
+import time
+
+# Lazy, thread-safe model registry.
+# Loaders are registered by name and only run on the first get(); every later
+# call in the same process returns the cached instance.
+
+_loaders = {}
+_models = {}
+_locks = {}
+_registry_lock = threading.Lock()
+
+
+def register(name, loader):
+    """
+    Register a zero-argument loader function under a name
+    Args:
+        name: Registry key (e.g. "sentiment")
+        loader: Callable returning the loaded model object
+    """
+    with _registry_lock:
+        _loaders[name] = loader
+        _locks.setdefault(name, threading.Lock())
+
+
+def get(name):
+    """
+    Return the model registered under name, loading it on first use
+    Args:
+        name: Registry key
+    Returns:
+        The loaded model object
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    if name not in _loaders:
+        raise KeyError(f"No model registered under '{name}'")
+
+    # Double-checked locking: only one thread runs the loader
+    with _locks[name]:
+        model = _models.get(name)
+        if model is None:
+            start = time.perf_counter()
+            model = _loaders[name]()
+            _models[name] = model
+            print(f"Loaded model '{name}' in {time.perf_counter() - start:.2f}s")
+    return model
+
+
+def is_loaded(name):
+    return name in _models
+
+
+def warm_up(names):
+    """
+    Eagerly load the given models (e.g. from a FastAPI startup event)
+    Args:
+        names: Iterable of registry keys
+    Returns:
+        Dict of name -> load time in seconds (0 for models already loaded)
+    """
+    timings = {}
+    for name in names:
+        start = time.perf_counter()
+        get(name)
+        timings[name] = time.perf_counter() - start
+    return timings
@@ -1,9 +1,21 @@
-import json
+import argparse
 import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
 from datetime import datetime, timezone
 from pymongo import MongoClient
 from dotenv import load_dotenv
-from sentiment_module import analyze_feedback
+from bulk_writer import BulkWriter
+from indexes import ensure_indexes
+from sentiment_module import analysis_version, translation_version
+from analysis_cache import COUNTERS as CACHE_COUNTERS, with_hit_rate
+from ingest_pool import INGEST_WORKERS, Checkpoint, analyse_chunk, make_executor
+from utils.json_stream import iter_json_records
+
+try:
+    from tqdm import tqdm
+except ImportError:  # optional, falls back to periodic progress lines
+    tqdm = None
 
 # Load environment variables
 load_dotenv()
@@ -16,129 +28,250 @@ tweets_collection = db["tweets"]
 analysis_collection = db["analysis"]
 logs_collection = db["logs"]
 
-# Helper function to parse Twitter timestamp
-def parse_twitter_timestamp(timestamp_str):
-    try:
-        # Parse Twitter's timestamp format
-        dt = datetime.strptime(timestamp_str, "%a %b %d %H:%M:%S %z %Y")
-        return dt
-    except Exception as e:
-        print(f"Error parsing timestamp: {e}")
-        return datetime.now(timezone.utc)
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "all_social_issue_tweets.json")
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+REQUIRED_FIELDS = ("text", "created_at", "id", "tagged_hashtags")
+
+
+# Group a stream of records into indexed lists of at most batch_size
+def iter_batches(records, batch_size):
+    batch = []
+    index = 0
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield index, batch
+            index += 1
+            batch = []
+    if batch:
+        yield index, batch
+
+
+# Fallback progress reporter when tqdm is not installed
+class _PrintProgress:
+    def __init__(self, unit, every=1000):
+        self.unit = unit
+        self.every = every
+        self.n = 0
+        self._last = 0
+        self._start = time.perf_counter()
+
+    def update(self, n):
+        self.n += n
+        if self.n - self._last >= self.every:
+            self._last = self.n
+            rate = self.n / max(time.perf_counter() - self._start, 1e-9)
+            print(f"Processed {self.n} {self.unit} ({rate:.1f} {self.unit}/s)")
+
+    def close(self):
+        pass
+
+
+def progress_bar(unit):
+    if tqdm is not None:
+        return tqdm(unit=unit, unit_scale=True, desc="Ingesting")
+    return _PrintProgress(unit)
+
+
+def select_pending(batch, version):
+    """
+    Validate and de-duplicate a batch, dropping tweets that already have an
+    up-to-date analysis
+    Returns:
+        Tuple (pending tweets, invalid count, up-to-date count, stored
+        translations of the pending tweets that are still valid)
+    """
+    valid = {}
+    invalid = 0
+    for tweet in batch:
+        if not all(key in tweet for key in REQUIRED_FIELDS):
+            invalid += 1
+            continue
+        # A repeated id keeps its first occurrence
+        valid.setdefault(tweet["id"], tweet)
+
+    up_to_date = {
+        doc["tweet_id"]
+        for doc in analysis_collection.find(
+            {"tweet_id": {"$in": list(valid)}, "analysis_version": version}, {"tweet_id": 1}
+        )
+    } if valid else set()
+    pending = [tweet for tweet_id, tweet in valid.items() if tweet_id not in up_to_date]
+
+    # Tweets re-analysed after a sentiment/topic change keep their translation
+    translations = {
+        doc["tweets"]["text"]: doc["tweets"].get("translated_text")
+        for doc in tweets_collection.find(
+            {"tweets.id": {"$in": [tweet["id"] for tweet in pending]},
+             "tweets.translation_version": translation_version()},
+            {"tweets.text": 1, "tweets.translated_text": 1}
+        )
+    } if pending else {}
+    return pending, invalid, len(up_to_date), translations
+
+
+def write_documents(documents, tweet_writer, analysis_writer):
+    """
+    Upsert a chunk's documents; upserts keyed on (keyword, id) keep reloads idempotent
+    Returns:
+        Number of failed writes
+    """
+    for clean_tag, tweet_doc, analysis_doc in documents:
+        tweet_id = tweet_doc["tweets"]["id"]
+        tweet_writer.upsert({"keyword": clean_tag, "tweets.id": tweet_id}, tweet_doc)
+        analysis_writer.upsert({"tweet_id": tweet_id, "keyword": clean_tag}, analysis_doc)
+    failed = 0
+    for report in (tweet_writer.flush(), analysis_writer.flush()):
+        for error in report["errors"]:
+            print(f"Failed to store document {error['index']}: {error['errmsg']}")
+        failed += len(report["errors"])
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a tweet dump (JSON array or NDJSON) into MongoDB")
+    parser.add_argument("source", nargs="?", default=DEFAULT_SOURCE)
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE,
+                        help="tweets analysed and written per chunk")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="operations per bulk_write round-trip")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS,
+                        help="analysis processes (1 analyses in this process)")
+    parser.add_argument("--checkpoint", default=None,
+                        help="state file of completed chunks (default: <source>.checkpoint.json)")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore an existing checkpoint and process every chunk")
+    args = parser.parse_args(argv)
+    source_name = os.path.basename(args.source)
+
+    if not os.path.exists(args.source):
+        print(f"Error reading JSON file: {args.source} not found")
+        return
 
-def main():
     # Log start of upload process
     start_time = datetime.now(timezone.utc)
     log_entry = {
         "timestamp": start_time,
-        "event": "Starting upload of all_social_issue_tweets.json to MongoDB"
+        "event": f"Starting upload of {source_name} to MongoDB"
     }
     logs_collection.insert_one(log_entry)
-    
-    # Read the JSON file
+
+    # Unique indexes make the upserts below idempotent across reloads
     try:
-        with open('/home/shogun/hack/RVU/backend/all_social_issue_tweets.json', 'r') as file:
-            tweets = json.load(file)
-            print(f"Successfully loaded {len(tweets)} tweets from file")
+        ensure_indexes(db)
     except Exception as e:
-        print(f"Error reading JSON file: {e}")
-        return
-    
-    # Process each tweet
-    tweets_processed = 0
-    tweets_stored = 0
-    analyses_stored = 0
-    
-    for tweet in tweets:
-        tweets_processed += 1
-        
-        # Skip if tweet doesn't have required fields
-        if not all(key in tweet for key in ['text', 'created_at', 'id', 'tagged_hashtags']):
-            print(f"Skipping tweet {tweets_processed} - missing required fields")
-            continue
-        
-        # Extract hashtags
-        hashtags = tweet.get('tagged_hashtags', [])
-        if not hashtags:
-            # If no hashtags, create a generic one based on content
-            hashtags = ['general']
-        
-        # Parse timestamp
-        tweet_timestamp = parse_twitter_timestamp(tweet['created_at'])
-        
-        # Process for each hashtag
-        for hashtag in hashtags:
-            clean_tag = hashtag.strip('#').lower()
-            
-            # Store tweet in tweets collection
-            tweet_doc = {
-                "keyword": clean_tag,
-                "tweets": {
-                    "timestamp": tweet_timestamp,
-                    "text": tweet["text"],
-                    "favourite_count": tweet.get("favorite_count", 0),
-                    "id": tweet["id"],
-                    "retweet_count": tweet.get("retweet_count", 0),
-                    "follower_count": tweet.get("user", {}).get("followers_count", 0),
-                    "verified": tweet.get("user", {}).get("verified", False)
-                }
-            }
-            
-            # Insert tweet
-            tweet_result = tweets_collection.insert_one(tweet_doc)
-            tweets_stored += 1
-            
-            # Analyze the tweet
-            analysis = analyze_feedback(tweet["text"])
-            
-            # Format topic scores
-            formatted_topic_scores = [
-                {"name": topic, "score": round(score * 100)}
-                for topic, score in analysis.get('topic_scores', {}).items()
-            ]
-            
-            # Sort topic scores descending
-            formatted_topic_scores.sort(key=lambda x: x['score'], reverse=True)
-            
-            # Store analysis in analysis collection
-            analysis_doc = {
-                "keyword": clean_tag,
-                "sentiment": analysis['sentiment'],
-                "urgency": analysis['urgency'],
-                "urgency_reason": analysis['urgency_reason'],
-                "topic": analysis['topic'],
-                "topic_scores": formatted_topic_scores,
-                "priority_score": analysis['priority_score'],
-                "timestamp": tweet_timestamp,
-                "tweet_id": tweet["id"]
-            }
-            
-            analysis_result = analysis_collection.insert_one(analysis_doc)
-            analyses_stored += 1
-        
-        # Print progress every 10 tweets
-        if tweets_processed % 10 == 0:
-            print(f"Processed {tweets_processed} tweets")
-    
+        print(f"Could not ensure indexes: {e}")
+
+    version = analysis_version()
+    writer_options = {"keep_results": False}
+    if args.chunk_size:
+        writer_options["chunk_size"] = args.chunk_size
+    tweet_writer = BulkWriter(tweets_collection, **writer_options)
+    analysis_writer = BulkWriter(analysis_collection, **writer_options)
+
+    # Chunk i is always the same slice of the same file, so completed indices
+    # stay valid across restarts as long as source, batch size and models match
+    source_stat = os.stat(args.source)
+    checkpoint = Checkpoint(args.checkpoint or f"{args.source}.checkpoint.json", {
+        "source": os.path.abspath(args.source),
+        "size": source_stat.st_size,
+        "mtime": source_stat.st_mtime,
+        "batch_size": args.batch_size,
+        "analysis_version": version,
+    })
+    if args.restart:
+        checkpoint.clear()
+    elif checkpoint.resumed:
+        print(f"Resuming: {len(checkpoint.completed)} chunks already done")
+
+    metrics = {"tweets_processed": 0, "tweets_resumed": 0, "tweets_invalid": 0,
+               "tweets_skipped": 0, "tweets_analysed": 0, "chunks_failed": 0}
+    progress = progress_bar("tweets")
+    executor = make_executor(args.workers) if args.workers > 1 else None
+    in_flight = {}
+    # Analysis cache counters summed over chunks: with --workers > 1 every worker
+    # has its own cache and this process's stays empty
+    cache_counts = dict.fromkeys(CACHE_COUNTERS, 0)
+
+    def finish(index, size, result):
+        documents, counts = result
+        for name, count in counts.items():
+            cache_counts[name] += count
+        # Only a chunk whose writes all succeeded is checkpointed; a restart retries the rest
+        if write_documents(documents, tweet_writer, analysis_writer):
+            metrics["chunks_failed"] += 1
+        else:
+            checkpoint.mark(index)
+        metrics["tweets_processed"] += size
+        progress.update(size)
+
+    def drain(return_when):
+        done, _ = wait(in_flight, return_when=return_when)
+        for future in done:
+            index, size = in_flight.pop(future)
+            finish(index, size, future.result())
+
+    completed = False
+    try:
+        for index, batch in iter_batches(iter_json_records(args.source), args.batch_size):
+            if checkpoint.is_done(index):
+                metrics["tweets_resumed"] += len(batch)
+                progress.update(len(batch))
+                continue
+
+            pending, invalid, up_to_date, translations = select_pending(batch, version)
+            metrics["tweets_invalid"] += invalid
+            metrics["tweets_skipped"] += up_to_date
+            metrics["tweets_analysed"] += len(pending)
+
+            if executor is None:
+                finish(index, len(batch), analyse_chunk(pending, version, translations) if pending else ([], {}))
+                continue
+            in_flight[executor.submit(analyse_chunk, pending, version, translations)] = (index, len(batch))
+            # Bound the chunks held in memory while workers catch up
+            if len(in_flight) >= args.workers * 2:
+                drain(FIRST_COMPLETED)
+
+        while in_flight:
+            drain(FIRST_COMPLETED)
+        completed = True
+    except Exception as e:
+        print(f"Ingestion stopped: {e}; rerun to resume from {checkpoint.path}")
+    finally:
+        progress.close()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    # A clean run needs no checkpoint; the analysis_version check covers reruns
+    if completed and not metrics["chunks_failed"]:
+        checkpoint.clear()
+
     # Log completion
     end_time = datetime.now(timezone.utc)
     duration = (end_time - start_time).total_seconds()
-    
+    tweets_stored = tweet_writer.counts["inserted"] + tweet_writer.counts["matched"]
+    analyses_stored = analysis_writer.counts["inserted"] + analysis_writer.counts["matched"]
+
     log_entry = {
         "timestamp": end_time,
-        "event": "Completed upload of all_social_issue_tweets.json",
+        "event": f"{'Completed' if completed else 'Interrupted'} upload of {source_name}",
         "metrics": {
-            "tweets_processed": tweets_processed,
+            **metrics,
             "tweets_stored": tweets_stored,
             "analyses_stored": analyses_stored,
-            "duration_seconds": duration
+            "write_errors": tweet_writer.counts["errors"] + analysis_writer.counts["errors"],
+            "workers": args.workers,
+            "duration_seconds": duration,
+            "tweets_per_second": metrics["tweets_processed"] / duration if duration else None,
+            "analysis_cache": with_hit_rate(cache_counts)
         }
     }
     logs_collection.insert_one(log_entry)
-    
-    print(f"Upload complete! Processed {tweets_processed} tweets, stored {tweets_stored} tweet documents and {analyses_stored} analysis documents in {duration:.2f} seconds")
+
+    print(f"Upload {'complete' if completed else 'interrupted'}! Processed {metrics['tweets_processed']} tweets "
+          f"({metrics['tweets_resumed']} from earlier runs, {metrics['tweets_skipped']} already up to date, "
+          f"{metrics['tweets_invalid']} missing fields), analysed {metrics['tweets_analysed']}, stored "
+          f"{tweets_stored} tweet documents and {analyses_stored} analysis documents in {duration:.2f} seconds")
 
 if __name__ == "__main__":
     main()
-
-
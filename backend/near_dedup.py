@@ -0,0 +1,172 @@
+import hashlib
+import os
+import re
+import sqlite3
+import struct
+import threading
+from collections import namedtuple
+
+from keyword_matcher import tokenize
+
+# Near-duplicate clustering of tweets with MinHash signatures and an LSH index.
+# Templated complaints and "RT @user:" copies land in one cluster. Only the
+# cluster's representative text is analysed, and its size is stored with every
+# member ("N citizens reported this").
+#
+# Signatures are NUM_PERM MinHash values over word trigrams. They are split into
+# BANDS bands, and two texts become candidates when any band matches exactly. A
+# candidate joins a cluster only when the estimated Jaccard similarity with the
+# representative reaches DEDUP_THRESHOLD. The index lives in SQLite
+# (DEDUP_INDEX_DB), so clusters carry over between runs; set it to ":memory:"
+# to keep it per process.
+
+DEDUP_INDEX_DB = os.getenv("DEDUP_INDEX_DB", os.path.join(os.path.expanduser("~"), ".cache", "civicpulse", "dedup_index.sqlite3"))
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.7"))
+NUM_PERM = 64
+BANDS = 16
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Fixed permutation coefficients so signatures are stable across runs
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.sha256(f"a{i}".encode()).digest()[:8], "big") % (_MERSENNE_PRIME - 1) + 1,
+     int.from_bytes(hashlib.sha256(f"b{i}".encode()).digest()[:8], "big") % _MERSENNE_PRIME)
+    for i in range(NUM_PERM)
+]
+
+# Retweet prefixes, URLs and mentions differ between copies of the same complaint
+_noise = re.compile(r"^rt\s+@\w+:?|https?://\S+|@\w+", re.IGNORECASE)
+
+Assignment = namedtuple("Assignment", ["cluster_id", "representative_text", "new_cluster"])
+
+
+def shingles(text):
+    """
+    Word trigrams of the normalised text (the whole token list for short texts)
+    """
+    tokens = tokenize(_noise.sub(" ", text))
+    if len(tokens) <= SHINGLE_SIZE:
+        return {" ".join(tokens)}
+    return {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    """
+    MinHash signature of a text
+    Returns:
+        Tuple of NUM_PERM ints
+    """
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "big")
+              for shingle in shingles(text)]
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def similarity(signature, other):
+    # Share of equal MinHash values estimates the Jaccard similarity
+    return sum(x == y for x, y in zip(signature, other)) / len(signature)
+
+
+def band_keys(signature):
+    rows = len(signature) // BANDS
+    return [f"{band}:{hashlib.blake2b(struct.pack(f'>{rows}I', *signature[band * rows:(band + 1) * rows]), digest_size=8).hexdigest()}"
+            for band in range(BANDS)]
+
+
+class NearDuplicateIndex:
+    """
+    Persistent MinHash LSH index of tweet clusters
+    Args:
+        db_path: SQLite file (":memory:" for a per-process index)
+        threshold: Minimum estimated Jaccard similarity to join a cluster
+    """
+
+    def __init__(self, db_path=DEDUP_INDEX_DB, threshold=DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS clusters (
+                id TEXT PRIMARY KEY, representative_text TEXT NOT NULL,
+                signature BLOB NOT NULL, size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bands (band_key TEXT NOT NULL, cluster_id TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS bands_key ON bands (band_key);
+            CREATE TABLE IF NOT EXISTS members (tweet_id TEXT PRIMARY KEY, cluster_id TEXT NOT NULL);
+        """)
+        self._db.commit()
+
+    def _find_cluster(self, signature, keys):
+        placeholders = ",".join("?" * len(keys))
+        rows = self._db.execute(
+            f"SELECT DISTINCT c.id, c.representative_text, c.signature FROM bands b "
+            f"JOIN clusters c ON c.id = b.cluster_id WHERE b.band_key IN ({placeholders})", keys
+        ).fetchall()
+        best = None
+        for cluster_id, representative_text, packed in rows:
+            score = similarity(signature, struct.unpack(f">{NUM_PERM}I", packed))
+            if score >= self.threshold and (best is None or score > best[0]):
+                best = (score, cluster_id, representative_text)
+        return best
+
+    def assign(self, items):
+        """
+        Put each tweet into its near-duplicate cluster, creating clusters as needed
+        Args:
+            items: List of (tweet_id, text); tweets without an id are clustered
+                   too, but may be counted again when seen in a later run
+        Returns:
+            List of Assignment(cluster_id, representative_text, new_cluster)
+        """
+        assignments = []
+        with self._lock:
+            for tweet_id, text in items:
+                if tweet_id:
+                    row = self._db.execute(
+                        "SELECT c.id, c.representative_text FROM members m JOIN clusters c ON c.id = m.cluster_id "
+                        "WHERE m.tweet_id = ?", (tweet_id,)
+                    ).fetchone()
+                    if row:
+                        # Seen before: same cluster, size unchanged
+                        assignments.append(Assignment(row[0], row[1], False))
+                        continue
+
+                signature = minhash(text)
+                keys = band_keys(signature)
+                match = self._find_cluster(signature, keys)
+                if match is not None:
+                    _, cluster_id, representative_text = match
+                    self._db.execute("UPDATE clusters SET size = size + 1 WHERE id = ?", (cluster_id,))
+                    assignments.append(Assignment(cluster_id, representative_text, False))
+                else:
+                    cluster_id = tweet_id or hashlib.sha1(text.encode("utf-8")).hexdigest()
+                    self._db.execute("INSERT OR IGNORE INTO clusters (id, representative_text, signature, size) "
+                                     "VALUES (?, ?, ?, 1)",
+                                     (cluster_id, text, struct.pack(f">{NUM_PERM}I", *signature)))
+                    self._db.executemany("INSERT INTO bands (band_key, cluster_id) VALUES (?, ?)",
+                                         [(key, cluster_id) for key in keys])
+                    assignments.append(Assignment(cluster_id, text, True))
+                if tweet_id:
+                    self._db.execute("INSERT OR IGNORE INTO members (tweet_id, cluster_id) VALUES (?, ?)",
+                                     (tweet_id, cluster_id))
+            self._db.commit()
+        return assignments
+
+    def sizes(self, cluster_ids):
+        """
+        Current size of each cluster
+        Returns:
+            Dict of cluster_id -> number of tweets assigned to it
+        """
+        cluster_ids = list(set(cluster_ids))
+        if not cluster_ids:
+            return {}
+        with self._lock:
+            placeholders = ",".join("?" * len(cluster_ids))
+            return dict(self._db.execute(f"SELECT id, size FROM clusters WHERE id IN ({placeholders})",
+                                         cluster_ids).fetchall())
@@ -0,0 +1,67 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+
+# Keyset (cursor) pagination over tweets sorted by
+# priority_score desc, timestamp desc, _id desc.
+# The cursor is the sort key of the last row of the previous page, so every page
+# is an index range scan no matter how deep the client pages.
+
+FILTER_SORT = [("priority_score", -1), ("timestamp", -1), ("_id", -1)]
+
+
+def encode_cursor(doc):
+    """
+    Opaque cursor pointing just after doc
+    Args:
+        doc: Last document of the current page (needs priority_score, timestamp, _id)
+    Returns:
+        URL-safe base64 string
+    """
+    timestamp = doc.get("timestamp")
+    payload = {
+        "p": doc.get("priority_score"),
+        "t": timestamp.isoformat() if isinstance(timestamp, datetime) else None,
+        "id": str(doc["_id"]),
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """
+    Inverse of encode_cursor
+    Returns:
+        Tuple (priority_score, timestamp or None, ObjectId)
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        timestamp = datetime.fromisoformat(payload["t"]) if payload["t"] else None
+        return payload["p"], timestamp, ObjectId(payload["id"])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def keyset_query(query, cursor):
+    """
+    Restrict query to rows strictly after cursor in FILTER_SORT order
+    Args:
+        query: Base Mongo filter
+        cursor: Cursor string from encode_cursor, or None for the first page
+    Returns:
+        New Mongo filter
+    """
+    if not cursor:
+        return query
+    priority, timestamp, last_id = decode_cursor(cursor)
+    after = [
+        {"priority_score": {"$lt": priority}},
+        {"priority_score": priority, "_id": {"$lt": last_id}, "timestamp": timestamp},
+    ]
+    if timestamp is not None:
+        # Missing/null timestamps sort after every real one
+        after.insert(1, {"priority_score": priority, "timestamp": {"$lt": timestamp}})
+        after.insert(2, {"priority_score": priority, "timestamp": None})
+    return {"$and": [query, {"$or": after}]}
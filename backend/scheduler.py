@@ -0,0 +1,156 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from jobs import job_key
+from utils.tweet_utils import parse_twitter_timestamp, snowflake
+
+# Scheduled incremental polling of civic hashtags.
+# Every SCHEDULE_INTERVAL seconds each hashtag in SCHEDULED_HASHTAGS is queued
+# as an incremental job, carrying its high-water mark: the newest tweet id (and
+# created_at) below which every tweet is ingested. The scraper stops scrolling as
+# soon as the live timeline reaches that id, so a poll costs roughly the number
+# of new tweets rather than max_tweets. Marks advance only after an incremental
+# run stored every tweet of the hashtag, so a failed write is retried next poll.
+#
+# A burst can hit SCHEDULED_MAX_TWEETS before the scroll reaches the mark, and
+# idle scrolls, rate limits or timeouts can stop it early too. Unless the scroll
+# saw the mark or the end of the results, the mark stays put and the watermark
+# records the missing window (gap_max_id, just below the oldest tweet collected)
+# and the newest tweet collected (gap_newest_id). Following polls scroll only
+# that window, via the max_id: search operator, lowering gap_max_id until the
+# window is exhausted. The mark then jumps to gap_newest_id and normal polling
+# resumes.
+
+SCHEDULED_HASHTAGS = [tag.strip().lstrip("#") for tag in os.getenv("SCHEDULED_HASHTAGS", "").split(",") if tag.strip()]
+SCHEDULE_INTERVAL = float(os.getenv("SCHEDULE_INTERVAL", "900"))
+# Upper bound for one incremental poll (the watermark normally stops it much earlier)
+SCHEDULED_MAX_TWEETS = int(os.getenv("SCHEDULED_MAX_TWEETS", "200"))
+WATERMARK_COLLECTION = "watermarks"
+
+
+def newest_tweet(tweets):
+    """
+    Tweet with the largest snowflake id, or None when no tweet has a numeric id
+    """
+    dated = [tweet for tweet in tweets if snowflake(tweet.get("id")) is not None]
+    return max(dated, key=lambda tweet: snowflake(tweet["id"])) if dated else None
+
+
+def oldest_tweet(tweets):
+    """
+    Tweet with the smallest snowflake id, or None when no tweet has a numeric id
+    """
+    dated = [tweet for tweet in tweets if snowflake(tweet.get("id")) is not None]
+    return min(dated, key=lambda tweet: snowflake(tweet["id"])) if dated else None
+
+
+def watermark_update(hashtag, tweets, since_id=None, max_id=None, complete=None):
+    """
+    Watermark change after an incremental scrape of hashtag
+    Args:
+        hashtag: Hashtag that was scraped
+        tweets: Tweets collected (all stored)
+        since_id: Watermark the scrape started from (None for a first poll)
+        max_id: Upper bound of the gap window scraped, None for a normal poll
+        complete: Whether the scrape reached since_id (ScraperSession.search_window)
+    Returns:
+        pymongo UpdateOne, or None when there is nothing to record
+    """
+    newest, oldest = newest_tweet(tweets), oldest_tweet(tweets)
+    key = {"_id": job_key(hashtag)}
+    stamp = {"hashtag": hashtag, "updated_at": datetime.now(timezone.utc)}
+    # Ids are stored as int64 so $max / $min compare numerically
+    if max_id is not None:
+        if complete is not False:
+            # Window exhausted: everything up to the newest tweet of the burst is in
+            return UpdateOne(key, [
+                {"$set": {**stamp, "since_id": {"$max": ["$since_id", "$gap_newest_id"]}}},
+                {"$unset": ["gap_max_id", "gap_newest_id"]},
+            ])
+        if oldest is None:
+            return None
+        return UpdateOne(key, {"$min": {"gap_max_id": snowflake(oldest["id"]) - 1}, "$set": stamp})
+
+    if newest is None:
+        return None
+    if since_id is not None and complete is False:
+        # Cut off before since_id: keep the mark, remember the window still to scrape
+        return UpdateOne(key, {"$set": {**stamp, "gap_max_id": snowflake(oldest["id"]) - 1,
+                                        "gap_newest_id": snowflake(newest["id"])}}, upsert=True)
+    raise_to = {"since_id": snowflake(newest["id"])}
+    if newest.get("created_at"):
+        raise_to["newest_created_at"] = parse_twitter_timestamp(newest["created_at"])
+    return UpdateOne(key, {"$max": raise_to, "$set": stamp}, upsert=True)
+
+
+def load_watermarks(collection, hashtags):
+    """
+    Current scrape windows
+    Returns:
+        Dict of hashtag -> (since_id, max_id) strings; max_id is None unless a
+        gap is being filled. Hashtags without a watermark are left out.
+    """
+    marks = {doc["_id"]: doc for doc in collection.find({"_id": {"$in": [job_key(tag) for tag in hashtags]}},
+                                                       {"since_id": 1, "gap_max_id": 1})}
+    windows = {}
+    for tag in hashtags:
+        doc = marks.get(job_key(tag))
+        if doc and doc.get("since_id") is not None:
+            gap = doc.get("gap_max_id")
+            windows[tag] = (str(doc["since_id"]), str(gap) if gap is not None else None)
+    return windows
+
+
+class HashtagScheduler:
+    """
+    Periodically queues incremental jobs for a fixed set of hashtags
+    Args:
+        submit: Callable(hashtag, since_id, max_id, incremental=True) -> (job, created),
+                i.e. JobQueue.submit; a hashtag still in flight is not queued again
+        watermarks: Callable(hashtags) -> {hashtag: (since_id, max_id)}
+        hashtags: Hashtags to poll
+        interval: Seconds between polls
+    """
+
+    def __init__(self, submit, watermarks, hashtags=SCHEDULED_HASHTAGS, interval=SCHEDULE_INTERVAL):
+        self.submit = submit
+        self.watermarks = watermarks
+        self.hashtags = list(hashtags)
+        self.interval = interval
+        self._task = None
+
+    def start(self):
+        if self.hashtags:
+            print(f"Polling {', '.join(self.hashtags)} every {self.interval:.0f}s")
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def poll(self):
+        """
+        Queue one incremental job per hashtag
+        Returns:
+            List of (hashtag, job, created)
+        """
+        windows = await asyncio.to_thread(self.watermarks, self.hashtags)
+        queued = []
+        for hashtag in self.hashtags:
+            since_id, max_id = windows.get(hashtag, (None, None))
+            job, created = self.submit(hashtag, since_id, max_id, incremental=True)
+            queued.append((hashtag, job, created))
+        return queued
+
+    async def _loop(self):
+        while True:
+            try:
+                for hashtag, job, created in await self.poll():
+                    if not created:
+                        print(f"Skipping scheduled poll for {hashtag}: job {job['id']} still {job['status']}")
+            except Exception as e:
+                print(f"Scheduled poll failed: {e}")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,316 @@
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+# Record/replay of raw SearchTimeline payloads, so the scraper and the whole
+# scrape -> analyse -> store pipeline can run without a live Twitter session.
+#
+# Fixtures live in <fixture_dir>/<hashtag>/<n>.json.gz, one file per timeline
+# response, in the order they were captured. They are written by ScraperSession
+# when SCRAPER_RECORD_DIR (or record_dir=) is set, or synthesised from parsed
+# tweets with `python scrape_replay.py synthesize`.
+
+TWEETS_PER_PAGE = 20
+TIMELINE_PATH = "/i/api/graphql/replay/SearchTimeline"
+
+# Fixture file names are nanosecond timestamps, kept strictly increasing
+_last_name = 0
+_name_lock = threading.Lock()
+
+
+def _hashtag_dir(fixture_dir, hashtag):
+    return os.path.join(fixture_dir, hashtag.lstrip("#").lower())
+
+
+def save_payload(fixture_dir, hashtag, data):
+    """
+    Store one raw timeline payload as a gzip-compressed JSON fixture
+    Args:
+        fixture_dir: Root fixture directory
+        hashtag: Hashtag the payload was captured for
+        data: Decoded JSON body of the response
+    Returns:
+        Path of the written file
+    """
+    directory = _hashtag_dir(fixture_dir, hashtag)
+    os.makedirs(directory, exist_ok=True)
+    global _last_name
+    with _name_lock:
+        _last_name = max(time.time_ns(), _last_name + 1)
+        name = _last_name
+    path = os.path.join(directory, f"{name}.json.gz")
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    return path
+
+
+def load_payloads(fixture_dir, hashtag):
+    """
+    Load the recorded payloads for a hashtag in capture order
+    """
+    directory = _hashtag_dir(fixture_dir, hashtag)
+    if not os.path.isdir(directory):
+        return []
+    payloads = []
+    for name in sorted(os.listdir(directory), key=lambda name: int(name.split(".")[0])):
+        with gzip.open(os.path.join(directory, name), "rt", encoding="utf-8") as f:
+            payloads.append(json.load(f))
+    return payloads
+
+
+def list_hashtags(fixture_dir):
+    return sorted(name for name in os.listdir(fixture_dir) if os.path.isdir(os.path.join(fixture_dir, name)))
+
+
+def empty_timeline():
+    return {"data": {"search_by_raw_query": {"search_timeline": {"timeline": {"instructions": []}}}}}
+
+
+def timeline_entry(tweet):
+    """
+    Inverse of hashtagger.parse_tweet for the fields it reads
+    """
+    legacy = {
+        "created_at": tweet.get("created_at"),
+        "entities": {
+            "urls": [{"expanded_url": url} for url in tweet.get("attached_urls") or []],
+            "media": [{"media_url_https": url} for url in tweet.get("attached_media") or []],
+            "user_mentions": [{"screen_name": name} for name in tweet.get("tagged_users") or []],
+            "hashtags": [{"text": tag} for tag in tweet.get("tagged_hashtags") or []],
+        },
+        "favorite_count": tweet.get("favorite_count"),
+        "reply_count": tweet.get("reply_count"),
+        "retweet_count": tweet.get("retweet_count"),
+        "full_text": tweet.get("text"),
+        "lang": tweet.get("language"),
+        "user_id_str": tweet.get("user_id"),
+        "id_str": tweet.get("id"),
+        "conversation_id_str": tweet.get("conversation_id") or tweet.get("id"),
+    }
+    result = {"legacy": legacy, "views": {"count": tweet.get("views")}}
+    user = tweet.get("user")
+    if user:
+        result["core"] = {"user_results": {"result": {"legacy": {
+            "id_str": user.get("id"),
+            "name": user.get("name"),
+            "screen_name": user.get("screen_name"),
+            "description": user.get("description"),
+            "followers_count": user.get("followers_count"),
+            "friends_count": user.get("friends_count"),
+            "statuses_count": user.get("statuses_count"),
+            "verified": user.get("verified"),
+            "profile_image_url_https": user.get("profile_image_url"),
+        }}}}
+    return {"entryId": f"tweet-{tweet.get('id')}", "content": {"itemContent": {"tweet_results": {"result": result}}}}
+
+
+def synthesize_payloads(tweets, n_tweets, per_page=TWEETS_PER_PAGE, first_id=10**18):
+    """
+    Deterministic SearchTimeline payloads cycling through sample tweets
+    Args:
+        tweets: Parsed tweets (e.g. scrape.json) used as templates
+        n_tweets: Total tweets to generate; each gets a unique, descending id
+        per_page: Tweets per payload
+        first_id: Highest generated id (newest tweet first, like the live timeline)
+    Returns:
+        List of payload dicts
+    """
+    payloads = []
+    for start in range(0, n_tweets, per_page):
+        entries = []
+        for i in range(start, min(start + per_page, n_tweets)):
+            tweet = dict(tweets[i % len(tweets)], id=str(first_id - i), conversation_id=None)
+            entries.append(timeline_entry(tweet))
+        payloads.append({"data": {"search_by_raw_query": {"search_timeline": {"timeline": {
+            "instructions": [{"type": "TimelineAddEntries", "entries": entries}]
+        }}}}})
+    return payloads
+
+
+def iter_fixture_tweets(fixture_dir, hashtag):
+    """
+    Offline replay: yield parsed tweets from recorded payloads without a browser
+    """
+    from hashtagger import extract_tweets
+    for payload in load_payloads(fixture_dir, hashtag):
+        yield from extract_tweets(payload)
+
+
+# Minimal stand-in for the Twitter search page: renders <article>s and fetches the
+# next timeline page whenever the user scrolls to the bottom. With assets enabled it
+# also pulls a stylesheet, a web font and one image per tweet, like the real page.
+SEARCH_PAGE = """<!doctype html>
+<html><head>%(head)s</head><body><div id="timeline"></div>
+<script>
+const query = new URLSearchParams(location.search).get('q') || '';
+const withAssets = %(assets)s;
+let page = 0, loading = false;
+async function load() {
+  if (loading) return;
+  loading = true;
+  const response = await fetch('%(timeline)s?q=' + encodeURIComponent(query) + '&page=' + page++);
+  const data = await response.json();
+  const instructions = data.data.search_by_raw_query.search_timeline.timeline.instructions;
+  for (const instruction of instructions) {
+    for (const entry of instruction.entries || []) {
+      const article = document.createElement('article');
+      article.style.height = '300px';
+      article.textContent = entry.entryId;
+      if (withAssets) {
+        const img = document.createElement('img');
+        img.src = '/static/' + entry.entryId + '.jpg';
+        article.appendChild(img);
+      }
+      document.getElementById('timeline').appendChild(article);
+    }
+  }
+  loading = false;
+}
+window.addEventListener('scroll', () => {
+  if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 50) load();
+});
+load();
+</script></body></html>
+"""
+ASSETS_HEAD = """<link rel="stylesheet" href="/static/app.css">
+<style>@font-face { font-family: chirp; src: url(/static/chirp.woff2); } body { font-family: chirp; }</style>"""
+# Size and content type of the fake static assets
+STATIC_ASSETS = {"css": (100_000, "text/css"), "woff2": (80_000, "font/woff2"), "jpg": (150_000, "image/jpeg")}
+
+
+def search_page(assets):
+    return SEARCH_PAGE % {"head": ASSETS_HEAD if assets else "", "assets": "true" if assets else "false",
+                          "timeline": TIMELINE_PATH}
+
+
+class ReplayServer:
+    """
+    Local HTTP server replaying fixtures; point ScraperSession(base_url=server.url) at it
+    Args:
+        fixture_dir: Root fixture directory
+        payloads: Optional dict of hashtag -> list of payloads to serve instead of files
+        assets: Also serve stylesheet/font/image traffic like the real search page
+    """
+
+    def __init__(self, fixture_dir=None, payloads=None, assets=False, host="127.0.0.1", port=0):
+        self.fixture_dir = fixture_dir
+        self.assets = assets
+        self._payloads = dict(payloads or {})
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def payload(self, hashtag, page):
+        hashtag = hashtag.lstrip("#").lower()
+        if not hashtag:
+            return empty_timeline()
+        with self._lock:
+            if hashtag not in self._payloads:
+                self._payloads[hashtag] = load_payloads(self.fixture_dir, hashtag) if self.fixture_dir else []
+            payloads = self._payloads[hashtag]
+        return payloads[page] if page < len(payloads) else empty_timeline()
+
+    def _handler(self):
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send(self, body, content_type):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if url.path == TIMELINE_PATH:
+                    hashtag = unquote(query.get("q", [""])[0])
+                    page = int(query.get("page", ["0"])[0])
+                    body = json.dumps(replay.payload(hashtag, page), ensure_ascii=False)
+                    self.send(body.encode("utf-8"), "application/json")
+                elif url.path.startswith("/static/"):
+                    size, content_type = STATIC_ASSETS.get(url.path.rsplit(".", 1)[-1], (1000, "application/octet-stream"))
+                    self.send(b"\0" * size, content_type)
+                else:
+                    self.send(search_page(replay.assets).encode("utf-8"), "text/html")
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+async def install_replay_route(context, fixture_dir, hashtag):
+    """
+    Playwright alternative to ReplayServer: fulfil the live page's SearchTimeline
+    requests from fixtures, one recorded payload per request, in order
+    """
+    payloads = iter(load_payloads(fixture_dir, hashtag))
+
+    async def fulfil(route):
+        payload = next(payloads, empty_timeline())
+        await route.fulfill(status=200, content_type="application/json",
+                            body=json.dumps(payload, ensure_ascii=False))
+
+    await context.route("**/*SearchTimeline*", fulfil)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage recorded SearchTimeline fixtures")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    synthesize = commands.add_parser("synthesize", help="write deterministic fixtures from parsed tweets")
+    synthesize.add_argument("fixture_dir")
+    synthesize.add_argument("--hashtag", default="civicpulse")
+    synthesize.add_argument("--source", default="scrape.json", help="JSON list of parsed tweets")
+    synthesize.add_argument("--tweets", type=int, default=1000)
+
+    serve = commands.add_parser("serve", help="serve fixtures on a local port")
+    serve.add_argument("fixture_dir")
+    serve.add_argument("--port", type=int, default=8765)
+
+    args = parser.parse_args()
+    if args.command == "synthesize":
+        with open(args.source, "r", encoding="utf-8") as f:
+            tweets = [tweet for tweet in json.load(f) if tweet.get("text")]
+        payloads = synthesize_payloads(tweets, args.tweets)
+        for payload in payloads:
+            save_payload(args.fixture_dir, args.hashtag, payload)
+        print(f"Wrote {len(payloads)} payloads ({args.tweets} tweets) for #{args.hashtag}")
+    elif args.command == "serve":
+        server = ReplayServer(args.fixture_dir, port=args.port)
+        print(f"Replaying {args.fixture_dir} at {server.url} (hashtags: {', '.join(list_hashtags(args.fixture_dir))})")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
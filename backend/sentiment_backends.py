@@ -0,0 +1,134 @@
+import os
+
+# Pluggable CPU inference backends for the sentiment classifier.
+# Every backend returns a callable with the transformers pipeline interface used
+# by sentiment_module: classifier(texts, batch_size=..., truncation=True) ->
+# [{"label": ..., "score": ...}], so get_sentiment / get_sentiment_batch do not
+# care which one is loaded.
+#
+#   torch      stock fp32 transformers pipeline
+#   torch-int8 dynamic int8 quantization of the Linear layers (torch.quantization)
+#   onnx       model exported once to ONNX and run with onnxruntime
+#   onnx-int8  the exported model with int8 weights (onnxruntime.quantization)
+
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+# Where exported ONNX models are kept between runs
+ONNX_DIR = os.getenv("SENTIMENT_ONNX_DIR", os.path.join(os.path.expanduser("~"), ".cache", "civicpulse", "onnx"))
+# onnxruntime intra-op threads (0 lets onnxruntime decide)
+ONNX_THREADS = int(os.getenv("SENTIMENT_ONNX_THREADS", "0"))
+MAX_LENGTH = 512
+
+
+def load_sentiment_classifier(backend, model_name):
+    """
+    Load the sentiment classifier for the given backend
+    Args:
+        backend: One of BACKENDS
+        model_name: HuggingFace sequence-classification model
+    Returns:
+        Pipeline-compatible callable
+    """
+    if backend == "torch":
+        from transformers import pipeline
+        return pipeline("sentiment-analysis", model=model_name)
+    if backend == "torch-int8":
+        return _load_torch_int8(model_name)
+    if backend in ("onnx", "onnx-int8"):
+        return _load_onnx(model_name, quantized=backend == "onnx-int8")
+    raise ValueError(f"Unknown sentiment backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+
+
+def _load_torch_int8(model_name):
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+
+
+def onnx_path(model_name, quantized=False):
+    name = model_name.replace("/", "--")
+    return os.path.join(ONNX_DIR, f"{name}{'-int8' if quantized else ''}.onnx")
+
+
+def export_onnx(model_name, quantized=False):
+    """
+    Export the model to ONNX (and optionally int8-quantize it) unless already done
+    Returns:
+        Path of the .onnx file
+    """
+    path = onnx_path(model_name, quantized)
+    if os.path.exists(path):
+        return path
+
+    fp32_path = onnx_path(model_name)
+    if not os.path.exists(fp32_path):
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+        os.makedirs(ONNX_DIR, exist_ok=True)
+        model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        sample = tokenizer(["export sample"], return_tensors="pt")
+        tmp_path = f"{fp32_path}.tmp"
+        with torch.no_grad():
+            torch.onnx.export(
+                model, (sample["input_ids"], sample["attention_mask"]), tmp_path,
+                input_names=["input_ids", "attention_mask"], output_names=["logits"],
+                dynamic_axes={"input_ids": {0: "batch", 1: "sequence"},
+                              "attention_mask": {0: "batch", 1: "sequence"},
+                              "logits": {0: "batch"}},
+                opset_version=14,
+            )
+        os.replace(tmp_path, fp32_path)
+
+    if quantized:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        tmp_path = f"{path}.tmp"
+        quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, path)
+    return path
+
+
+def _load_onnx(model_name, quantized):
+    import onnxruntime
+    from transformers import AutoConfig, AutoTokenizer
+    path = export_onnx(model_name, quantized)
+    options = onnxruntime.SessionOptions()
+    if ONNX_THREADS:
+        options.intra_op_num_threads = ONNX_THREADS
+    session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+    config = AutoConfig.from_pretrained(model_name)
+    return OnnxSentimentClassifier(session, AutoTokenizer.from_pretrained(model_name), config.id2label)
+
+
+class OnnxSentimentClassifier:
+    """
+    Minimal stand-in for the transformers text-classification pipeline on top of
+    an onnxruntime session
+    """
+
+    def __init__(self, session, tokenizer, id2label):
+        self.session = session
+        self.tokenizer = tokenizer
+        self.id2label = id2label
+        self.input_names = [i.name for i in session.get_inputs()]
+
+    def __call__(self, texts, batch_size=1, truncation=True):
+        import numpy as np
+        if isinstance(texts, str):
+            texts = [texts]
+        results = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(texts[start:start + batch_size], padding=True, truncation=truncation,
+                                     max_length=MAX_LENGTH, return_tensors="np")
+            inputs = {name: encoded[name].astype(np.int64) for name in self.input_names}
+            logits = self.session.run(None, inputs)[0]
+            # Softmax for the pipeline-style score
+            exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probs = exp / exp.sum(axis=1, keepdims=True)
+            for row in probs:
+                label = int(row.argmax())
+                results.append({"label": self.id2label[label], "score": float(row[label])})
+        return results
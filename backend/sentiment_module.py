@@ -1,11 +1,12 @@
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from transformers import pipeline, MarianMTModel, MarianTokenizer
-from langdetect import detect
-import torch
-import re
-import nltk
-
-nltk.download('vader_lexicon')
+import hashlib
+import json
+import os
+import model_registry
+import sentiment_backends
+import translation_engine
+import language_router
+import topic_classifier
+from keyword_matcher import KeywordMatcher, load_keyword_config
 
 # Debug toggle
 DEBUG = True
@@ -13,24 +14,168 @@ def log(msg):
     if DEBUG:
         print(msg)
 
-# Load VADER sentiment analyzer
-vader = SentimentIntensityAnalyzer()
+# Models are loaded lazily through model_registry on first use, so importing
+# this module stays cheap. Heavy imports (torch, transformers, nltk) live in the loaders.
 
 # Optional Zero-shot classifier
 USE_ZERO_SHOT = False
-if USE_ZERO_SHOT:
-    topic_classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli", device=0 if torch.cuda.is_available() else -1)
-else:
-    topic_classifier = None
+ZERO_SHOT_MODEL = "facebook/bart-large-mnli"
+
+# Topic classification: "embedding" (cosine similarity against cached topic
+# description embeddings, see topic_classifier), "zero-shot" (one NLI pass per
+# topic) or "keywords". Keyword matches are the fallback for the first two.
+TOPIC_MODE = os.getenv("TOPIC_MODE", "zero-shot" if USE_ZERO_SHOT else "embedding")
+# Below this cosine similarity the embedding topic defers to keyword matches
+TOPIC_MIN_SIMILARITY = float(os.getenv("TOPIC_MIN_SIMILARITY", "0.25"))
+# Set when the embedding model cannot be loaded here (e.g. sentence-transformers
+# not installed), so every batch falls back to keywords without retrying the load
+_embedding_topics_unavailable = False
 
-# Load transformer-based sentiment analyzer
-transformer_sentiment = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
+# Transformer-based sentiment analyzer
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+# Inference backend: torch, torch-int8, onnx or onnx-int8 (see sentiment_backends)
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")
+
+# Sentiment tiers. "tiered" scores every text with VADER and escalates only
+# texts whose compound score falls inside (VADER_NEGATIVE, VADER_POSITIVE) to the
+# transformer; "vader" and "transformer" use a single tier. A transformer label
+# with confidence below SENTIMENT_NEUTRAL_CONFIDENCE, or a VADER-only score
+# inside the band, is Neutral.
+SENTIMENT_MODE = os.getenv("SENTIMENT_MODE", "tiered")
+VADER_NEGATIVE = float(os.getenv("VADER_NEGATIVE", "-0.5"))
+VADER_POSITIVE = float(os.getenv("VADER_POSITIVE", "0.5"))
+SENTIMENT_NEUTRAL_CONFIDENCE = float(os.getenv("SENTIMENT_NEUTRAL_CONFIDENCE", "0.6"))
+SENTIMENT_MODES = ("tiered", "vader", "transformer")
 
 # Translation model for multilingual support
 USE_TRANSLATION = True
 translation_model_name = "Helsinki-NLP/opus-mt-mul-en"
-translator_model = MarianMTModel.from_pretrained(translation_model_name)
-translator_tokenizer = MarianTokenizer.from_pretrained(translation_model_name)
+# Translation backend (torch, torch-int8 or ctranslate2) and decoding settings
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "torch")
+TRANSLATION_NUM_BEAMS = int(os.getenv("TRANSLATION_NUM_BEAMS", "1"))
+TRANSLATION_MAX_NEW_TOKENS = int(os.getenv("TRANSLATION_MAX_NEW_TOKENS", "128"))
+TRANSLATION_MEMO_SIZE = int(os.getenv("TRANSLATION_MEMO_SIZE", "10000"))
+
+# Bump when the analysis logic changes in a way that invalidates stored results
+ANALYSIS_VERSION = "2"
+
+# Version string of the translation settings; stored translations are reused
+# only when it matches
+def translation_version():
+    return f"{translation_model_name}@{TRANSLATION_BACKEND}/beams={TRANSLATION_NUM_BEAMS}/max={TRANSLATION_MAX_NEW_TOKENS}"
+
+# Version string of the sentiment tier settings
+def sentiment_version():
+    transformer = SENTIMENT_MODEL if SENTIMENT_BACKEND == "torch" else f"{SENTIMENT_MODEL}@{SENTIMENT_BACKEND}"
+    if SENTIMENT_MODE == "transformer":
+        return f"{transformer}/neutral<{SENTIMENT_NEUTRAL_CONFIDENCE}"
+    band = f"vader[{VADER_NEGATIVE},{VADER_POSITIVE}]"
+    if SENTIMENT_MODE == "vader":
+        return band
+    return f"{band}>{transformer}/neutral<{SENTIMENT_NEUTRAL_CONFIDENCE}"
+
+# Embedding topic classifier, loaded on first use. None when TOPIC_MODE is not
+# "embedding" or the model cannot be loaded (missing package, failed download),
+# in which case topics come from keywords for the rest of the process.
+def _topic_classifier():
+    global _embedding_topics_unavailable
+    if TOPIC_MODE != "embedding" or _embedding_topics_unavailable:
+        return None
+    try:
+        return model_registry.get("topics")
+    except Exception as e:
+        log(f"Embedding topics unavailable, using keywords: {e}")
+        _embedding_topics_unavailable = True
+        return None
+
+# Version string of the topic classification in effect. Resolving it loads the
+# embedding model, so a version computed before the first batch already names
+# the keyword fallback when the model cannot load.
+def topic_version():
+    if _topic_classifier() is not None:
+        descriptions = hashlib.sha1(json.dumps(TOPIC_DESCRIPTIONS, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+        return f"{topic_classifier.TOPIC_EMBEDDING_MODEL}/min={TOPIC_MIN_SIMILARITY}/{descriptions}"
+    if TOPIC_MODE == "zero-shot":
+        return ZERO_SHOT_MODEL
+    return "keyword-topics"
+
+# Version string covering the models and settings that shape analysis output
+def analysis_version():
+    return "|".join([
+        ANALYSIS_VERSION,
+        sentiment_version(),
+        translation_version() if USE_TRANSLATION else "no-translation",
+        topic_version(),
+        KEYWORDS_DIGEST,
+    ])
+
+# VADER sentiment analyzer; only hits the network when the lexicon is missing
+def _load_vader():
+    import nltk
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    try:
+        nltk.data.find('sentiment/vader_lexicon.zip')
+    except LookupError:
+        nltk.download('vader_lexicon', quiet=True)
+    return SentimentIntensityAnalyzer()
+
+def _load_zero_shot():
+    import torch
+    from transformers import pipeline
+    return pipeline("zero-shot-classification", model=ZERO_SHOT_MODEL, device=0 if torch.cuda.is_available() else -1)
+
+def _load_sentiment():
+    return sentiment_backends.load_sentiment_classifier(SENTIMENT_BACKEND, SENTIMENT_MODEL)
+
+def _load_translator():
+    return translation_engine.load_translation_engine(
+        TRANSLATION_BACKEND, translation_model_name, num_beams=TRANSLATION_NUM_BEAMS,
+        max_new_tokens=TRANSLATION_MAX_NEW_TOKENS, batch_size=TRANSLATION_BATCH_SIZE)
+
+def _load_topics():
+    descriptions = {topic: TOPIC_DESCRIPTIONS.get(topic, topic) for topic in TOPIC_KEYWORDS}
+    return topic_classifier.EmbeddingTopicClassifier(topic_classifier.load_encoder(), descriptions)
+
+model_registry.register("vader", _load_vader)
+model_registry.register("zero_shot", _load_zero_shot)
+model_registry.register("sentiment", _load_sentiment)
+model_registry.register("translator", _load_translator)
+model_registry.register("topics", _load_topics)
+
+# Models needed by analyze_feedback with the current settings
+def required_models():
+    names = []
+    if SENTIMENT_MODE in ("tiered", "vader"):
+        names.append("vader")
+    if SENTIMENT_MODE in ("tiered", "transformer"):
+        names.append("sentiment")
+    if USE_TRANSLATION:
+        names.append("translator")
+    if TOPIC_MODE == "embedding":
+        names.append("topics")
+    elif TOPIC_MODE == "zero-shot":
+        names.append("zero_shot")
+    return names
+
+# Explicit warm-up hook (called from the FastAPI startup event)
+def warm_up():
+    global _embedding_topics_unavailable
+    names = required_models()
+    timings = model_registry.warm_up([name for name in names if name != "topics"])
+    if "topics" in names:
+        # The embedding model is optional; without it (missing package, failed
+        # download, unreadable weights) topics come from keywords
+        try:
+            timings.update(model_registry.warm_up(["topics"]))
+        except Exception as e:
+            log(f"Embedding topics unavailable, using keywords: {e}")
+            _embedding_topics_unavailable = True
+    log(f"Model warm-up finished: {timings}")
+    return timings
+
+# Batch sizes for analyze_feedback_batch
+SENTIMENT_BATCH_SIZE = 16
+TRANSLATION_BATCH_SIZE = 8
 
 # Topics & Urgent keywords
 CIVIC_TOPICS = [
@@ -39,67 +184,198 @@ CIVIC_TOPICS = [
     "road maintenance", "education", "pollution", "government services"
 ]
 
+# What each topic is about, embedded once by the embedding topic classifier
+# (topics without a description are embedded by name)
+TOPIC_DESCRIPTIONS = {
+    "infrastructure": "public infrastructure such as roads, footpaths, bridges and public buildings",
+    "water supply": "drinking water supply, taps running dry, pipeline leaks and contaminated water",
+    "electricity": "electricity supply, power cuts, street lights and dangerous electric wires",
+    "sanitation": "sanitation, public toilets, blocked drains and overflowing sewage",
+    "public safety": "public safety, crime, harassment, violence and police response",
+    "health": "health care, hospitals, clinics, doctors, medicines and disease outbreaks",
+    "transport": "public transport such as buses, metro and trains, and traffic",
+    "garbage collection": "garbage collection, uncollected trash, waste dumping and litter",
+    "road maintenance": "road maintenance, potholes, damaged roads and unfinished road repair work",
+    "education": "schools, teachers, students and the quality of education",
+    "pollution": "air pollution, smoke, dust, noise pollution and polluted lakes",
+    "government services": "government services and documents such as ration cards, subsidies, aadhaar and passports",
+}
+
 URGENT_KEYWORDS = [
     "urgent", "immediately", "emergency", "accident", "fire", "flood", "collapsed",
     "danger", "ambulance", "police", "dead", "injured", "asap", "violence", "attack"
 ]
 
+# A trailing "*" matches any word with that prefix (see keyword_matcher)
 TOPIC_KEYWORDS = {
-    "infrastructure": ["road", "footpath", "building", "bridge"],
-    "water supply": ["water", "tap", "pipeline", "leak"],
-    "electricity": ["electric", "light", "power", "wire"],
-    "sanitation": ["toilet", "drain", "sewage", "cleaning"],
-    "public safety": ["crime", "police", "violence", "unsafe"],
-    "health": ["hospital", "clinic", "medicine", "doctor"],
-    "transport": ["bus", "metro", "train", "transport"],
-    "garbage collection": ["garbage", "trash", "waste", "bin"],
-    "road maintenance": ["pothole", "road", "repair", "construction"],
-    "education": ["school", "teacher", "education"],
-    "pollution": ["pollution", "smoke", "air", "noise"],
-    "government services": ["ration", "subsidy", "aadhar", "passport", "government"]
+    "infrastructure": ["road*", "footpath*", "building*", "bridge*"],
+    "water supply": ["water*", "tap", "taps", "pipeline*", "leak*"],
+    "electricity": ["electric*", "light", "lights", "power*", "wire*"],
+    "sanitation": ["toilet*", "drain*", "sewage", "cleaning"],
+    "public safety": ["crime*", "police", "violence", "unsafe"],
+    "health": ["hospital*", "clinic*", "medicine*", "doctor*"],
+    "transport": ["bus", "buses", "metro", "train*", "transport*"],
+    "garbage collection": ["garbage", "trash", "waste*", "bin", "bins"],
+    "road maintenance": ["pothole*", "road*", "repair*", "construction"],
+    "education": ["school*", "teacher*", "education"],
+    "pollution": ["pollution", "smoke*", "air", "noise*"],
+    "government services": ["ration", "subsidy", "subsidies", "aadhar", "aadhaar", "passport*", "government*"]
 }
 
+# Keyword lists can be replaced from a JSON file ({"urgent": [...], "topics": {...}})
+KEYWORDS_CONFIG = os.getenv("KEYWORDS_CONFIG")
+if KEYWORDS_CONFIG:
+    URGENT_KEYWORDS, TOPIC_KEYWORDS = load_keyword_config(KEYWORDS_CONFIG)
+
+# Precompiled single-pass matcher for both urgency and topic keywords
+keyword_matcher = KeywordMatcher(URGENT_KEYWORDS, TOPIC_KEYWORDS)
+
+# Short hash of the keyword lists, so editing them invalidates cached/stored results
+KEYWORDS_DIGEST = hashlib.sha1(
+    json.dumps([URGENT_KEYWORDS, TOPIC_KEYWORDS], sort_keys=True, ensure_ascii=False).encode("utf-8")
+).hexdigest()[:8]
+
+# Memoized translations, shared by single and batched calls
+translation_memo = translation_engine.TranslationMemo(TRANSLATION_MEMO_SIZE)
+
+# Seed the memo with translations stored alongside tweets
+def remember_translations(translations):
+    translation_memo.update(translations)
+
 # Translation function
 def translate_to_english(text):
-    try:
-        tokens = translator_tokenizer(text, return_tensors="pt", padding=True, truncation=True)
-        translation = translator_model.generate(**tokens)
-        translated = translator_tokenizer.batch_decode(translation, skip_special_tokens=True)[0]
-        return translated
-    except Exception as e:
-        log(f"Translation failed: {e}")
-        return text  # fallback
+    return translate_batch([text])[0]
+
+# Batched translation: memo lookups first, then length-bucketed batches for the
+# rest. Output keeps input order; a failed text falls back to the original.
+def translate_batch(texts, batch_size=TRANSLATION_BATCH_SIZE):
+    translated = [translation_memo.get(text) for text in texts]
+    missing = list(dict.fromkeys(text for text, english in zip(texts, translated) if english is None))
+    if missing:
+        try:
+            outputs = model_registry.get("translator").translate(missing, batch_size=batch_size)
+        except Exception as e:
+            log(f"Translation failed: {e}")
+            outputs = [None] * len(missing)
+        fresh = {}
+        for text, english in zip(missing, outputs):
+            if english is not None:
+                translation_memo.put(text, english)
+                fresh[text] = english
+        translated = [english if english is not None else fresh.get(text, text)
+                      for text, english in zip(texts, translated)]
+    return translated
+
+# Transformer label, or Neutral when the model is not confident either way
+def transformer_label(result, neutral_confidence=SENTIMENT_NEUTRAL_CONFIDENCE):
+    if result['score'] < neutral_confidence:
+        return "Neutral"
+    return result['label'].capitalize()
+
+# VADER label for a compound score, or None when it falls inside the ambiguous band
+def vader_label(compound, band):
+    negative, positive = band
+    if compound >= positive:
+        return "Positive"
+    if compound <= negative:
+        return "Negative"
+    return None
+
+# Tiered sentiment: list of (label, tier) in input order, tier being the
+# model that decided ("vader" or "transformer")
+def get_sentiment_tiers(texts, batch_size=SENTIMENT_BATCH_SIZE, mode=None, band=None,
+                        neutral_confidence=SENTIMENT_NEUTRAL_CONFIDENCE):
+    mode = mode or SENTIMENT_MODE
+    band = band or (VADER_NEGATIVE, VADER_POSITIVE)
+    if mode not in SENTIMENT_MODES:
+        raise ValueError(f"Unknown sentiment mode {mode!r}, expected one of {', '.join(SENTIMENT_MODES)}")
+    texts = list(texts)
+    if not texts:
+        return []
+
+    decided = [None] * len(texts)
+    escalate = list(range(len(texts)))
+    if mode != "transformer":
+        vader = model_registry.get("vader")
+        escalate = []
+        for i, text in enumerate(texts):
+            label = vader_label(vader.polarity_scores(text)['compound'], band)
+            if label is not None:
+                decided[i] = (label, "vader")
+            elif mode == "vader":
+                decided[i] = ("Neutral", "vader")
+            else:
+                escalate.append(i)
+
+    if escalate:
+        results = model_registry.get("sentiment")([texts[i] for i in escalate], batch_size=batch_size, truncation=True)
+        for i, result in zip(escalate, results):
+            decided[i] = (transformer_label(result, neutral_confidence), "transformer")
+    return decided
 
 # Sentiment classification
 def get_sentiment(text):
-    result = transformer_sentiment(text)[0]
-    return result['label'].capitalize()
+    return get_sentiment_tiers([text])[0][0]
+
+# Batched sentiment classification
+def get_sentiment_batch(texts, batch_size=SENTIMENT_BATCH_SIZE):
+    return [label for label, _ in get_sentiment_tiers(texts, batch_size=batch_size)]
+
+# Language detection that never raises (statistical detector only; analysis
+# goes through language_router, which tries cheaper paths first)
+def detect_language(text):
+    return language_router.detect_batch([text])[0]
+
+# Urgency from the urgent keywords found by keyword_matcher
+def urgency_from_matches(urgent_terms):
+    if urgent_terms:
+        return "Urgent", f"Detected keyword: '{urgent_terms[0]}'"
+    return "Not Urgent", "No urgent keyword found"
 
 # Urgency detection
 def get_urgency(text):
-    text_lower = text.lower()
-    for word in URGENT_KEYWORDS:
-        if re.search(rf'\b{word}\b', text_lower):
-            return "Urgent", f"Detected keyword: '{word}'"
-    return "Not Urgent", "No urgent keyword found"
+    urgent_terms, _ = keyword_matcher.match(text)
+    return urgency_from_matches(urgent_terms)
 
-# Topic classification
-def get_topic(text):
-    if topic_classifier:
-        result = topic_classifier(text, CIVIC_TOPICS)
-        filtered = {label: score for label, score in zip(result['labels'], result['scores']) if score > 0.2}
-        if filtered:
-            best_topic = max(filtered, key=filtered.get)
-            return best_topic, filtered
-        else:
-            return get_topic_keyword(text)
-    else:
-        return get_topic_keyword(text)
+# Batched topic classification: list of (topic, topic_scores, topic_source) in
+# input order. topic_counts_list holds each text's keyword_matcher topic counts.
+def get_topics_batch(texts, topic_counts_list):
+    topics = [None] * len(texts)
+    classifier = _topic_classifier() if texts else None
+
+    if classifier is not None:
+        classified = []
+        try:
+            classified = classifier.classify_batch(texts)
+        except Exception as e:
+            log(f"Embedding topic classification failed: {e}")
+        for i, (topic, best, scores) in enumerate(classified):
+            # A weak semantic match defers to keywords, unless no keyword matched either
+            if best >= TOPIC_MIN_SIMILARITY or not any(topic_counts_list[i].values()):
+                topics[i] = (topic, scores, "embedding")
+
+    elif TOPIC_MODE == "zero-shot":
+        for i, text in enumerate(texts):
+            result = model_registry.get("zero_shot")(text, CIVIC_TOPICS)
+            filtered = {label: score for label, score in zip(result['labels'], result['scores']) if score > 0.2}
+            if filtered:
+                topics[i] = (max(filtered, key=filtered.get), filtered, "zero-shot")
+
+    for i, topic_counts in enumerate(topic_counts_list):
+        if topics[i] is None:
+            topics[i] = (max(topic_counts, key=topic_counts.get), topic_counts, "keywords")
+    return topics
+
+# Topic classification; topic_counts lets callers reuse an earlier keyword_matcher pass
+def get_topic(text, topic_counts=None):
+    if topic_counts is None:
+        _, topic_counts = keyword_matcher.match(text)
+    topic, topic_scores, _ = get_topics_batch([text], [topic_counts])[0]
+    return topic, topic_scores
 
 # Keyword-based fallback
 def get_topic_keyword(text):
-    text_lower = text.lower()
-    matches = {topic: sum(kw in text_lower for kw in kws) for topic, kws in TOPIC_KEYWORDS.items()}
+    _, matches = keyword_matcher.match(text)
     best = max(matches, key=matches.get)
     return best, matches
 
@@ -109,42 +385,76 @@ def get_priority_score(sentiment, urgency):
     urgency_score = {"Urgent": 50, "Not Urgent": 0}
     return sentiment_score[sentiment] + urgency_score[urgency]
 
-# Main analysis function
-def analyze_feedback(text):
-    log(f"\nAnalyzing feedback: {text}")
-    original = text
-
-    # Detect language and translate if needed
-    try:
-        if detect(text) != 'en' and USE_TRANSLATION:
-            english = translate_to_english(text)
-        else:
-            english = text
-    except Exception as e:
-        log(f"Language detection failed: {e}")
-        english = text
-
-    sentiment = get_sentiment(english)
-    urgency, urgency_reason = get_urgency(english)
-    topic, topic_scores = get_topic(english)
+# Assemble the analysis result for one text
+# matches and topic let batch callers pass in their keyword_matcher pass and
+# get_topics_batch result
+def build_result(original, english, sentiment, language=None, language_source=None, sentiment_tier=None,
+                 matches=None, topic=None):
+    # One keyword pass serves both urgency and topic detection
+    urgent_terms, topic_counts = matches if matches is not None else keyword_matcher.match(english)
+    urgency, urgency_reason = urgency_from_matches(urgent_terms)
+    topic, topic_scores, topic_source = topic if topic is not None else get_topics_batch([english], [topic_counts])[0]
     priority = get_priority_score(sentiment, urgency)
 
-    result = {
+    return {
         "original_text": original,
         "translated_text": english,
+        "language": language,
+        "language_source": language_source,
         "sentiment": sentiment,
+        "sentiment_tier": sentiment_tier,
         "urgency": urgency,
         "urgency_reason": urgency_reason,
         "topic": topic,
         "topic_scores": topic_scores,
+        "topic_source": topic_source,
         "priority_score": priority
     }
+
+# Main analysis function; language is the source-reported language, if any
+def analyze_feedback(text, language=None):
+    log(f"\nAnalyzing feedback: {text}")
+
+    # Route the language and translate if needed
+    lang, lang_source = language_router.route(text, language)
+    if lang is not None and lang != 'en' and USE_TRANSLATION:
+        english = translate_to_english(text)
+    else:
+        english = text
+
+    sentiment, tier = get_sentiment_tiers([english])[0]
+    result = build_result(text, english, sentiment, lang, lang_source, tier)
     log(f"Result: {result}")
     return result
 
-# Batch processing
-def analyze_feedback_batch(text_list):
-    return [analyze_feedback(text) for text in text_list]
+# Batch processing: one language-routing pass, one translation pass over the
+# non-English subset and batched sentiment inference. Results keep input order.
+# languages are the source-reported languages aligned with text_list, if known.
+def analyze_feedback_batch(text_list, batch_size=SENTIMENT_BATCH_SIZE,
+                           translation_batch_size=TRANSLATION_BATCH_SIZE, languages=None):
+    texts = list(text_list)
+    if not texts:
+        return []
+    log(f"\nAnalyzing batch of {len(texts)} feedback texts")
+
+    routes = language_router.route_batch(texts, languages)
+    english = list(texts)
+    if USE_TRANSLATION:
+        foreign = [i for i, (lang, _) in enumerate(routes) if lang is not None and lang != 'en']
+        if foreign:
+            translated = translate_batch([texts[i] for i in foreign], batch_size=translation_batch_size)
+            for i, text in zip(foreign, translated):
+                english[i] = text
+
+    sentiments = get_sentiment_tiers(english, batch_size=batch_size)
+    # One keyword pass per text, then one embedding pass for the whole batch
+    matches = [keyword_matcher.match(eng) for eng in english]
+    topics = get_topics_batch(english, [topic_counts for _, topic_counts in matches])
+    results = [build_result(original, eng, sentiment, lang, lang_source, tier, match, topic)
+               for original, eng, (sentiment, tier), (lang, lang_source), match, topic
+               in zip(texts, english, sentiments, routes, matches, topics)]
+    log(f"Batch results: {len(results)} analysed")
+    return results
 
 # Quick test
 if __name__ == "__main__":
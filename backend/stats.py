@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+
+# Dashboard distributions computed in Mongo instead of the browser.
+# One aggregation: an index-backed $match on the filter fields (keywords,
+# timestamp, priority_score), then a $facet that counts sentiment, urgency, topic
+# and priority bucket in a single pass over the matched documents. Only the
+# counts cross the wire.
+
+# Lower bounds of the priority buckets, matching the table colours (>= 70 high, >= 40 medium)
+PRIORITY_BUCKETS = [(0, "low"), (40, "medium"), (70, "high")]
+# Upper bound of the last bucket; calculate_priority_score tops out at 100
+PRIORITY_MAX = 101
+TOPIC_LIMIT = 20
+
+
+def parse_time(value):
+    """
+    Parse an ISO-8601 time filter, treating naive values as UTC
+    Returns:
+        datetime or None when value is empty
+    Raises:
+        ValueError: If value is not ISO-8601
+    """
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def stats_match(hashtag=None, since=None, until=None, priority_threshold=0):
+    """
+    Mongo filter selecting the /search tweets a stats request covers
+    Args:
+        hashtag: Hashtag (with or without "#") the tweet was tagged with
+        since: Inclusive lower bound on timestamp
+        until: Exclusive upper bound on timestamp
+        priority_threshold: Minimum priority_score
+    Returns:
+        Mongo filter dict
+    """
+    # priority_score only exists on analysed /search documents, so the range also
+    # skips mongodb.py's per-keyword documents
+    match = {"priority_score": {"$gte": priority_threshold}}
+    if hashtag:
+        match["keywords"] = hashtag.lstrip("#")
+    if since or until:
+        match["timestamp"] = {}
+        if since:
+            match["timestamp"]["$gte"] = since
+        if until:
+            match["timestamp"]["$lt"] = until
+    return match
+
+
+def stats_pipeline(match, topic_limit=TOPIC_LIMIT):
+    """
+    Single-pass $facet aggregation of the dashboard counts
+    Args:
+        match: Filter from stats_match
+        topic_limit: Number of most frequent topics to return
+    Returns:
+        Aggregation pipeline list
+    """
+    return [
+        {"$match": match},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "sentiment": [{"$sortByCount": "$sentiment"}],
+            "urgency": [{"$sortByCount": "$urgency"}],
+            "topic": [{"$sortByCount": "$topic"}, {"$limit": topic_limit}],
+            "priority": [{"$bucket": {
+                "groupBy": "$priority_score",
+                "boundaries": [lower for lower, _ in PRIORITY_BUCKETS] + [PRIORITY_MAX],
+                "default": "other",
+            }}],
+        }},
+    ]
+
+
+def format_stats(result):
+    """
+    Flatten the $facet output into {field: {value: count}}
+    Args:
+        result: The single document returned by the stats_pipeline aggregation (None when empty)
+    Returns:
+        Dict with total, sentiment, urgency, topic and priority counts
+    """
+    result = result or {}
+    total = result.get("total") or [{"count": 0}]
+    labels = dict(PRIORITY_BUCKETS)
+    priority = {label: 0 for _, label in PRIORITY_BUCKETS}
+    for bucket in result.get("priority", []):
+        label = labels.get(bucket["_id"], "other")
+        priority[label] = priority.get(label, 0) + bucket["count"]
+    return {
+        "total": total[0]["count"],
+        "sentiment": {row["_id"]: row["count"] for row in result.get("sentiment", [])},
+        "urgency": {row["_id"]: row["count"] for row in result.get("urgency", [])},
+        "topic": {row["_id"]: row["count"] for row in result.get("topic", [])},
+        "priority": priority,
+    }
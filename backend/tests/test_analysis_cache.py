@@ -0,0 +1,87 @@
+import pytest
+import analysis_cache
+import model_registry
+import sentiment_module
+from analysis_cache import AnalysisCache, cache_key
+
+
+@pytest.fixture
+def fake_batch(monkeypatch):
+    calls = []
+
+    def analyze_feedback_batch(texts, **kwargs):
+        calls.append(list(texts))
+        return [{"original_text": text, "sentiment": "Negative"} for text in texts]
+
+    monkeypatch.setattr(sentiment_module, "analyze_feedback_batch", analyze_feedback_batch)
+    monkeypatch.setattr(analysis_cache, "cache", AnalysisCache(max_entries=10))
+    return calls
+
+
+def test_cache_key_normalizes_whitespace_and_case():
+    assert cache_key("Water  LEAK\n near school") == cache_key("water leak near school")
+    assert cache_key("water leak", version="a") != cache_key("water leak", version="b")
+
+
+def test_cache_key_includes_source_language():
+    assert cache_key("pani nahi", version="a", language="hi") != cache_key("pani nahi", version="a")
+    assert cache_key("pani nahi", version="a", language="und") == cache_key("pani nahi", version="a")
+
+
+def test_batch_only_analyses_misses(fake_batch):
+    analysis_cache.cached_analyze_feedback_batch(["Pothole on MG road", "pothole on mg road", "No water"])
+    results = analysis_cache.cached_analyze_feedback_batch(["No water", "Fire at bus stand"])
+
+    assert fake_batch == [["Pothole on MG road", "No water"], ["Fire at bus stand"]]
+    assert [r["original_text"] for r in results] == ["No water", "Fire at bus stand"]
+    assert analysis_cache.cache.snapshot()["memory_hits"] == 1
+
+
+def test_batch_keys_on_language_hint(fake_batch):
+    analysis_cache.cached_analyze_feedback_batch(["pani nahi aa raha"], languages=[None])
+    analysis_cache.cached_analyze_feedback_batch(["pani nahi aa raha", "pani nahi aa raha"], languages=["hi", None])
+
+    assert fake_batch == [["pani nahi aa raha"], ["pani nahi aa raha"]]
+
+
+def test_version_and_key_agree_when_topics_model_cannot_load(monkeypatch):
+    def unloadable(name):
+        raise OSError(f"cannot load {name}")
+
+    def analyze_feedback_batch(texts, **kwargs):
+        topics = sentiment_module.get_topics_batch(texts, [{"water supply": 1} for _ in texts])
+        return [{"original_text": text, "topic_source": topic[2]} for text, topic in zip(texts, topics)]
+
+    monkeypatch.setattr(sentiment_module, "TOPIC_MODE", "embedding")
+    monkeypatch.setattr(sentiment_module, "_embedding_topics_unavailable", False)
+    monkeypatch.setattr(model_registry, "get", unloadable)
+    monkeypatch.setattr(sentiment_module, "analyze_feedback_batch", analyze_feedback_batch)
+    monkeypatch.setattr(analysis_cache, "cache", AnalysisCache(max_entries=10))
+
+    version = sentiment_module.analysis_version()
+    [result] = analysis_cache.cached_analyze_feedback_batch(["No water since Monday"])
+
+    assert "keyword-topics" in version and sentiment_module.analysis_version() == version
+    assert result["topic_source"] == "keywords"
+    assert analysis_cache.cache.get(cache_key("No water since Monday", version)) is not None
+
+
+def test_lru_evicts_oldest_entry():
+    cache = AnalysisCache(max_entries=2)
+    cache.put("a", {"n": 1})
+    cache.put("b", {"n": 2})
+    cache.get("a")
+    cache.put("c", {"n": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1}
+    assert cache.snapshot()["evictions"] == 1
+
+
+def test_persistent_tier_survives_new_instance(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite")
+    AnalysisCache(db_path=db_path).put("k", {"sentiment": "Positive"})
+
+    cache = AnalysisCache(db_path=db_path)
+    assert cache.get("k") == {"sentiment": "Positive"}
+    assert cache.snapshot()["persistent_hits"] == 1
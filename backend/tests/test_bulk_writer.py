@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
+from bulk_writer import BulkWriter
+
+
+class FakeCollection:
+    """
+    Records bulk_write chunks; fail maps a chunk number to the writeErrors
+    positions that fail in it
+    """
+
+    def __init__(self, fail=None):
+        self.chunks = []
+        self.fail = fail or {}
+
+    def bulk_write(self, ops, ordered=True):
+        chunk = len(self.chunks)
+        self.chunks.append(ops)
+        upserted = {}
+        for position, op in enumerate(ops):
+            if isinstance(op, InsertOne):
+                op._doc.setdefault("_id", f"oid-{chunk}-{position}")
+            elif op._filter.get("new"):
+                upserted[position] = f"upserted-{chunk}-{position}"
+        failing = self.fail.get(chunk)
+        if failing:
+            raise BulkWriteError({
+                "writeErrors": [{"index": position, "code": 11000, "errmsg": f"duplicate {position}"}
+                                for position in failing],
+                "upserted": [{"index": position, "_id": _id} for position, _id in upserted.items()
+                             if position not in failing],
+            })
+        return SimpleNamespace(upserted_ids=upserted)
+
+
+def test_results_map_back_to_operation_indexes():
+    collection = FakeCollection()
+    writer = BulkWriter(collection)
+    inserted = writer.add({"text": "a"})
+    created = writer.upsert({"tweet_id": "1", "new": True}, {"text": "b"})
+    updated = writer.upsert({"tweet_id": "2"}, {"text": "c"})
+
+    report = writer.flush()
+
+    assert report["inserted_ids"] == {inserted: "oid-0-0", created: "upserted-0-1"}
+    assert report["matched"] == [updated]
+    assert writer.counts == {"inserted": 2, "matched": 1, "errors": 0}
+
+
+def test_write_errors_map_to_indexes_across_chunks():
+    # Second chunk (indexes 2-3): position 0 fails, position 1 is upserted
+    collection = FakeCollection(fail={1: [0]})
+    writer = BulkWriter(collection, chunk_size=2)
+    indexes = [writer.upsert({"tweet_id": str(i), "new": True}, {"n": i}) for i in range(4)]
+
+    report = writer.flush()
+
+    assert len(collection.chunks) == 2
+    assert report["errors"] == [{"index": indexes[2], "code": 11000, "errmsg": "duplicate 0"}]
+    assert report["inserted_ids"] == {indexes[0]: "upserted-0-0", indexes[1]: "upserted-0-1",
+                                      indexes[3]: "upserted-1-1"}
+    assert report["matched"] == []
+
+
+def test_whole_chunk_failure_reports_every_operation():
+    class Down:
+        def bulk_write(self, ops, ordered=True):
+            raise ConnectionError("unreachable")
+
+    writer = BulkWriter(Down())
+    writer.add({"text": "a"})
+    writer.upsert({"tweet_id": "1"}, {"text": "b"})
+
+    report = writer.flush()
+
+    assert [error["index"] for error in report["errors"]] == [0, 1]
+    assert report["errors"][0]["errmsg"] == "unreachable"
+
+
+def test_autoflush_writes_full_chunks_and_keeps_indexes():
+    collection = FakeCollection()
+    writer = BulkWriter(collection, chunk_size=2, autoflush=True, keep_results=False)
+    for i in range(5):
+        writer.add({"n": i})
+
+    assert [len(chunk) for chunk in collection.chunks] == [2, 2]
+    assert writer.pending == 1
+    report = writer.flush()
+    assert report["inserted_ids"] == {4: "oid-2-0"}
+    assert writer.counts["inserted"] == 5
+    assert writer.inserted_ids == {}
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+import pytest
+import hashtagger
+from hashtagger import ScraperSession, extract_tweets, timeline_ended
+from scrape_replay import TIMELINE_PATH, empty_timeline, synthesize_payloads, timeline_entry
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scrape.json")
+FIRST_ID = 10**18
+RATE_LIMITED = {"errors": [{"code": 88, "message": "Rate limit exceeded"}]}
+
+
+def sample_tweets():
+    with open(SAMPLE_FILE, "r", encoding="utf-8") as f:
+        return [tweet for tweet in json.load(f) if tweet.get("text")]
+
+
+class FakeResponse:
+    url = f"https://twitter.com{TIMELINE_PATH}"
+    request = SimpleNamespace(resource_type="xhr")
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    async def json(self):
+        return self.payload
+
+
+class FakePage:
+    """
+    Stand-in for a search tab: loading the page and every scroll deliver the next
+    payload to the response listeners; past the last one it keeps serving final
+    """
+
+    def __init__(self, payloads, final=None):
+        self.payloads = list(payloads)
+        self.final = final if final is not None else empty_timeline()
+        self.listeners = []
+        self.scrolls = 0
+
+    def on(self, event, handler):
+        self.listeners.append(handler)
+
+    def remove_listener(self, event, handler):
+        self.listeners.remove(handler)
+
+    def _serve(self):
+        payload = self.payloads.pop(0) if self.payloads else self.final
+        for handler in list(self.listeners):
+            handler(FakeResponse(payload))
+
+    async def goto(self, url):
+        self._serve()
+
+    async def wait_for_selector(self, selector, timeout=None):
+        # Let the listener's parse task deliver the first page
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    async def evaluate(self, script):
+        self.scrolls += 1
+        self._serve()
+
+
+@pytest.fixture(autouse=True)
+def fast_scroll(monkeypatch):
+    monkeypatch.setattr(hashtagger, "SCROLL_JITTER", (0, 0))
+    monkeypatch.setattr(hashtagger, "SCROLL_TIMEOUT", 0.5)
+
+
+def collect(page, max_tweets, since_id=None):
+    return asyncio.run(ScraperSession(record_dir=None)._collect(page, "potholes", max_tweets, since_id))
+
+
+def with_promoted(payload, tweet):
+    entry = dict(timeline_entry(tweet), entryId=f"promoted-tweet-{tweet['id']}")
+    payload["data"]["search_by_raw_query"]["search_timeline"]["timeline"]["instructions"][0]["entries"].insert(0, entry)
+    return payload
+
+
+def test_extract_tweets_skips_promoted_entries():
+    tweets = sample_tweets()
+    payload = with_promoted(synthesize_payloads(tweets, 2)[0], dict(tweets[0], id="42"))
+
+    assert [tweet["id"] for tweet in extract_tweets(payload)] == [str(FIRST_ID), str(FIRST_ID - 1)]
+
+
+def test_timeline_ended_only_for_search_pages_without_tweets():
+    cursors_only = {"data": {"search_by_raw_query": {"search_timeline": {"timeline": {"instructions": [
+        {"type": "TimelineAddEntries", "entries": [{"entryId": "cursor-bottom-0"}]}]}}}}}
+
+    assert timeline_ended(empty_timeline()) and timeline_ended(cursors_only)
+    assert not timeline_ended(RATE_LIMITED)
+    assert not timeline_ended(synthesize_payloads(sample_tweets(), 1)[0])
+
+
+def test_poll_stopped_by_rate_limit_is_incomplete():
+    # 10 tweets above the mark arrive, then every scroll is rate limited
+    page = FakePage(synthesize_payloads(sample_tweets(), 10, per_page=10), final=RATE_LIMITED)
+    tweets, complete = collect(page, max_tweets=50, since_id=str(FIRST_ID - 100))
+
+    assert len(tweets) == 10
+    assert complete is False
+    assert page.scrolls == hashtagger.MAX_IDLE_SCROLLS
+
+
+def test_promoted_tweet_below_the_mark_does_not_complete_the_poll():
+    tweets = sample_tweets()
+    since_id = str(FIRST_ID - 100)
+    payload = with_promoted(synthesize_payloads(tweets, 10, per_page=10)[0], dict(tweets[0], id="7"))
+    tweets, complete = collect(FakePage([payload], final=RATE_LIMITED), max_tweets=50, since_id=since_id)
+
+    assert len(tweets) == 10 and complete is False
+
+
+def test_end_of_timeline_completes_the_poll():
+    page = FakePage(synthesize_payloads(sample_tweets(), 10, per_page=10))
+    tweets, complete = collect(page, max_tweets=50, since_id=str(FIRST_ID - 100))
+
+    assert len(tweets) == 10 and complete is True
+    assert page.scrolls == 1
+
+
+def test_reaching_the_mark_completes_the_poll():
+    page = FakePage(synthesize_payloads(sample_tweets(), 20, per_page=10), final=RATE_LIMITED)
+    tweets, complete = collect(page, max_tweets=50, since_id=str(FIRST_ID - 5))
+
+    assert [tweet["id"] for tweet in tweets] == [str(FIRST_ID - i) for i in range(5)]
+    assert complete is True and page.scrolls == 0
+
+
+def test_search_many_bounds_tabs_and_yields_in_completion_order():
+    delays = {"slow": 0.06, "fast": 0.0, "medium": 0.03, "broken": 0.01}
+    open_tabs, peak = 0, 0
+    finished = []
+
+    class Tab:
+        async def close(self):
+            nonlocal open_tabs
+            open_tabs -= 1
+
+    async def new_page():
+        nonlocal open_tabs, peak
+        open_tabs += 1
+        peak = max(peak, open_tabs)
+        return Tab()
+
+    async def fake_collect(page, hashtag, max_tweets, since_id=None, max_id=None):
+        await asyncio.sleep(delays[hashtag])
+        finished.append(hashtag)
+        if hashtag == "broken":
+            raise RuntimeError("page crashed")
+        return [{"id": hashtag}], None
+
+    async def run():
+        session = ScraperSession(max_tabs=2, record_dir=None)
+        session.context = SimpleNamespace(new_page=new_page)
+        session._collect = fake_collect
+        return [result async for result in session.search_many(list(delays), max_tweets=10)]
+
+    results = asyncio.run(run())
+
+    by_hashtag = {hashtag: result for hashtag, *result in results}
+    assert peak == 2 and open_tabs == 0
+    assert [hashtag for hashtag, *_ in results] == finished
+    tweets, error, complete = by_hashtag["broken"]
+    assert tweets == [] and isinstance(error, RuntimeError) and complete is False
+    assert by_hashtag["fast"] == [[{"id": "fast"}], None, None]
+
+
+def test_overlapping_pages_are_deduplicated_and_idle_scrolls_stop():
+    tweets = sample_tweets()
+    first = synthesize_payloads(tweets, 10, per_page=10)[0]
+    # The next page overlaps the first by five tweets; later scrolls only repeat it
+    overlap = synthesize_payloads(tweets, 10, per_page=10, first_id=FIRST_ID - 5)[0]
+    page = FakePage([first, overlap], final=overlap)
+
+    collected, complete = collect(page, max_tweets=50)
+
+    assert [tweet["id"] for tweet in collected] == [str(FIRST_ID - i) for i in range(15)]
+    assert complete is None
+    # One productive scroll, then MAX_IDLE_SCROLLS that only brought duplicates
+    assert page.scrolls == 1 + hashtagger.MAX_IDLE_SCROLLS
+
+
+def test_scrolling_stops_at_max_tweets():
+    page = FakePage(synthesize_payloads(sample_tweets(), 60, per_page=20))
+
+    collected, _ = collect(page, max_tweets=30)
+
+    assert len(collected) == 30
+    assert page.scrolls == 1
+
+
+@pytest.mark.parametrize("resource_type, blocked", [
+    ("image", True), ("media", True), ("font", True), ("stylesheet", True),
+    ("xhr", False), ("fetch", False), ("document", False), ("script", False),
+])
+def test_lean_mode_blocks_only_heavy_resources(resource_type, blocked):
+    calls = []
+
+    class Route:
+        request = SimpleNamespace(resource_type=resource_type)
+
+        async def abort(self):
+            calls.append("abort")
+
+        async def continue_(self):
+            calls.append("continue")
+
+    asyncio.run(ScraperSession._block_heavy_resources(Route()))
+
+    assert calls == ["abort" if blocked else "continue"]
+
+
+def test_lean_session_defaults_to_headless():
+    assert ScraperSession(lean=True).headless is True
+    assert ScraperSession(lean=False).headless is False
+    assert ScraperSession(lean=True, headless=False).headless is False
@@ -0,0 +1,57 @@
+from pymongo.errors import DuplicateKeyError
+from indexes import INDEXES, dedupe, ensure_indexes
+
+
+class FakeCollection:
+    def __init__(self, name, created, docs=()):
+        self.name = name
+        self.created = created
+        self.docs = list(docs)
+        self.deleted = []
+
+    def create_index(self, keys, name, **options):
+        if name == "tweet_id_unique":
+            raise DuplicateKeyError("E11000 duplicate key error")
+        self.created.append(name)
+
+    def find_one(self, query):
+        return None
+
+    def aggregate(self, pipeline, allowDiskUse=False):
+        groups = {}
+        for doc in sorted(self.docs, key=lambda d: d["_id"], reverse=True):
+            groups.setdefault(doc["tweet_id"], []).append(doc["_id"])
+        return [{"ids": ids, "count": len(ids)} for ids in groups.values() if len(ids) > 1]
+
+    def delete_many(self, query):
+        self.deleted.extend(query["_id"]["$in"])
+
+        class Result:
+            deleted_count = len(query["_id"]["$in"])
+        return Result()
+
+
+class FakeDb(dict):
+    def __init__(self):
+        super().__init__()
+        self.created = []
+
+    def __missing__(self, name):
+        self[name] = FakeCollection(name, self.created)
+        return self[name]
+
+
+def test_one_failing_index_does_not_skip_the_rest(capsys):
+    db = FakeDb()
+    failures = ensure_indexes(db)
+
+    assert [name for name, _ in failures] == ["tweet_id_unique"]
+    assert db.created == [options["name"] for _, _, options in INDEXES if options["name"] != "tweet_id_unique"]
+    assert "python indexes.py --dedupe" in capsys.readouterr().out
+
+
+def test_dedupe_keeps_the_newest_document():
+    collection = FakeCollection("tweets", [], [{"_id": 1, "tweet_id": "a"}, {"_id": 3, "tweet_id": "a"},
+                                               {"_id": 2, "tweet_id": "a"}, {"_id": 4, "tweet_id": "b"}])
+    assert dedupe(collection, ["tweet_id"]) == 2
+    assert sorted(collection.deleted) == [1, 2]
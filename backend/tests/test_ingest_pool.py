@@ -0,0 +1,59 @@
+import analysis_cache
+import sentiment_module
+from analysis_cache import AnalysisCache
+from ingest_pool import Checkpoint, analyse_chunk, build_documents
+
+FINGERPRINT = {"source": "/data/tweets.json", "batch_size": 256, "analysis_version": "v1"}
+
+
+def test_checkpoint_survives_restart(tmp_path):
+    path = str(tmp_path / "state.json")
+    checkpoint = Checkpoint(path, FINGERPRINT)
+    checkpoint.mark(0)
+    checkpoint.mark(2)
+
+    resumed = Checkpoint(path, FINGERPRINT)
+    assert resumed.resumed
+    assert resumed.is_done(0) and resumed.is_done(2) and not resumed.is_done(1)
+
+
+def test_checkpoint_for_other_run_is_ignored(tmp_path):
+    path = str(tmp_path / "state.json")
+    Checkpoint(path, FINGERPRINT).mark(0)
+
+    other = Checkpoint(path, dict(FINGERPRINT, batch_size=128))
+    assert not other.resumed
+    assert not other.is_done(0)
+
+
+def test_build_documents_fans_out_per_hashtag():
+    tweet = {"id": "1", "text": "No water", "created_at": "Sun Apr 27 02:30:12 +0000 2025",
+             "tagged_hashtags": ["#Water", "water", "BBMP"]}
+    analysis = {"sentiment": "Negative", "urgency": "Urgent", "urgency_reason": "no water",
+                "topic": "water supply", "topic_scores": {"water supply": 0.9}, "priority_score": 80}
+
+    documents = build_documents(tweet, analysis, "v1")
+
+    assert [keyword for keyword, _, _ in documents] == ["water", "bbmp"]
+    _, tweet_doc, analysis_doc = documents[0]
+    assert tweet_doc["tweets"]["id"] == "1"
+    assert analysis_doc["topic_scores"] == [{"name": "water supply", "score": 90}]
+    assert analysis_doc["analysis_version"] == "v1"
+
+
+def test_analyse_chunk_returns_its_cache_counters(monkeypatch):
+    analysis = {"sentiment": "Negative", "urgency": "Urgent", "urgency_reason": "", "topic": "water supply",
+                "topic_scores": {}, "priority_score": 80}
+    monkeypatch.setattr(sentiment_module, "analyze_feedback_batch",
+                        lambda texts, **kwargs: [dict(analysis, original_text=text) for text in texts])
+    monkeypatch.setattr(sentiment_module, "analysis_version", lambda: "v1")
+    monkeypatch.setattr(analysis_cache, "cache", AnalysisCache(max_entries=10))
+    tweets = [{"id": str(i), "text": text, "created_at": "Sun Apr 27 02:30:12 +0000 2025"}
+              for i, text in enumerate(["No water", "no  WATER", "Pothole"])]
+
+    _, first = analyse_chunk(tweets[:2], "v1")
+    documents, second = analyse_chunk(tweets, "v1")
+
+    assert first == {"memory_hits": 0, "persistent_hits": 0, "misses": 2, "evictions": 0}
+    assert second == {"memory_hits": 2, "persistent_hits": 0, "misses": 1, "evictions": 0}
+    assert len(documents) == 3
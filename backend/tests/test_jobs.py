@@ -0,0 +1,53 @@
+import asyncio
+from jobs import DONE, FAILED, JobQueue, JobStore, QUEUED, RUNNING
+
+
+def test_in_flight_hashtag_is_deduplicated():
+    store = JobStore(":memory:")
+    job, created = store.enqueue("#Potholes")
+    duplicate, duplicate_created = store.enqueue(" potholes")
+
+    assert created and not duplicate_created
+    assert duplicate["id"] == job["id"] and job["status"] == QUEUED
+
+    assert store.claim()["status"] == RUNNING
+    assert store.enqueue("potholes")[0]["id"] == job["id"]
+    store.finish(job["id"])
+    # Once finished, the hashtag can be searched again
+    assert store.enqueue("potholes")[1]
+
+
+def test_worker_records_progress_and_partial_results():
+    store = JobStore(":memory:")
+
+    async def runner(job):
+        yield {"type": "progress", "hashtag": None, "data": {"stage": "scraping"}}
+        for score in (30, 80, 100):
+            yield {"type": "tweet", "hashtag": job["hashtag"], "data": {"tweet_id": str(score), "priority_score": score}}
+        yield {"type": "summary", "data": {"returned": 3}}
+
+    queue = JobQueue(store, runner)
+    job, _ = queue.submit("water")
+    asyncio.run(queue.run(store.claim()))
+
+    polled = store.get(job["id"], priority_threshold=50)
+    assert polled["status"] == DONE and polled["progress"] == {"returned": 3}
+    assert [r["tweet_id"] for r in polled["results"]] == ["80", "100"]
+
+    first = store.get(job["id"], limit=2)
+    rest = store.get(job["id"], offset=first["next_offset"])
+    assert [r["tweet_id"] for r in first["results"] + rest["results"]] == ["30", "80", "100"]
+
+
+def test_failed_hashtag_fails_the_job():
+    store = JobStore(":memory:")
+
+    async def runner(job):
+        yield {"type": "error", "hashtag": job["hashtag"], "error": "login required"}
+
+    queue = JobQueue(store, runner)
+    job, _ = queue.submit("water")
+    asyncio.run(queue.run(store.claim()))
+
+    failed = store.get(job["id"])
+    assert failed["status"] == FAILED and failed["error"] == "login required"
@@ -0,0 +1,42 @@
+import json
+import pytest
+from utils import json_stream
+from utils.json_stream import iter_json_records
+
+
+@pytest.fixture
+def write(tmp_path):
+    def write(content):
+        path = tmp_path / "tweets.json"
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+    return write
+
+
+@pytest.fixture(autouse=True)
+def stdlib_decoder(monkeypatch):
+    # Exercise the incremental fallback, with or without ijson installed
+    monkeypatch.setattr(json_stream, "ijson", None)
+
+
+def test_json_array(write):
+    records = [{"id": "1", "text": "No water"}, {"id": "2", "text": "Pothole, [again]"}]
+    assert list(iter_json_records(write(json.dumps(records, indent=2)))) == records
+
+
+def test_ndjson(write):
+    path = write('{"id": "1"}\n\n{"id": "2"}\n')
+    assert list(iter_json_records(path)) == [{"id": "1"}, {"id": "2"}]
+
+
+def test_values_split_across_reads(write, monkeypatch):
+    monkeypatch.setattr(json_stream, "READ_SIZE", 7)
+    path = write('[12345678901, 2, {"text": "a longer string"}, 3.25]')
+    assert list(iter_json_records(path)) == [12345678901, 2, {"text": "a longer string"}, 3.25]
+
+
+@pytest.mark.parametrize("content", ['[{"id": "1"}, {"id": "2"', '[{"id": "1"}, 2'])
+def test_truncated_array_raises(write, monkeypatch, content):
+    monkeypatch.setattr(json_stream, "READ_SIZE", 7)
+    with pytest.raises(ValueError):
+        list(iter_json_records(write(content)))
@@ -0,0 +1,22 @@
+from keyword_matcher import KeywordMatcher, tokenize
+
+
+def test_tokenize_keeps_indic_words_whole():
+    assert tokenize("पानी नहीं आ रहा, URGENT!") == ["पानी", "नहीं", "आ", "रहा", "urgent"]
+
+
+def test_match_respects_word_boundaries():
+    matcher = KeywordMatcher(["fire"], {"garbage collection": ["bin"]})
+    urgent, topics = matcher.match("Firefighters found a cabinet")
+    assert urgent == []
+    assert topics == {"garbage collection": 0}
+
+
+def test_match_prefixes_phrases_and_shared_keywords():
+    matcher = KeywordMatcher(
+        ["police", "accident"],
+        {"electricity": ["electric*"], "public safety": ["police"], "water supply": ["water supply", "पानी"]},
+    )
+    urgent, topics = matcher.match("Accident: electricity cut, police called. Water supply and पानी gone")
+    assert urgent == ["accident", "police"]
+    assert topics == {"electricity": 1, "public safety": 1, "water supply": 2}
@@ -0,0 +1,33 @@
+import language_router
+from language_router import route_batch, script_language
+
+
+def test_script_shortcut():
+    assert script_language("पानी की सप्लाई पिछले 3 दिनों से बंद है") == "hi"
+    assert script_language("ರಸ್ತೆ ಗುಂಡಿ ಮುಚ್ಚಿ") == "kn"
+    assert script_language("मेरे area में light नहीं है") == "hi"
+    assert script_language("No water since 3 days") == "en"
+    assert script_language("Café fermé depuis lundi") is None
+
+
+def test_routes_by_cheapest_path(monkeypatch):
+    detected = []
+
+    def detect_batch(texts):
+        detected.append(list(texts))
+        return ["fr", None]
+
+    monkeypatch.setattr(language_router, "detect_batch", detect_batch)
+    texts = ["Road is broken", "No water https://t.co/x", "पानी नहीं", "Café fermé", "¿Qué pasó?", "🔥 #bbmp"]
+    routes = route_batch(texts, ["en", "und", None, None, None, "qme"])
+
+    assert routes == [
+        ("en", "source"),
+        ("en", "script"),
+        ("hi", "script"),
+        ("fr", "detector"),
+        (None, "undetermined"),
+        (None, "undetermined"),
+    ]
+    # Only the texts no shortcut could decide reach the detector, in one call
+    assert detected == [["Café fermé", "¿Qué pasó?"]]
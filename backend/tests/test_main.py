@@ -1,5 +1,15 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from types import SimpleNamespace
 import pytest
+from bson import ObjectId
 from fastapi.testclient import TestClient
+from pymongo import InsertOne, UpdateOne
+import main
 from main import app
 
 
@@ -19,3 +29,218 @@ def test_about_route(client):
     response = client.get("/about")
     assert response.status_code == 200
     assert response.json() == {"message": "This is the about page."}
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+        self.limits = []
+
+    def sort(self, keys):
+        return self
+
+    def limit(self, n):
+        self.limits.append(n)
+        return iter(self.docs[:n] if n > 0 else self.docs)
+
+
+class FakeTweets:
+    def __init__(self, docs):
+        self.cursor = FakeCursor(docs)
+
+    def find(self, query, projection=None):
+        return self.cursor
+
+
+@pytest.fixture
+def tweets(monkeypatch):
+    docs = [{"_id": ObjectId(), "text": f"tweet {i}", "priority_score": 90 - i,
+             "timestamp": datetime(2025, 4, 27, tzinfo=timezone.utc)} for i in range(5)]
+    fake = FakeTweets(docs)
+    monkeypatch.setattr(main, "tweets_collection", fake)
+    return fake
+
+
+@pytest.mark.parametrize("page_size", [0, -3])
+def test_filter_page_size_is_at_least_one(tweets, page_size):
+    response = main.filter_tweets({"priority_threshold": 0, "page_size": page_size})
+
+    assert response["success"]
+    assert len(response["data"]) == 1 and response["next_cursor"]
+    assert tweets.cursor.limits == [2]
+
+
+def test_filter_rejects_null_page_size(tweets):
+    response = main.filter_tweets({"priority_threshold": 0, "page_size": None})
+
+    assert not response["success"]
+    assert tweets.cursor.limits == []
+
+
+class FakeWriteCollection:
+    def __init__(self):
+        self.ops = []
+
+    def find(self, query, projection=None):
+        return []
+
+    def bulk_write(self, ops, ordered=True):
+        self.ops.extend(ops)
+        upserted = {}
+        for i, op in enumerate(ops):
+            if isinstance(op, InsertOne):
+                op._doc.setdefault("_id", ObjectId())
+            elif isinstance(op, UpdateOne):
+                upserted[i] = ObjectId()
+        return SimpleNamespace(upserted_ids=upserted)
+
+
+@pytest.fixture
+def search_env(monkeypatch):
+    collections = SimpleNamespace(tweets=FakeWriteCollection(), logs=FakeWriteCollection(),
+                                  rollups=FakeWriteCollection())
+    monkeypatch.setattr(main, "tweets_collection", collections.tweets)
+    monkeypatch.setattr(main, "logs_collection", collections.logs)
+    monkeypatch.setattr(main, "rollup_collection", collections.rollups)
+    monkeypatch.setattr(main, "dedup_index", None)
+    monkeypatch.setattr(main, "analysis_version", lambda: "v1")
+    return collections
+
+
+def collect_events(request, **kwargs):
+    async def run():
+        return [event async for event in main.search_events(request, **kwargs)]
+    return asyncio.run(run())
+
+
+def test_search_reports_every_hashtag_when_the_browser_fails(search_env, monkeypatch):
+    async def broken_session():
+        raise RuntimeError("login failed")
+
+    monkeypatch.setattr(main, "shared_session", broken_session)
+    events = collect_events(main.SearchRequest(hashtags=["water", "roads"], priority_threshold=0))
+
+    assert [(event["type"], event.get("hashtag")) for event in events] == [
+        ("error", "water"), ("error", "roads"), ("summary", None)]
+    assert events[-1]["data"]["failed_hashtags"] == 2
+    # Request log plus one "Search error" per hashtag, flushed despite the failure
+    assert [op._doc.get("event") for op in search_env.logs.ops] == [
+        "Search endpoint accessed", "Search error", "Search error"]
+
+
+def fake_search(monkeypatch, tweets_by_hashtag, priorities):
+    async def session():
+        return None
+
+    async def scrape_hashtags(hashtags, max_tweets, windows=None, session=None):
+        for hashtag in hashtags:
+            yield hashtag, tweets_by_hashtag[hashtag], None, None
+
+    async def analyze(texts, languages=None):
+        return [{"sentiment": "Negative", "urgency": "Urgent", "urgency_reason": "", "topic": "water supply",
+                 "topic_scores": {}, "priority_score": priorities[text], "translated_text": f"en: {text}",
+                 "language": "hi", "language_source": "script"} for text in texts]
+
+    monkeypatch.setattr(main, "shared_session", session)
+    monkeypatch.setattr(main, "scrape_hashtags", scrape_hashtags)
+    monkeypatch.setattr(main, "analyze_in_executor", analyze)
+
+
+def test_cluster_members_do_not_store_the_representatives_translation(search_env, monkeypatch):
+    tweets = [{"id": "1", "text": "pani nahi hai"}, {"id": "2", "text": "pani nahi hai!!"}]
+    fake_search(monkeypatch, {"water": tweets}, {"pani nahi hai": 80})
+    monkeypatch.setattr(main, "assign_clusters", lambda tweets: [("c1", "pani nahi hai")] * len(tweets))
+    monkeypatch.setattr(main, "cluster_sizes", lambda ids: {"c1": 2})
+
+    collect_events(main.SearchRequest(hashtags=["water"], priority_threshold=0))
+
+    stored = {op._doc["$set"]["tweet_id"]: op._doc["$set"] for op in search_env.tweets.ops if isinstance(op, UpdateOne)}
+    assert stored["1"]["translated_text"] == "en: pani nahi hai" and stored["1"]["language"] == "hi"
+    assert stored["2"]["translated_text"] is None and stored["2"]["translation_version"] is None
+    assert stored["2"]["language"] is None and stored["2"]["sentiment"] == "Negative"
+
+
+def test_analysis_backpressure_bounds_pending_batches(monkeypatch):
+    running, peak = 0, 0
+    lock = threading.Lock()
+
+    def slow_batch(texts, languages=None):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return [text.upper() for text in texts]
+
+    monkeypatch.setattr(main, "cached_analyze_feedback_batch", slow_batch)
+    executor = ThreadPoolExecutor(max_workers=4)
+    monkeypatch.setattr(main, "analysis_executor", executor)
+
+    async def run():
+        # Fewer slots than threads: the semaphore, not the pool, bounds the work
+        monkeypatch.setattr(main, "analysis_slots", asyncio.Semaphore(2))
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        results = await asyncio.gather(*(main.analyze_in_executor([f"t{i}"]) for i in range(6)))
+        ticker.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(run())
+    executor.shutdown()
+
+    assert results == [[f"T{i}"] for i in range(6)]
+    assert peak == 2
+    # The event loop kept running while batches were analysed
+    assert ticks >= 5
+
+
+@pytest.fixture
+def water_search(search_env, monkeypatch):
+    tweets = [{"id": "1", "text": "No water for three days"}, {"id": "2", "text": "Nice weather"},
+              {"id": "3", "text": "Pipe burst near school"}]
+    fake_search(monkeypatch, {"water": tweets},
+                {"No water for three days": 80, "Nice weather": 10, "Pipe burst near school": 60})
+    return TestClient(app)
+
+
+def test_ndjson_stream_sends_tweets_then_summary(water_search):
+    response = water_search.post("/search", json={"hashtags": ["water"], "priority_threshold": 50, "stream": "ndjson"})
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["type"] for event in events] == ["tweet", "tweet", "summary"]
+    assert [event["data"]["tweet_id"] for event in events[:2]] == ["1", "3"]
+    assert events[-1]["data"] == {"hashtags": 1, "scraped": 3, "analysed": 3, "deduplicated": 0, "reused": 0,
+                                  "returned": 2, "write_errors": 0, "failed_hashtags": 0}
+
+
+def test_sse_stream_frames_each_event(water_search):
+    response = water_search.post("/search", json={"hashtags": ["water"], "priority_threshold": 50, "stream": "sse"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [frame.split("\n") for frame in response.text.strip().split("\n\n")]
+    assert [frame[0] for frame in frames] == ["event: tweet", "event: tweet", "event: summary"]
+    assert json.loads(frames[-1][1][len("data: "):])["data"]["returned"] == 2
+
+
+def test_unstreamed_search_returns_the_same_tweets(water_search):
+    response = water_search.post("/search", json={"hashtags": ["water"], "priority_threshold": 50})
+
+    body = response.json()
+    assert body["success"] and body["write_errors"] == []
+    assert [tweet["tweet_id"] for tweet in body["data"]] == ["1", "3"]
+
+
+def test_import_opens_no_sqlite_stores():
+    # Opened by the startup event; importing main must not create files
+    assert main.dedup_index is None
+    assert main.job_queue is None
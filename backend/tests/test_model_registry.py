@@ -0,0 +1,51 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import model_registry
+
+
+@pytest.fixture(autouse=True)
+def empty_registry(monkeypatch):
+    monkeypatch.setattr(model_registry, "_loaders", {})
+    monkeypatch.setattr(model_registry, "_models", {})
+    monkeypatch.setattr(model_registry, "_locks", {})
+
+
+def test_concurrent_get_loads_once():
+    calls = []
+
+    def load():
+        calls.append(threading.get_ident())
+        time.sleep(0.05)
+        return object()
+
+    model_registry.register("slow", load)
+    assert not model_registry.is_loaded("slow")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        models = list(pool.map(lambda _: model_registry.get("slow"), range(8)))
+
+    assert len(calls) == 1
+    assert all(model is models[0] for model in models)
+    assert model_registry.is_loaded("slow")
+
+
+def test_failed_load_is_retried():
+    attempts = []
+
+    def load():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("download failed")
+        return "model"
+
+    model_registry.register("flaky", load)
+    with pytest.raises(OSError):
+        model_registry.get("flaky")
+    assert model_registry.get("flaky") == "model"
+    assert model_registry.warm_up(["flaky"])["flaky"] >= 0 and len(attempts) == 2
+
+
+def test_unknown_model():
+    with pytest.raises(KeyError):
+        model_registry.get("missing")
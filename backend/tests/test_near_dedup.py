@@ -0,0 +1,26 @@
+from near_dedup import NearDuplicateIndex, minhash, similarity
+
+COMPLAINT = "No water supply in Jayanagar 4th block for three days. @BWSSB please fix this urgently! https://t.co/abc"
+RETWEET = "RT @citizen: No water supply in Jayanagar 4th block for three days. @BWSSB please fix this urgently! https://t.co/x"
+OTHER = "Huge pothole on MG road near the metro station, two bikes skidded today"
+
+
+def test_retweet_copies_share_a_signature():
+    assert similarity(minhash(COMPLAINT), minhash(RETWEET)) == 1.0
+    assert similarity(minhash(COMPLAINT), minhash(OTHER)) < 0.2
+
+
+def test_clusters_grow_once_per_tweet_and_persist(tmp_path):
+    path = str(tmp_path / "dedup.sqlite3")
+    index = NearDuplicateIndex(path)
+    assignments = index.assign([("1", COMPLAINT), ("2", RETWEET), ("3", OTHER), ("2", RETWEET)])
+
+    assert [a.cluster_id for a in assignments] == ["1", "1", "3", "1"]
+    assert assignments[1].representative_text == COMPLAINT
+    assert index.sizes(["1", "3"]) == {"1": 2, "3": 1}
+
+    # A later run sees the same clusters
+    reopened = NearDuplicateIndex(path)
+    later = reopened.assign([("4", "RT @someone: " + COMPLAINT)])
+    assert later[0].cluster_id == "1" and not later[0].new_cluster
+    assert reopened.sizes(["1"]) == {"1": 3}
@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+from bson import ObjectId
+from pagination import decode_cursor, encode_cursor, keyset_query
+
+
+def test_cursor_round_trip():
+    doc = {"_id": ObjectId(), "priority_score": 80, "timestamp": datetime(2025, 4, 27, 2, 30, tzinfo=timezone.utc)}
+    assert decode_cursor(encode_cursor(doc)) == (80, doc["timestamp"], doc["_id"])
+
+
+def test_first_page_keeps_query():
+    query = {"priority_score": {"$gte": 50}}
+    assert keyset_query(query, None) is query
+
+
+def test_keyset_query_continues_after_cursor():
+    last_id = ObjectId()
+    doc = {"_id": last_id, "priority_score": 60, "timestamp": datetime(2025, 4, 27, tzinfo=timezone.utc)}
+    query = keyset_query({"priority_score": {"$gte": 50}}, encode_cursor(doc))
+
+    after = query["$and"][1]["$or"]
+    assert {"priority_score": {"$lt": 60}} in after
+    assert {"priority_score": 60, "timestamp": {"$lt": doc["timestamp"]}} in after
+    assert after[-1]["_id"] == {"$lt": last_id}
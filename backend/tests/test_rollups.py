@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+from rollups import ALL_HASHTAGS, merge_series, rollup_increments
+
+HOUR = datetime(2025, 4, 27, 2, tzinfo=timezone.utc)
+
+
+def tweet(topic="water supply", sentiment="Negative", priority=100, minute=30, keywords=("BWSSB", "Bengaluru")):
+    return {"keywords": list(keywords), "topic": topic, "sentiment": sentiment, "urgency": "Urgent",
+            "priority_score": priority, "timestamp": HOUR.replace(minute=minute)}
+
+
+def test_new_tweets_increment_each_hashtag_and_the_total_once():
+    increments = rollup_increments([tweet(), tweet(minute=45)])
+
+    assert set(increments) == {(tag, "water supply", HOUR) for tag in ("BWSSB", "Bengaluru", ALL_HASHTAGS)}
+    assert increments[(ALL_HASHTAGS, "water supply", HOUR)] == {
+        "count": 2, "priority_sum": 200, "sentiment.Negative": 2, "urgency.Urgent": 2}
+
+
+def test_reanalysed_tweet_moves_between_buckets():
+    old = tweet(topic="others", sentiment="Neutral", priority=80)
+    new = tweet()
+    increments = rollup_increments([new], [old])
+
+    assert increments[(ALL_HASHTAGS, "others", HOUR)] == {
+        "count": -1, "priority_sum": -80, "sentiment.Neutral": -1, "urgency.Urgent": -1}
+    assert increments[(ALL_HASHTAGS, "water supply", HOUR)]["count"] == 1
+
+
+def test_merge_series_sums_topics_into_days():
+    buckets = [
+        {"hour": HOUR, "topic": "water supply", "count": 2, "priority_sum": 180, "sentiment": {"Negative": 2}},
+        {"hour": HOUR.replace(hour=5), "topic": "transport", "count": 1, "priority_sum": 30,
+         "sentiment": {"Neutral": 1}},
+        {"hour": HOUR.replace(hour=6), "topic": "others", "count": 0, "priority_sum": 0},
+    ]
+    assert [point["count"] for point in merge_series(buckets)] == [2, 1]
+
+    (day,) = merge_series(buckets, "day")
+    assert day["start"] == HOUR.replace(hour=0)
+    assert (day["count"], day["avg_priority"]) == (3, 70.0)
+    assert day["sentiment"] == {"Negative": 2, "Neutral": 1}
@@ -0,0 +1,55 @@
+import asyncio
+from jobs import JobQueue, JobStore
+from scheduler import HashtagScheduler, newest_tweet, watermark_update
+from utils.tweet_utils import snowflake
+
+
+def test_newest_tweet_compares_ids_numerically():
+    tweets = [{"id": "999999999999999999"}, {"id": "1000000000000000001"}, {"id": None}, {"id": "abc"}]
+
+    assert newest_tweet(tweets)["id"] == "1000000000000000001"
+    assert newest_tweet([{"id": None}]) is None
+    assert snowflake("abc") is None
+
+
+def test_poll_queues_incremental_jobs_with_watermarks():
+    store = JobStore(":memory:")
+    queue = JobQueue(store, runner=None)
+    scheduler = HashtagScheduler(queue.submit, lambda hashtags: {"potholes": ("1000000000000000001", None),
+                                                                 "floods": ("5", "41")},
+                                 hashtags=["potholes", "watersupply", "floods"])
+
+    first = asyncio.run(scheduler.poll())
+    jobs = {hashtag: job for hashtag, job, created in first}
+    assert jobs["potholes"]["since_id"] == "1000000000000000001" and jobs["potholes"]["max_id"] is None
+    assert jobs["watersupply"]["since_id"] is None
+    assert (jobs["floods"]["since_id"], jobs["floods"]["max_id"]) == ("5", "41")
+    assert all(job["incremental"] for job in jobs.values())
+
+    # A poll still in flight is not queued twice
+    second = asyncio.run(scheduler.poll())
+    assert [created for _, _, created in second] == [False, False, False]
+
+
+BURST = [{"id": str(i)} for i in range(42, 50)]
+
+
+def test_complete_poll_raises_the_mark():
+    update = watermark_update("potholes", BURST, since_id="5", complete=True)
+    assert update._doc["$max"] == {"since_id": 49}
+
+
+def test_cut_off_poll_keeps_the_mark_and_records_the_gap():
+    update = watermark_update("potholes", BURST, since_id="5", complete=False)
+
+    assert "$max" not in update._doc
+    assert (update._doc["$set"]["gap_max_id"], update._doc["$set"]["gap_newest_id"]) == (41, 49)
+
+
+def test_gap_polls_narrow_then_close_the_window():
+    narrowed = watermark_update("potholes", [{"id": "30"}, {"id": "41"}], since_id="5", max_id="41", complete=False)
+    assert narrowed._doc["$min"] == {"gap_max_id": 29}
+
+    closed = watermark_update("potholes", [{"id": "6"}], since_id="5", max_id="29", complete=True)
+    assert closed._doc[0]["$set"]["since_id"] == {"$max": ["$since_id", "$gap_newest_id"]}
+    assert closed._doc[1] == {"$unset": ["gap_max_id", "gap_newest_id"]}
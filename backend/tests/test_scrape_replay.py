@@ -0,0 +1,31 @@
+import json
+import os
+from hashtagger import extract_tweets
+from scrape_replay import iter_fixture_tweets, save_payload, load_payloads, synthesize_payloads
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scrape.json")
+
+
+def sample_tweets():
+    with open(SAMPLE_FILE, "r", encoding="utf-8") as f:
+        return [tweet for tweet in json.load(f) if tweet.get("text")]
+
+
+def test_synthesized_payload_round_trips_through_extract_tweets():
+    tweets = sample_tweets()
+    payload = synthesize_payloads(tweets, 3)[0]
+    parsed = extract_tweets(payload)
+
+    assert [tweet["text"] for tweet in parsed] == [tweet["text"] for tweet in tweets[:3]]
+    assert parsed[0]["user"]["screen_name"] == tweets[0]["user"]["screen_name"]
+    assert parsed[0]["id"] == str(10**18)
+
+
+def test_fixtures_replay_in_capture_order(tmp_path):
+    payloads = synthesize_payloads(sample_tweets(), 45)
+    for payload in payloads:
+        save_payload(str(tmp_path), "#PotHoles", payload)
+
+    assert load_payloads(str(tmp_path), "potholes") == payloads
+    ids = [tweet["id"] for tweet in iter_fixture_tweets(str(tmp_path), "potholes")]
+    assert ids == [str(10**18 - i) for i in range(45)]
@@ -0,0 +1,46 @@
+import pytest
+from sentiment_backends import OnnxSentimentClassifier, load_sentiment_classifier
+
+np = pytest.importorskip("numpy")
+
+
+class FakeInput:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeSession:
+    def __init__(self):
+        self.batches = []
+
+    def get_inputs(self):
+        return [FakeInput("input_ids"), FakeInput("attention_mask")]
+
+    def run(self, outputs, inputs):
+        self.batches.append(len(inputs["input_ids"]))
+        # Texts with an odd token count come out positive, even ones negative (never tied)
+        lengths = inputs["attention_mask"].sum(axis=1)
+        return [np.stack([1 - lengths % 2, lengths % 2], axis=1).astype(np.float32)]
+
+
+def fake_tokenizer(texts, padding, truncation, max_length, return_tensors):
+    longest = max(len(text.split()) for text in texts)
+    mask = np.array([[1] * len(text.split()) + [0] * (longest - len(text.split())) for text in texts])
+    return {"input_ids": mask.copy(), "attention_mask": mask}
+
+
+def test_onnx_classifier_matches_pipeline_interface():
+    session = FakeSession()
+    classifier = OnnxSentimentClassifier(session, fake_tokenizer, {0: "NEGATIVE", 1: "POSITIVE"})
+
+    results = classifier(["great work", "thank you team", "no water"], batch_size=2, truncation=True)
+
+    assert session.batches == [2, 1]
+    assert [r["label"] for r in results] == ["NEGATIVE", "POSITIVE", "NEGATIVE"]
+    assert all(0.5 < r["score"] <= 1 for r in results)
+    assert classifier("thank you team")[0]["label"] == "POSITIVE"
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        load_sentiment_classifier("tensorrt", "distilbert-base-uncased-finetuned-sst-2-english")
@@ -0,0 +1,43 @@
+import pytest
+import model_registry
+import sentiment_module
+from sentiment_module import get_sentiment_tiers
+
+COMPOUND = {"great work, thank you": 0.8, "fire near the school, horrible": -0.9, "no water since monday": 0.0}
+
+
+class FakeVader:
+    def polarity_scores(self, text):
+        return {"compound": COMPOUND[text]}
+
+
+@pytest.fixture
+def models(monkeypatch):
+    escalated = []
+
+    def transformer(texts, batch_size, truncation):
+        escalated.append(list(texts))
+        return [{"label": "NEGATIVE", "score": 0.98} for _ in texts]
+
+    fakes = {"vader": FakeVader(), "sentiment": transformer}
+    monkeypatch.setattr(model_registry, "get", lambda name: fakes[name])
+    return escalated
+
+
+def test_tiered_escalates_only_the_ambiguous_band(models):
+    decided = get_sentiment_tiers(list(COMPOUND), mode="tiered", band=(-0.5, 0.5))
+
+    assert decided == [("Positive", "vader"), ("Negative", "vader"), ("Negative", "transformer")]
+    assert models == [["no water since monday"]]
+
+
+def test_vader_only_is_neutral_inside_band(models):
+    decided = get_sentiment_tiers(list(COMPOUND), mode="vader", band=(-0.5, 0.5))
+
+    assert decided[2] == ("Neutral", "vader")
+    assert models == []
+
+
+def test_low_confidence_transformer_label_is_neutral():
+    assert sentiment_module.transformer_label({"label": "POSITIVE", "score": 0.55}, 0.6) == "Neutral"
+    assert sentiment_module.transformer_label({"label": "POSITIVE", "score": 0.95}, 0.6) == "Positive"
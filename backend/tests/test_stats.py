@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+import pytest
+from stats import format_stats, parse_time, stats_match, stats_pipeline
+
+
+def test_match_uses_indexed_filter_fields():
+    since = parse_time("2025-04-27")
+    until = parse_time("2025-04-28T00:00:00Z")
+    match = stats_match("#BengaluruTraffic", since, until, 40)
+
+    assert match == {
+        "priority_score": {"$gte": 40},
+        "keywords": "BengaluruTraffic",
+        "timestamp": {"$gte": datetime(2025, 4, 27, tzinfo=timezone.utc),
+                      "$lt": datetime(2025, 4, 28, tzinfo=timezone.utc)},
+    }
+    assert stats_pipeline(match)[0] == {"$match": match}
+
+
+def test_invalid_time_is_rejected():
+    with pytest.raises(ValueError):
+        parse_time("last tuesday")
+
+
+def test_format_stats_flattens_facets():
+    result = {
+        "total": [{"count": 5}],
+        "sentiment": [{"_id": "Negative", "count": 4}, {"_id": "Neutral", "count": 1}],
+        "urgency": [{"_id": "Urgent", "count": 3}, {"_id": "Not Urgent", "count": 2}],
+        "topic": [{"_id": "water supply", "count": 5}],
+        "priority": [{"_id": 40, "count": 1}, {"_id": 70, "count": 4}],
+    }
+    stats = format_stats(result)
+
+    assert stats["total"] == 5
+    assert stats["sentiment"] == {"Negative": 4, "Neutral": 1}
+    assert stats["priority"] == {"low": 0, "medium": 1, "high": 4}
+    assert format_stats(None)["total"] == 0
@@ -0,0 +1,64 @@
+import pytest
+import model_registry
+import sentiment_module
+from topic_classifier import EmbeddingTopicClassifier
+
+VOCABULARY = ["water", "tap", "pothole", "road", "bus", "metro"]
+
+
+def bag_of_words(texts):
+    import numpy as np
+    return np.array([[text.lower().split().count(word) for word in VOCABULARY] for text in texts], dtype=np.float32)
+
+
+def test_label_embeddings_are_encoded_once():
+    pytest.importorskip("numpy")
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return bag_of_words(texts)
+
+    classifier = EmbeddingTopicClassifier(encode, {"water supply": "water tap", "road maintenance": "pothole road",
+                                                   "transport": "bus metro"})
+    results = classifier.classify_batch(["no water in the tap", "pothole pothole on road", "metro delayed"])
+
+    assert [topic for topic, _, _ in results] == ["water supply", "road maintenance", "transport"]
+    assert results[0][1] == pytest.approx(1.0)
+    # Labels once at construction, then one pass for the whole batch
+    assert len(calls) == 2 and len(calls[1]) == 3
+
+
+def test_weak_embedding_match_falls_back_to_keywords(monkeypatch):
+    class Weak:
+        def classify_batch(self, texts):
+            return [("health", 0.1, {"health": 0.1}) for _ in texts]
+
+    monkeypatch.setattr(sentiment_module, "TOPIC_MODE", "embedding")
+    monkeypatch.setattr(sentiment_module, "_embedding_topics_unavailable", False)
+    monkeypatch.setattr(model_registry, "get", lambda name: Weak())
+
+    counts = [{"health": 0, "transport": 2}, {"health": 0, "transport": 0}]
+    topics = sentiment_module.get_topics_batch(["bus late", "hmm"], counts)
+
+    assert topics[0] == ("transport", counts[0], "keywords")
+    assert topics[1] == ("health", {"health": 0.1}, "embedding")
+
+
+def test_unloadable_embedding_model_switches_topic_version(monkeypatch):
+    def fail(names):
+        if "topics" in names:
+            raise OSError("download failed")
+        return {name: 0.0 for name in names}
+
+    monkeypatch.setattr(sentiment_module, "TOPIC_MODE", "embedding")
+    monkeypatch.setattr(sentiment_module, "_embedding_topics_unavailable", False)
+    monkeypatch.setattr(model_registry, "get", lambda name: object())
+    embedding_version = sentiment_module.topic_version()
+    monkeypatch.setattr(model_registry, "warm_up", fail)
+
+    sentiment_module.warm_up()
+
+    assert sentiment_module._embedding_topics_unavailable
+    assert embedding_version != "keyword-topics"
+    assert sentiment_module.topic_version() == "keyword-topics"
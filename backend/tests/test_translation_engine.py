@@ -0,0 +1,38 @@
+from translation_engine import TranslationEngine, TranslationMemo
+
+
+def fake_tokenizer(texts, truncation, max_length):
+    return {"input_ids": [text.split()[:max_length] for text in texts]}
+
+
+def test_batches_are_bucketed_by_length_and_keep_input_order():
+    batches = []
+
+    def generate(chunk):
+        batches.append(list(chunk))
+        return [text.upper() for text in chunk]
+
+    engine = TranslationEngine(fake_tokenizer, generate, batch_size=2)
+    texts = ["a b c d e", "a", "a b c d", "a b"]
+
+    assert engine.translate(texts) == ["A B C D E", "A", "A B C D", "A B"]
+    assert batches == [["a", "a b"], ["a b c d", "a b c d e"]]
+
+
+def test_failed_batch_yields_none():
+    def generate(chunk):
+        if len(chunk[0].split()) > 2:
+            raise RuntimeError("out of memory")
+        return chunk
+
+    engine = TranslationEngine(fake_tokenizer, generate, batch_size=1)
+    assert engine.translate(["a b c", "a"]) == [None, "a"]
+
+
+def test_memo_skips_identity_translations():
+    memo = TranslationMemo(max_entries=2)
+    memo.update({"पानी नहीं": "no water", "already english": "already english", "ಬೆಂಕಿ": None})
+
+    assert memo.get("पानी नहीं") == "no water"
+    assert memo.get("already english") is None
+    assert len(memo) == 1
@@ -0,0 +1,70 @@
+import os
+
+# Embedding-based topic classification. Topic descriptions are encoded once when
+# the classifier is built. Each batch of texts is then embedded in a single pass
+# and scored against every topic with one matrix product of normalised vectors,
+# which gives the cosine similarity. This replaces one zero-shot NLI pass per
+# (text, topic) pair.
+
+TOPIC_EMBEDDING_MODEL = os.getenv("TOPIC_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+TOPIC_EMBEDDING_BATCH_SIZE = int(os.getenv("TOPIC_EMBEDDING_BATCH_SIZE", "64"))
+
+
+def load_encoder(model_name=TOPIC_EMBEDDING_MODEL, batch_size=TOPIC_EMBEDDING_BATCH_SIZE):
+    """
+    Sentence encoder returning L2-normalised embeddings
+    Returns:
+        Callable(list of texts) -> numpy array of shape (len(texts), dim)
+    """
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name, device="cpu")
+
+    def encode(texts):
+        return model.encode(list(texts), batch_size=batch_size, normalize_embeddings=True,
+                            convert_to_numpy=True, show_progress_bar=False)
+    return encode
+
+
+class EmbeddingTopicClassifier:
+    """
+    Cosine-similarity topic classifier over cached label embeddings
+    Args:
+        encode: Callable(list of texts) -> array of normalised embeddings
+        descriptions: Dict of topic -> description text embedded for that topic
+    """
+
+    def __init__(self, encode, descriptions):
+        import numpy as np
+        self.encode = encode
+        self.topics = list(descriptions)
+        labels = np.asarray(encode([descriptions[topic] for topic in self.topics]), dtype=np.float32)
+        # Normalise again so encoders that skip it still give cosine scores
+        self.label_embeddings = labels / np.linalg.norm(labels, axis=1, keepdims=True)
+
+    def scores(self, texts):
+        """
+        Cosine similarity of every text with every topic
+        Returns:
+            Array of shape (len(texts), len(topics))
+        """
+        import numpy as np
+        embeddings = np.asarray(self.encode(list(texts)), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.where(norms == 0, 1, norms)
+        return embeddings @ self.label_embeddings.T
+
+    def classify_batch(self, texts):
+        """
+        Best topic and per-topic scores for each text
+        Returns:
+            List of (topic, best score, {topic: score}) in input order
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        results = []
+        for row in self.scores(texts):
+            best = int(row.argmax())
+            results.append((self.topics[best], float(row[best]),
+                            {topic: round(float(score), 4) for topic, score in zip(self.topics, row)}))
+        return results
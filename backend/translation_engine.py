@@ -0,0 +1,172 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Batched MarianMT translation for the non-English share of the feedback.
+# Inputs are sorted by token length and cut into batches, so each padded batch
+# holds texts of similar length. Generation uses a configurable beam size and a
+# hard max_new_tokens cap. Backends:
+#
+#   torch        stock fp32 MarianMTModel
+#   torch-int8   dynamic int8 quantization of the Linear layers
+#   ctranslate2  model converted once to CTranslate2 with int8 weights
+
+BACKENDS = ("torch", "torch-int8", "ctranslate2")
+
+# Where converted CTranslate2 models are kept between runs
+CT2_DIR = os.getenv("TRANSLATION_CT2_DIR", os.path.join(os.path.expanduser("~"), ".cache", "civicpulse", "ctranslate2"))
+
+
+class TranslationEngine:
+    """
+    Length-bucketed batch translation on top of a backend generate function
+    Args:
+        tokenizer: HuggingFace tokenizer of the translation model
+        generate: Callable(list of texts) -> list of translations for one batch
+        batch_size: Default texts per generate call
+        max_input_tokens: Source texts are truncated to this many tokens
+    """
+
+    def __init__(self, tokenizer, generate, batch_size=8, max_input_tokens=256):
+        self.tokenizer = tokenizer
+        self.generate = generate
+        self.batch_size = batch_size
+        self.max_input_tokens = max_input_tokens
+
+    def buckets(self, texts, batch_size=None):
+        """
+        Group text indices into batches of similar token length
+        Returns:
+            List of index lists, shortest texts first
+        """
+        batch_size = batch_size or self.batch_size
+        input_ids = self.tokenizer(list(texts), truncation=True, max_length=self.max_input_tokens)["input_ids"]
+        order = sorted(range(len(texts)), key=lambda i: len(input_ids[i]))
+        return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+    def translate(self, texts, batch_size=None):
+        """
+        Translate texts in length-bucketed batches
+        Args:
+            texts: Source texts
+            batch_size: Texts per batch (default: the engine's batch_size)
+        Returns:
+            Translations in input order; None where a batch failed
+        """
+        texts = list(texts)
+        translated = [None] * len(texts)
+        if not texts:
+            return translated
+        for bucket in self.buckets(texts, batch_size):
+            try:
+                outputs = self.generate([texts[i] for i in bucket])
+            except Exception as e:
+                print(f"Batch translation failed: {e}")
+                continue
+            for i, output in zip(bucket, outputs):
+                translated[i] = output
+        return translated
+
+
+def load_translation_engine(backend, model_name, num_beams=1, max_new_tokens=128,
+                            batch_size=8, max_input_tokens=256):
+    """
+    Load the translation model for the given backend
+    Args:
+        backend: One of BACKENDS
+        model_name: HuggingFace MarianMT model
+        num_beams: Beam size (1 = greedy)
+        max_new_tokens: Hard cap on generated tokens per text
+        batch_size: Default texts per batch
+        max_input_tokens: Source truncation length
+    Returns:
+        TranslationEngine
+    """
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    if backend in ("torch", "torch-int8"):
+        import torch
+        from transformers import MarianMTModel
+        model = MarianMTModel.from_pretrained(model_name).eval()
+        if backend == "torch-int8":
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+        def generate(chunk):
+            tokens = tokenizer(chunk, return_tensors="pt", padding=True, truncation=True, max_length=max_input_tokens)
+            with torch.inference_mode():
+                output = model.generate(**tokens, num_beams=num_beams, max_new_tokens=max_new_tokens, do_sample=False)
+            return tokenizer.batch_decode(output, skip_special_tokens=True)
+
+    elif backend == "ctranslate2":
+        import ctranslate2
+        translator = ctranslate2.Translator(_convert_ct2(model_name), device="cpu")
+
+        def generate(chunk):
+            input_ids = tokenizer(chunk, truncation=True, max_length=max_input_tokens)["input_ids"]
+            source = [tokenizer.convert_ids_to_tokens(ids) for ids in input_ids]
+            results = translator.translate_batch(source, beam_size=num_beams, max_decoding_length=max_new_tokens,
+                                                 max_batch_size=len(chunk))
+            return [tokenizer.decode(tokenizer.convert_tokens_to_ids(result.hypotheses[0]), skip_special_tokens=True)
+                    for result in results]
+
+    else:
+        raise ValueError(f"Unknown translation backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+
+    return TranslationEngine(tokenizer, generate, batch_size=batch_size, max_input_tokens=max_input_tokens)
+
+
+def _convert_ct2(model_name):
+    # One-time conversion with int8 weights
+    path = os.path.join(CT2_DIR, model_name.replace("/", "--"))
+    if not os.path.isdir(path):
+        from ctranslate2.converters import TransformersConverter
+        os.makedirs(CT2_DIR, exist_ok=True)
+        TransformersConverter(model_name).convert(path, quantization="int8")
+    return path
+
+
+class TranslationMemo:
+    """
+    Thread-safe LRU of source text -> English translation. Seeded with stored
+    translations so tweets re-analysed after a model change skip translation.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text):
+        with self._lock:
+            translated = self._entries.get(text)
+            if translated is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(text)
+            self.hits += 1
+            return translated
+
+    def put(self, text, translated):
+        with self._lock:
+            self._entries[text] = translated
+            self._entries.move_to_end(text)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def update(self, translations):
+        # Identity "translations" are English text or failed translations; skip both
+        for text, translated in translations.items():
+            if text and translated and translated != text:
+                self.put(text, translated)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,91 @@
+import json
+
+try:
+    import ijson
+except ImportError:  # optional, falls back to the incremental decoder below
+    ijson = None
+
+READ_SIZE = 1 << 16
+
+
+def iter_json_records(path):
+    """
+    Stream records from a JSON array file or an NDJSON file without loading it whole
+    Args:
+        path: File containing either a top-level JSON array or one JSON object per line
+    Returns:
+        Iterator over the decoded records
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        first = _first_char(f)
+        f.seek(0)
+        if first == "[":
+            if ijson is not None:
+                with open(path, "rb") as raw:
+                    yield from ijson.items(raw, "item", use_float=True)
+            else:
+                yield from _iter_json_array(f)
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def _first_char(f):
+    while True:
+        chunk = f.read(READ_SIZE)
+        if not chunk:
+            return ""
+        stripped = chunk.lstrip()
+        if stripped:
+            return stripped[0]
+
+
+def _iter_json_array(f):
+    """
+    Decode the elements of a top-level JSON array one at a time, keeping only the
+    unparsed tail of the file in memory
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(READ_SIZE).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("Expected a JSON array")
+    pos = 1
+    eof = False
+
+    while True:
+        # Skip whitespace and separators, reading more when the buffer runs out
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = f.read(READ_SIZE), 0
+            eof = not buffer
+
+        if pos >= len(buffer):
+            raise ValueError("Unterminated JSON array")
+        if buffer[pos] == "]":
+            return
+
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            more = f.read(READ_SIZE)
+            eof = not more
+            buffer, pos = buffer[pos:] + more, 0
+            continue
+
+        if end == len(buffer) and not eof:
+            # A number cut off by the read boundary still decodes; read on
+            # until the value is followed by something
+            more = f.read(READ_SIZE)
+            eof = not more
+            buffer, pos = buffer[pos:] + more, 0
+            continue
+
+        yield record
+        buffer, pos = buffer[end:], 0
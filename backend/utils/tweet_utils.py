@@ -16,6 +16,20 @@ def parse_twitter_timestamp(timestamp_str):
         print(f"Error parsing timestamp: {e}")
         return datetime.now(timezone.utc)
 
+def snowflake(tweet_id):
+    """
+    Numeric value of a tweet id. Snowflake ids grow with time, so the newest tweet
+    has the largest id; comparing the strings would misorder ids of different lengths.
+    Args:
+        tweet_id: Tweet id string (id_str)
+    Returns:
+        int, or None when the id is missing or not numeric
+    """
+    try:
+        return int(tweet_id)
+    except (TypeError, ValueError):
+        return None
+
 def extract_hashtags(tweet_text):
     """
     Extract hashtags from tweet text
@@ -41,3 +55,43 @@ def calculate_priority_score(sentiment, urgency):
     urgency_score = {"Urgent": 50, "Not Urgent": 0}
     
     return sentiment_score.get(sentiment, 30) + urgency_score.get(urgency, 0)
+
+def build_tweet_doc(tweet, analysis, timestamp, analysis_version, translation_version=None,
+                    cluster_id=None, cluster_size=1):
+    """
+    Build the MongoDB document stored by /search for an analysed tweet
+    Args:
+        tweet: Parsed tweet from hashtagger (needs "text")
+        analysis: Result of analyze_feedback for the tweet text
+        timestamp: Fallback timestamp when the tweet has no created_at
+        analysis_version: sentiment_module.analysis_version() the analysis was made with
+        translation_version: sentiment_module.translation_version() of translated_text
+        cluster_id: near_dedup cluster the tweet belongs to
+        cluster_size: Number of near-duplicate tweets in that cluster
+    Returns:
+        Document dict ready for insertion
+    """
+    return {
+        "keywords": tweet.get("tagged_hashtags", []),
+        "sentiment": analysis["sentiment"],
+        "sentiment_tier": analysis.get("sentiment_tier"),
+        "urgency": analysis["urgency"],
+        "urgency_reason": analysis["urgency_reason"],
+        "topic": analysis["topic"],
+        "topic_scores": [
+            {"name": topic, "score": score}
+            for topic, score in analysis["topic_scores"].items()
+        ] if isinstance(analysis["topic_scores"], dict) else analysis["topic_scores"],
+        "topic_source": analysis.get("topic_source"),
+        "priority_score": analysis["priority_score"],
+        "timestamp": parse_twitter_timestamp(tweet["created_at"]) if "created_at" in tweet else timestamp,
+        "tweet_id": tweet.get("id", ""),
+        "text": tweet["text"],  # Store the original tweet text
+        "cluster_id": cluster_id,
+        "cluster_size": cluster_size,
+        "translated_text": analysis.get("translated_text"),
+        "translation_version": translation_version,
+        "language": analysis.get("language"),
+        "language_source": analysis.get("language_source"),
+        "analysis_version": analysis_version
+    }
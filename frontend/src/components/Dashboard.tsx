@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { motion } from 'framer-motion';
 import { TabType, SentimentData } from '../types';
-import { fetchSentimentData } from '../services/api';
+import { streamSentimentData } from '../services/api';
 import HashtagInput from './HashtagInput';
 import TabNavigation from './TabNavigation';
 import PrioritySlider from './PrioritySlider';
@@ -20,28 +20,43 @@ const Dashboard: React.FC = () => {
 
   // Fetch data when hashtag or priority changes
   useEffect(() => {
+    // Aborted when a newer search supersedes this one, so its late tweets,
+    // errors and loading state never touch the newer search's view
+    const controller = new AbortController();
+
     const fetchData = async () => {
       // Always fetch, even if hashtag is empty (to support /filter)
       setIsLoading(true);
       setError(null);
+      setData([]);
 
       try {
-        const result = await fetchSentimentData(hashtag, priorityThreshold);
+        // Render tweets as they are analysed instead of waiting for the whole search
+        const result = await streamSentimentData(hashtag, priorityThreshold, (tweet) => {
+          if (!controller.signal.aborted) {
+            setData((previous) => [...previous, tweet]);
+          }
+        }, controller.signal);
 
-        if (result.success) {
-          setData(result.data);
-        } else {
+        if (!result.success && !controller.signal.aborted) {
           setError(result.message || 'An error occurred fetching data');
         }
       } catch (err) {
-        setError('Failed to fetch sentiment data. Please try again.');
-        console.error(err);
+        if (!controller.signal.aborted) {
+          setError('Failed to fetch sentiment data. Please try again.');
+          console.error(err);
+        }
       } finally {
-        setIsLoading(false);
+        if (!controller.signal.aborted) {
+          setIsLoading(false);
+        }
       }
     };
 
     fetchData();
+    return () => {
+      controller.abort();
+    };
   }, [hashtag, priorityThreshold]);
 
   // Handle hashtag submission
@@ -109,6 +109,11 @@ const ResultsTable: React.FC<ResultsTableProps> = ({ data }) => {
                   <div className="text-sm font-medium text-neutral-900">
                     {item.topic}
                   </div>
+                  {item.cluster_size && item.cluster_size > 1 && (
+                    <div className="text-xs text-neutral-500">
+                      {item.cluster_size} citizens reported this
+                    </div>
+                  )}
                 </td>
                 <td className="px-6 py-4 whitespace-nowrap">
                   <span
@@ -1,4 +1,4 @@
-import { ApiResponse, SentimentData } from '../types';
+import { ApiResponse, SentimentData, SearchStreamEvent, StatsResponse, TrendsResponse, JobResponse } from '../types';
 
 // Set your FastAPI backend URL here
 const API_BASE_URL = 'http://localhost:8080';
@@ -37,6 +37,104 @@ export const fetchSentimentData = async (
   }
 };
 
+/**
+ * Streams sentiment data for the given hashtag from the FastAPI backend as NDJSON,
+ * calling onTweet for every analysed tweet as soon as the backend emits it
+ *
+ * @param hashtag - The hashtag to track
+ * @param priorityThreshold - Priority threshold to filter results (0-100)
+ * @param onTweet - Called with each tweet that clears the threshold
+ * @param signal - Optional AbortSignal cancelling the request (e.g. when a newer search supersedes it)
+ * @returns Promise resolving to the final summary response; success is false when
+ *          the request fails or any hashtag could not be searched
+ */
+export const streamSentimentData = async (
+  hashtag: string,
+  priorityThreshold: number,
+  onTweet: (tweet: SentimentData) => void,
+  signal?: AbortSignal
+): Promise<ApiResponse> => {
+  const collected: SentimentData[] = [];
+  try {
+    const response = await fetch(`${API_BASE_URL}/search`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json'
+      },
+      body: JSON.stringify({
+        hashtags: [hashtag],
+        priority_threshold: priorityThreshold,
+        stream: 'ndjson'
+      }),
+      signal
+    });
+    if (!response.ok) {
+      // FastAPI reports request errors as {"detail": ...}
+      const body = await response.json().catch(() => null);
+      const detail = body?.detail ?? body?.message;
+      return {
+        success: false,
+        message: typeof detail === 'string' ? detail : `Search failed (HTTP ${response.status})`,
+        data: []
+      };
+    }
+    if (!response.body) {
+      throw new Error('Streaming is not supported by this browser');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    // Hashtags the backend reported as failed ("error" events, summary.failed_hashtags)
+    const errors: string[] = [];
+    let failedHashtags = 0;
+
+    const handleLine = (line: string) => {
+      if (!line.trim()) return;
+      const event: SearchStreamEvent = JSON.parse(line);
+      if (event.type === 'tweet' && event.data) {
+        collected.push(event.data as SentimentData);
+        onTweet(event.data as SentimentData);
+      } else if (event.type === 'error') {
+        errors.push(`#${event.hashtag}: ${event.error}`);
+      } else if (event.type === 'summary') {
+        failedHashtags = Number((event.data as Record<string, unknown>)?.failed_hashtags ?? 0);
+      }
+    };
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop() ?? '';
+      lines.forEach(handleLine);
+    }
+    handleLine(buffer);
+
+    if (errors.length > 0 || failedHashtags > 0) {
+      return {
+        success: false,
+        message: errors.length > 0
+          ? `Search failed for ${errors.join('; ')}`
+          : `Search failed for ${failedHashtags} hashtag(s)`,
+        data: collected
+      };
+    }
+    return { success: true, data: collected };
+  } catch (error) {
+    if (signal?.aborted) {
+      return { success: false, message: 'Search cancelled', data: collected };
+    }
+    console.error('Error streaming sentiment data:', error);
+    return {
+      success: false,
+      message: 'Failed to fetch sentiment data. Please try again later.',
+      data: collected
+    };
+  }
+};
+
 /**
  * Fetches tweets with priority_score less than the given threshold from FastAPI backend
  * 
@@ -66,4 +164,116 @@ export const fetchFilteredTweets = async (
       data: []
     };
   }
-};
\ No newline at end of file
+};
+
+/**
+ * Fetches server-side sentiment, urgency, topic and priority-bucket counts
+ *
+ * @param hashtag - Optional hashtag to restrict the counts to
+ * @param priorityThreshold - Minimum priority score to count
+ * @param since - Optional ISO-8601 start of the time range
+ * @param until - Optional ISO-8601 end of the time range (exclusive)
+ * @returns Promise with the aggregated counts
+ */
+export const fetchStats = async (
+  hashtag?: string,
+  priorityThreshold = 0,
+  since?: string,
+  until?: string
+): Promise<StatsResponse> => {
+  const params = new URLSearchParams({ priority_threshold: String(priorityThreshold) });
+  if (hashtag) params.set('hashtag', hashtag);
+  if (since) params.set('since', since);
+  if (until) params.set('until', until);
+  try {
+    const response = await fetch(`${API_BASE_URL}/stats?${params.toString()}`);
+    return await response.json();
+  } catch (error) {
+    console.error('Error fetching stats:', error);
+    return {
+      success: false,
+      error: 'Failed to fetch statistics. Please try again later.'
+    };
+  }
+};
+
+/**
+ * Fetches an hourly or daily time series from the backend's pre-aggregated rollups
+ *
+ * @param hashtag - Optional hashtag (all hashtags when omitted)
+ * @param topic - Optional topic (all topics when omitted)
+ * @param granularity - 'hour' or 'day'
+ * @param since - Optional ISO-8601 start of the time range
+ * @param until - Optional ISO-8601 end of the time range (exclusive)
+ * @returns Promise with the time series, oldest point first
+ */
+export const fetchTrends = async (
+  hashtag?: string,
+  topic?: string,
+  granularity: 'hour' | 'day' = 'hour',
+  since?: string,
+  until?: string
+): Promise<TrendsResponse> => {
+  const params = new URLSearchParams({ granularity });
+  if (hashtag) params.set('hashtag', hashtag);
+  if (topic) params.set('topic', topic);
+  if (since) params.set('since', since);
+  if (until) params.set('until', until);
+  try {
+    const response = await fetch(`${API_BASE_URL}/trends?${params.toString()}`);
+    return await response.json();
+  } catch (error) {
+    console.error('Error fetching trends:', error);
+    return {
+      success: false,
+      error: 'Failed to fetch trends. Please try again later.'
+    };
+  }
+};
+
+/**
+ * Queues a background scrape + analysis job for a hashtag. A hashtag that is
+ * already queued or running returns the existing job (deduplicated: true).
+ *
+ * @param hashtag - The hashtag to search
+ * @returns Promise with the queued job
+ */
+export const createJob = async (hashtag: string): Promise<JobResponse> => {
+  try {
+    const response = await fetch(`${API_BASE_URL}/jobs`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json'
+      },
+      body: JSON.stringify({ hashtag })
+    });
+    return await response.json();
+  } catch (error) {
+    console.error('Error creating job:', error);
+    return { success: false, error: 'Failed to queue the search. Please try again later.' };
+  }
+};
+
+/**
+ * Polls a job's status, progress and the tweets stored since offset
+ *
+ * @param jobId - Id returned by createJob
+ * @param offset - next_offset from the previous poll (0 for everything)
+ * @param priorityThreshold - Only return tweets at or above this priority score
+ * @returns Promise with the job and its new results
+ */
+export const fetchJob = async (
+  jobId: string,
+  offset = 0,
+  priorityThreshold?: number
+): Promise<JobResponse> => {
+  const params = new URLSearchParams({ offset: String(offset) });
+  if (priorityThreshold !== undefined) params.set('priority_threshold', String(priorityThreshold));
+  try {
+    const response = await fetch(`${API_BASE_URL}/jobs/${jobId}?${params.toString()}`);
+    return await response.json();
+  } catch (error) {
+    console.error('Error fetching job:', error);
+    return { success: false, error: 'Failed to fetch the job. Please try again later.' };
+  }
+};
@@ -18,6 +18,7 @@ export interface SentimentData {
   topic_scores: TopicScore[];
   priority_score: number;
   timestamp: string;
+  cluster_size?: number;
 }
 
 export interface ApiResponse {
@@ -26,4 +27,63 @@ export interface ApiResponse {
   message?: string;
 }
 
+export interface SearchStreamEvent {
+  type: 'tweet' | 'write_error' | 'error' | 'summary';
+  hashtag?: string;
+  data?: SentimentData | Record<string, unknown>;
+  error?: string;
+}
+
+export interface DashboardStats {
+  total: number;
+  sentiment: Record<string, number>;
+  urgency: Record<string, number>;
+  topic: Record<string, number>;
+  priority: Record<string, number>;
+}
+
+export interface StatsResponse {
+  success: boolean;
+  data?: DashboardStats;
+  error?: string;
+}
+
+export interface TrendPoint {
+  start: string;
+  count: number;
+  priority_sum: number;
+  avg_priority: number;
+  sentiment: Record<string, number>;
+  urgency: Record<string, number>;
+}
+
+export interface TrendsResponse {
+  success: boolean;
+  data?: TrendPoint[];
+  error?: string;
+}
+
+export type JobStatus = 'queued' | 'running' | 'done' | 'failed';
+
+export interface Job {
+  id: string;
+  hashtag: string;
+  status: JobStatus;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+  progress: Record<string, unknown>;
+  error: string | null;
+  deduplicated?: boolean;
+  results?: SentimentData[];
+  next_offset?: number;
+  result_count?: number;
+}
+
+export interface JobResponse {
+  success: boolean;
+  data?: Job;
+  error?: string;
+}
+
 export type TabType = 'topic' | 'sentiment' | 'urgency';
\ No newline at end of file